@@ -0,0 +1,20 @@
+import os
+
+# Módulo de settings de cada entorno, elegido con la variable AEROEFI_ENTORNO
+MODULOS_SETTINGS = {
+    'desarrollo': 'aerolineas_efi.settings',
+    'produccion': 'aerolineas_efi.settings_produccion',
+}
+
+
+def configurar_settings():
+    """
+    Define DJANGO_SETTINGS_MODULE según AEROEFI_ENTORNO (por defecto
+    'desarrollo'). Si DJANGO_SETTINGS_MODULE ya está definido se respeta.
+    """
+    entorno = os.environ.get('AEROEFI_ENTORNO', 'desarrollo')
+    if entorno not in MODULOS_SETTINGS:
+        raise ValueError(
+            f"AEROEFI_ENTORNO='{entorno}' no es válido; opciones: {', '.join(MODULOS_SETTINGS)}"
+        )
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', MODULOS_SETTINGS[entorno])
@@ -0,0 +1,128 @@
+"""
+Documentación OpenAPI (Swagger y ReDoc)
+
+drf_yasg se importa la primera vez que se pide una de estas páginas y no al
+cargar las URLs, así los comandos y los workers que nunca sirven la
+documentación no pagan su importación.
+
+Generar el esquema recorre todos los viewsets y serializers de la API, así
+que se genera una sola vez por proceso y se sirve desde memoria con un ETag
+(los clientes que repiten la descarga con If-None-Match reciben un 304):
+
+- Con DEBUG desactivado se usa, si existe, el archivo precalculado en el
+  deploy con `manage.py generar_esquema` (settings.OPENAPI_DIR).
+- Si no, se genera en memoria con la primera petición.
+
+Swagger UI y ReDoc piden el esquema a su propia URL con ?format=openapi;
+esas peticiones también se sirven desde la copia en memoria.
+"""
+import functools
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+
+# Formato del esquema: (nombre del archivo, content type)
+FORMATOS = {
+    'json': ('openapi.json', 'application/json'),
+    'yaml': ('openapi.yaml', 'application/yaml'),
+}
+
+
+def _info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="AeroEFI API",
+        default_version='v1',
+        description="API REST para el Sistema de Gestión de Aerolíneas AeroEFI",
+        terms_of_service="https://www.aeroéfi.com/terms/",
+        contact=openapi.Contact(email="api@aeroéfi.com"),
+        license=openapi.License(name="MIT License"),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def schema_view():
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    return get_schema_view(
+        _info(),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+
+def generar_esquema(formato):
+    """Genera el esquema completo de la API y lo devuelve codificado en bytes"""
+    from django.test import RequestFactory
+    from drf_yasg.app_settings import swagger_settings
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+    from rest_framework.views import APIView
+
+    # Algunos viewsets leen la petición en get_queryset; se genera con una
+    # petición anónima como la que haría un cliente de la documentación
+    request = APIView().initialize_request(RequestFactory().get('/swagger.json'))
+    # Sin SWAGGER_SETTINGS['DEFAULT_API_URL'] el esquema no lleva host y vale
+    # para cualquier dominio que lo sirva
+    url = swagger_settings.DEFAULT_API_URL
+    generador = swagger_settings.DEFAULT_GENERATOR_CLASS(_info(), url=url or 'http://localhost/')
+    esquema = generador.get_schema(request=request, public=True)
+    if not url:
+        esquema.pop('host', None)
+        esquema.pop('schemes', None)
+    codec = OpenAPICodecJson if formato == 'json' else OpenAPICodecYaml
+    return codec(validators=[]).encode(esquema)
+
+
+def ruta_archivo(formato):
+    return Path(settings.OPENAPI_DIR) / FORMATOS[formato][0]
+
+
+@functools.lru_cache(maxsize=None)
+def contenido(formato):
+    """(bytes, etag) del esquema, leído del archivo precalculado o generado"""
+    ruta = ruta_archivo(formato)
+    if not settings.DEBUG and ruta.exists():
+        datos = ruta.read_bytes()
+    else:
+        datos = generar_esquema(formato)
+    return datos, f'"{hashlib.sha256(datos).hexdigest()[:32]}"'
+
+
+def _respuesta(request, formato):
+    datos, etag = contenido(formato)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(datos, content_type=FORMATOS[formato][1])
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, no-cache'
+    return response
+
+
+@functools.lru_cache(maxsize=None)
+def _interfaz(nombre):
+    return schema_view().with_ui(nombre, cache_timeout=0)
+
+
+@csrf_exempt
+def esquema(request, format):
+    return _respuesta(request, format.lstrip('.'))
+
+
+@csrf_exempt
+def swagger(request):
+    if request.GET.get('format') == 'openapi':
+        return _respuesta(request, 'json')
+    return _interfaz('swagger')(request)
+
+
+@csrf_exempt
+def redoc(request):
+    if request.GET.get('format') == 'openapi':
+        return _respuesta(request, 'json')
+    return _interfaz('redoc')(request)
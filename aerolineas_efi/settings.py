@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'gestion.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,10 +81,46 @@ WSGI_APPLICATION = 'aerolineas_efi.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('AEROEFI_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# PostgreSQL (AEROEFI_DB_MOTOR=postgresql). Con AEROEFI_PGBOUNCER=1 se asume
+# que la conexión pasa por PgBouncer en modo transacción, que no admite los
+# cursores del lado del servidor que usa QuerySet.iterator().
+if os.environ.get('AEROEFI_DB_MOTOR') == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('AEROEFI_DB_NOMBRE', 'aerolineas_efi'),
+        'USER': os.environ.get('AEROEFI_DB_USUARIO', 'aerolineas_efi'),
+        'PASSWORD': os.environ.get('AEROEFI_DB_PASSWORD', ''),
+        'HOST': os.environ.get('AEROEFI_DB_HOST', 'localhost'),
+        'PORT': os.environ.get('AEROEFI_DB_PUERTO', '5432'),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('AEROEFI_PGBOUNCER') == '1',
+    }
+
+# Réplicas de lectura (ver gestion/replicas.py). AEROEFI_DB_REPLICAS es una
+# lista separada por comas de archivos SQLite o, con PostgreSQL, de hosts que
+# comparten el resto de la configuración de `default`.
+DATABASE_REPLICAS = []
+for numero, destino in enumerate(
+    [valor.strip() for valor in os.environ.get('AEROEFI_DB_REPLICAS', '').split(',') if valor.strip()],
+    start=1
+):
+    replica = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if replica['ENGINE'] == 'django.db.backends.sqlite3':
+        replica['NAME'] = destino
+    else:
+        replica['HOST'] = destino
+    DATABASES[f'replica_{numero}'] = replica
+    DATABASE_REPLICAS.append(f'replica_{numero}')
+
+DATABASE_ROUTERS = ['gestion.replicas.ReplicaRouter']
+
+# Segundos que un navegador lee de la base principal después de escribir
+REPLICAS_PRIMARIA_SEGUNDOS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -181,3 +218,32 @@ SWAGGER_SETTINGS = {
     },
     'USE_SESSION_AUTH': False,
 }
+
+# Caché
+# La caché de reportes usa contadores de versión por entidad (ver gestion/cache.py).
+# Con varios procesos conviene un backend compartido para que las invalidaciones
+# lleguen a todos los workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'aerolineas-efi',
+    }
+}
+
+REPORTES_CACHE_TIMEOUT = 60 * 60
+
+# Segundos tras los cuales el snapshot del panel de inicio se reconstruye en segundo plano
+DASHBOARD_SNAPSHOT_TTL = 30
+
+# Directorio donde se guardan los boletos PDF ya generados (ver gestion/pdf.py)
+PDF_CACHE_DIR = Path(os.environ.get('AEROEFI_PDF_CACHE_DIR', BASE_DIR / 'cache_pdf'))
+
+# Esquema OpenAPI precalculado con `manage.py generar_esquema` (ver aerolineas_efi/esquema.py)
+OPENAPI_DIR = Path(os.environ.get('AEROEFI_OPENAPI_DIR', BASE_DIR / 'openapi'))
+
+# Si los boletos que no están en la caché los genera el worker de trabajos
+# (manage.py procesar_trabajos) en lugar de la petición (ver gestion/trabajos.py)
+PDF_ASINCRONO = os.environ.get('AEROEFI_PDF_ASINCRONO', '0') == '1'
+
+# Tiempo mínimo en tierra entre dos vuelos del mismo avión (ver gestion/rotaciones.py)
+ROTACION_MINIMA_MINUTOS = int(os.environ.get('AEROEFI_ROTACION_MINIMA_MINUTOS', 30))
@@ -0,0 +1,111 @@
+"""
+Django settings de producción para aerolineas_efi.
+
+Se activan con AEROEFI_ENTORNO=produccion (ver aerolineas_efi/__init__.py)
+y parten de la configuración de desarrollo de settings.py.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES, DATABASES
+import os
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+SECRET_KEY = os.environ.get('AEROEFI_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+# Con DEBUG desactivado Django deja de guardar en memoria cada consulta SQL
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.environ.get('AEROEFI_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+    if host.strip()
+]
+
+
+# Database
+# Conexiones persistentes: cada worker reutiliza las conexiones (principal y
+# réplicas) entre peticiones en lugar de abrir una nueva por request.
+
+for base in DATABASES.values():
+    base['CONN_MAX_AGE'] = int(os.environ.get('AEROEFI_CONN_MAX_AGE', 600))
+    base['CONN_HEALTH_CHECKS'] = True
+
+# Pragmas aplicados a cada conexión SQLite nueva (ver gestion/signals.py).
+# WAL permite leer mientras otro proceso escribe y, con synchronous=NORMAL,
+# solo sincroniza el disco en los checkpoints.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+
+# Templates
+# El loader cacheado compila cada plantilla una sola vez por proceso.
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+
+# Caché
+# Los contadores de versión de gestion/cache.py (y con ellos el catálogo de
+# rutas, los mapas de asientos y los fragmentos {% cache %}) se invalidan en la
+# caché: con varios workers tiene que ser compartida, o cada worker seguiría
+# sirviendo datos viejos hasta REPORTES_CACHE_TIMEOUT. AEROEFI_CACHE_URL elige
+# el backend:
+#   redis://host:6379/0      Redis (requiere el paquete redis)
+#   memcached://host:11211   Memcached (requiere el paquete pymemcache)
+#   db://tabla               tabla en la base principal, creada con `manage.py createcachetable`
+#   locmem://                memoria de cada proceso; solo con un worker (AEROEFI_WORKERS=1)
+# No tiene valor por defecto: cada opción necesita un servicio, una tabla o
+# una cantidad de workers que hay que preparar al desplegar.
+
+def _cache_desde_url(url):
+    partes = urlsplit(url)
+    if partes.scheme in ('redis', 'rediss'):
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    if partes.scheme == 'memcached':
+        return {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': partes.netloc}
+    if partes.scheme == 'db':
+        return {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': partes.netloc or 'aeroefi_cache',
+        }
+    if partes.scheme == 'locmem':
+        workers = int(os.environ.get('AEROEFI_WORKERS', os.environ.get('WEB_CONCURRENCY', 1)))
+        if workers > 1:
+            raise ImproperlyConfigured(
+                f'AEROEFI_CACHE_URL=locmem:// no se comparte entre los {workers} workers: '
+                'usar redis://, memcached:// o db://'
+            )
+        return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'aerolineas-efi'}
+    raise ImproperlyConfigured(f'AEROEFI_CACHE_URL no reconocida: {url}')
+
+
+if not os.environ.get('AEROEFI_CACHE_URL'):
+    raise ImproperlyConfigured(
+        'AEROEFI_CACHE_URL es obligatoria en producción: redis://, memcached://, '
+        'db://tabla (tras `manage.py createcachetable`) o locmem:// con un solo worker'
+    )
+
+CACHES = {'default': _cache_desde_url(os.environ['AEROEFI_CACHE_URL'])}
+
+
+# Sesiones
+# Se leen de la caché y solo se consulta la base de datos si no están en ella.
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+# PDF
+# En producción los boletos se generan en el worker de trabajos PDF.
+
+PDF_ASINCRONO = os.environ.get('AEROEFI_PDF_ASINCRONO', '1') == '1'
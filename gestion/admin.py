@@ -1,5 +1,10 @@
-from django.contrib import admin
-from .models import Avion, Vuelo, Pasajero, Asiento, Reserva, Boleto
+from django.contrib import admin, messages
+from django.urls import reverse
+from django.utils.html import format_html
+from . import pdf, programacion, trabajos
+from .models import (
+    Avion, PatronVuelo, Vuelo, Pasajero, Asiento, Reserva, Boleto, TrabajoPDF, ReservaArchivada, BoletoArchivado
+)
 
 @admin.register(Avion)
 class AvionAdmin(admin.ModelAdmin):
@@ -8,6 +13,48 @@ class AvionAdmin(admin.ModelAdmin):
     search_fields = ['modelo']
     readonly_fields = ['fecha_creacion']
 
+@admin.register(PatronVuelo)
+class PatronVueloAdmin(admin.ModelAdmin):
+    list_display = ['origen', 'destino', 'descripcion_dias', 'horas_salida', 'avion', 'precio_base',
+                    'vigente_desde', 'vigente_hasta', 'activo']
+    list_filter = ['activo', 'origen', 'destino']
+    search_fields = ['origen', 'destino']
+    readonly_fields = ['fecha_creacion', 'fecha_modificacion']
+    actions = ['expandir']
+
+    @admin.display(description='Días')
+    def descripcion_dias(self, obj):
+        return obj.descripcion_dias()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Los vuelos del patrón se ajustan en el momento a la nueva definición
+        self._informar(request, programacion.expandir([obj]))
+
+    @admin.action(description='Generar los vuelos de los patrones seleccionados')
+    def expandir(self, request, queryset):
+        self._informar(request, programacion.expandir(queryset))
+
+    def _informar(self, request, totales):
+        self.message_user(
+            request,
+            f"Vuelos: {totales['creados']} creados, {totales['actualizados']} actualizados, "
+            f"{totales['eliminados']} eliminados, {totales['existentes']} ya cargados fuera del patrón",
+            messages.SUCCESS
+        )
+        if totales['con_reservas']:
+            self.message_user(
+                request,
+                f"{totales['con_reservas']} vuelos con reservas difieren del patrón y no se modificaron",
+                messages.WARNING
+            )
+        if totales['conflictos']:
+            self.message_user(
+                request,
+                f"{totales['conflictos']} vuelos no se crearon ni modificaron porque el avión tiene otro vuelo a esa hora",
+                messages.WARNING
+            )
+
 @admin.register(Vuelo)
 class VueloAdmin(admin.ModelAdmin):
     list_display = ['origen', 'destino', 'fecha_salida', 'fecha_llegada', 'avion', 'estado', 'precio_base']
@@ -15,6 +62,26 @@ class VueloAdmin(admin.ModelAdmin):
     search_fields = ['origen', 'destino']
     date_hierarchy = 'fecha_salida'
     readonly_fields = ['fecha_creacion']
+    raw_id_fields = ['patron']
+    actions = ['generar_boletos']
+
+    @admin.action(description='Generar boletos de los vuelos seleccionados')
+    def generar_boletos(self, request, queryset):
+        # Los genera el worker `manage.py procesar_trabajos`, fuera de la petición
+        if not pdf.reportlab_disponible:
+            self.message_user(request, 'La librería reportlab no está instalada', messages.ERROR)
+            return
+        creados = sum(trabajos.encolar_boletos_vuelo(vuelo, 'zip', request.user)[1] for vuelo in queryset)
+        url = reverse('admin:gestion_trabajopdf_changelist')
+        self.message_user(
+            request,
+            format_html(
+                '{} trabajos encolados ({} ya estaban en la cola o terminados). '
+                'Ver el estado en <a href="{}">Trabajos PDF</a>.',
+                creados, queryset.count() - creados, url
+            ),
+            messages.SUCCESS
+        )
 
 @admin.register(Pasajero)
 class PasajeroAdmin(admin.ModelAdmin):
@@ -42,3 +109,32 @@ class BoletoAdmin(admin.ModelAdmin):
     list_filter = ['estado', 'fecha_emision']
     search_fields = ['codigo_barra', 'reserva__codigo_reserva']
     readonly_fields = ['codigo_barra', 'fecha_emision']
+
+class SoloLecturaAdmin(admin.ModelAdmin):
+    """Los registros archivados solo los escribe `manage.py archivar_reservas`"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ReservaArchivada)
+class ReservaArchivadaAdmin(SoloLecturaAdmin):
+    list_display = ['codigo_reserva', 'pasajero', 'vuelo', 'asiento', 'estado', 'precio', 'fecha_reserva', 'fecha_archivado']
+    list_filter = ['estado', 'fecha_archivado']
+    search_fields = ['codigo_reserva', 'pasajero__nombre', 'pasajero__apellido', 'pasajero__documento']
+
+@admin.register(BoletoArchivado)
+class BoletoArchivadoAdmin(SoloLecturaAdmin):
+    list_display = ['codigo_barra', 'reserva', 'estado', 'fecha_emision']
+    list_filter = ['estado']
+    search_fields = ['codigo_barra', 'reserva__codigo_reserva']
+
+@admin.register(TrabajoPDF)
+class TrabajoPDFAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'estado', 'reserva', 'vuelo', 'formato', 'solicitado_por', 'fecha_creacion', 'fecha_fin']
+    list_filter = ['tipo', 'estado', 'fecha_creacion']
+    search_fields = ['clave', 'reserva__codigo_reserva']
+    raw_id_fields = ['reserva', 'vuelo', 'solicitado_por']
+    readonly_fields = ['clave', 'archivo', 'error', 'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'token', 'latido']
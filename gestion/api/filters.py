@@ -0,0 +1,41 @@
+"""
+Filtros personalizados para la API REST de AeroEFI
+
+Este módulo define backends de búsqueda que usan los índices de texto
+completo de gestion.busqueda en lugar de los `icontains` de SearchFilter.
+"""
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from ..busqueda import buscar_pasajeros, buscar_reservas
+
+
+class PasajeroSearchFilter(filters.SearchFilter):
+    """
+    Búsqueda de pasajeros por nombre y apellido usando el índice de texto
+    completo (sin distinguir acentos), y por documento o email como
+    subcadena.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terminos = self.get_search_terms(request)
+        if not terminos:
+            return queryset
+        return buscar_pasajeros(queryset, ' '.join(terminos), getattr(view, 'search_fields', None))
+
+
+class ReservaSearchFilter(filters.SearchFilter):
+    """
+    Búsqueda de reservas por pasajero o ruta usando el índice de texto
+    completo de reservas, y por código o documento como subcadena.
+    
+    Si la petición no indica `ordering`, los resultados se devuelven por
+    relevancia; por eso debe ir después de OrderingFilter en filter_backends.
+    """
+    
+    def filter_queryset(self, request, queryset, view):
+        terminos = self.get_search_terms(request)
+        if not terminos:
+            return queryset
+        ordenar = api_settings.ORDERING_PARAM not in request.query_params
+        return buscar_reservas(queryset, ' '.join(terminos), ordenar=ordenar)
@@ -1,7 +1,11 @@
 
 from rest_framework import serializers
+from django.urls import reverse
 from django.contrib.auth.models import User
-from ..models import Vuelo, Pasajero, Reserva, Asiento, Avion, Boleto
+from ..models import (
+    Vuelo, Pasajero, Reserva, Asiento, Avion, Boleto, TrabajoPDF, ReservaArchivada, BoletoArchivado
+)
+from .. import rotaciones
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -96,8 +100,49 @@ class VueloSerializer(serializers.ModelSerializer):
                 "El precio base debe ser mayor a 0"
             )
         
+        self.validate_rotacion(data)
         return data
 
+    def validate_rotacion(self, data):
+        """Valida que el avión no tenga otro vuelo superpuesto o sin el tiempo mínimo en tierra"""
+        def valor(campo):
+            return data.get(campo, getattr(self.instance, campo, None))
+
+        avion, salida, llegada = valor('avion'), valor('fecha_salida'), valor('fecha_llegada')
+        if not (avion and salida and llegada) or valor('estado') == 'cancelado':
+            return
+        conflictos = rotaciones.verificar_vuelo(avion.id, salida, llegada, getattr(self.instance, 'id', None))
+        if conflictos:
+            raise serializers.ValidationError({'avion': rotaciones.describir(conflictos)})
+
+
+class VueloImportacionSerializer(VueloSerializer):
+    """
+    Una fila de un cronograma importado (ver gestion.importacion).
+
+    Aplica las mismas validaciones que VueloSerializer, pero el avión se
+    indica por id o por modelo y se resuelve con el diccionario
+    context['aviones'] en lugar de una consulta por fila. La rotación de
+    los aviones la verifica el importador para todo el lote.
+    """
+
+    avion = serializers.CharField()
+
+    class Meta(VueloSerializer.Meta):
+        fields = ['origen', 'destino', 'fecha_salida', 'fecha_llegada', 'precio_base', 'estado', 'avion']
+
+    def validate_rotacion(self, data):
+        # El importador verifica las rotaciones de todo el lote de una vez
+        pass
+
+    def validate_avion(self, valor):
+        avion_id = self.context['aviones'].get(valor.strip())
+        if avion_id is None:
+            raise serializers.ValidationError(f"No existe un avión con id o modelo '{valor}'")
+        if avion_id == 'ambiguo':
+            raise serializers.ValidationError(f"Hay varios aviones con el modelo '{valor}'; usar el id")
+        return avion_id
+
 
 class VueloSimpleSerializer(serializers.ModelSerializer):
     """Serializer simplificado para vuelos (para usar en otros serializers)"""
@@ -151,6 +196,24 @@ class PasajeroSerializer(serializers.ModelSerializer):
         return value
 
 
+class PasajeroImportacionSerializer(PasajeroSerializer):
+    """
+    Una fila de un manifiesto de pasajeros importado (ver gestion.importacion).
+
+    El documento identifica al pasajero: si ya existe se actualizan sus
+    datos, así que no se valida que sea único. El importador consulta los
+    documentos de todo el lote de una vez.
+    """
+
+    class Meta(PasajeroSerializer.Meta):
+        fields = ['documento', 'tipo_documento', 'nombre', 'apellido', 'email', 'telefono', 'fecha_nacimiento']
+        read_only_fields = []
+        extra_kwargs = {'documento': {'validators': []}}
+
+    def validate_documento(self, value):
+        return value
+
+
 class BoletoSerializer(serializers.ModelSerializer):
     """Serializer para el modelo Boleto"""
     
@@ -174,6 +237,28 @@ class BoletoSerializer(serializers.ModelSerializer):
         }
 
 
+
+class TrabajoPDFSerializer(serializers.ModelSerializer):
+    """Serializer para los trabajos de la cola de PDF"""
+
+    url_descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrabajoPDF
+        fields = [
+            'id', 'tipo', 'estado', 'reserva', 'vuelo', 'formato', 'error',
+            'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'url_descarga'
+        ]
+        read_only_fields = fields
+
+    def get_url_descarga(self, obj):
+        """URL del archivo, solo cuando el trabajo terminó bien"""
+        if obj.estado != 'completado':
+            return None
+        request = self.context.get('request')
+        url = reverse('trabajo-pdf-descargar', args=[obj.id])
+        return request.build_absolute_uri(url) if request else url
+
 class ReservaSerializer(serializers.ModelSerializer):
     """Serializer completo para el modelo Reserva"""
     
@@ -245,6 +330,30 @@ class ReservaSerializer(serializers.ModelSerializer):
         return data
 
 
+class BoletoArchivadoSerializer(BoletoSerializer):
+    """Serializer de solo lectura para los boletos archivados"""
+
+    class Meta(BoletoSerializer.Meta):
+        model = BoletoArchivado
+        read_only_fields = BoletoSerializer.Meta.fields
+
+
+class ReservaArchivadaSerializer(ReservaSerializer):
+    """
+    Serializer de solo lectura para las reservas archivadas (ver
+    gestion/archivo.py): los mismos datos que una reserva activa, más la
+    marca `archivada` y la fecha en que se archivó.
+    """
+
+    boleto_info = BoletoArchivadoSerializer(source='boleto', read_only=True)
+    archivada = serializers.BooleanField(read_only=True)
+
+    class Meta(ReservaSerializer.Meta):
+        model = ReservaArchivada
+        fields = ReservaSerializer.Meta.fields + ['archivada', 'fecha_archivado']
+        read_only_fields = fields
+
+
 class ReservaCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear reservas (campos mínimos requeridos)"""
     
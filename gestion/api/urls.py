@@ -19,6 +19,7 @@ from .views import (
     AvionViewSet,
     BoletoViewSet,
     ReportesViewSet,
+    TrabajoPDFViewSet,
 )
 
 # Configurar el router de DRF
@@ -31,6 +32,7 @@ router.register(r'reservas', ReservaViewSet, basename='reserva')
 router.register(r'aviones', AvionViewSet, basename='avion')
 router.register(r'boletos', BoletoViewSet, basename='boleto')
 router.register(r'reportes', ReportesViewSet, basename='reporte')
+router.register(r'trabajos-pdf', TrabajoPDFViewSet, basename='trabajo-pdf')
 
 # URLs de la API
 urlpatterns = [
@@ -5,21 +5,31 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+import io
+import json
+import time
 
-from ..models import Vuelo, Pasajero, Reserva, Asiento, Avion, Boleto
+from ..models import Vuelo, Pasajero, Reserva, Asiento, Avion, Boleto, TrabajoPDF, ReservaArchivada
 from .serializers import (
     VueloSerializer, PasajeroSerializer, ReservaSerializer,
     AsientoSerializer, AvionSerializer, BoletoSerializer,
     ReservaCreateSerializer, ReservaUpdateSerializer,
-    ReporteVueloSerializer, ReportePasajeroSerializer
+    ReporteVueloSerializer, ReportePasajeroSerializer, VueloSimpleSerializer,
+    TrabajoPDFSerializer, ReservaArchivadaSerializer
 )
 from .permissions import (
     IsAdminOrReadOnly, IsOwnerOrAdminReservation, IsAdminOnly,
     CanViewPasajero, CanManageVuelos, CanAccessReports
 )
+from .filters import PasajeroSearchFilter, ReservaSearchFilter
+from .. import reportes
+from .. import cache as cache_reportes
+from .. import importacion, pdf, rotaciones, trabajos
 
 
 
@@ -140,6 +150,85 @@ class VueloViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminOnly])
+    def conflictos(self, request):
+        """
+        Vuelos de un mismo avión que se superponen o no respetan el tiempo
+        mínimo en tierra, entre fecha_desde y fecha_hasta (por defecto, los
+        próximos 30 días). Se puede filtrar por avion.
+        """
+        hoy = timezone.localdate()
+        fecha_desde = request.query_params.get('fecha_desde')
+        fecha_hasta = request.query_params.get('fecha_hasta')
+        try:
+            desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date() if fecha_desde else hoy
+            hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date() if fecha_hasta else hoy + timedelta(days=30)
+            avion_id = int(request.query_params['avion']) if request.query_params.get('avion') else None
+        except ValueError:
+            return Response(
+                {'error': 'Parámetros inválidos. Use fechas YYYY-MM-DD y el id del avión'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if desde > hasta:
+            return Response(
+                {'error': 'La fecha desde debe ser anterior o igual a la fecha hasta'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        conflictos = rotaciones.conflictos_programados(
+            timezone.make_aware(datetime.combine(desde, datetime.min.time())),
+            timezone.make_aware(datetime.combine(hasta + timedelta(days=1), datetime.min.time())),
+            avion_id,
+        )
+        ids = {conflicto['vuelo'] for conflicto in conflictos} | {conflicto['otro_vuelo'] for conflicto in conflictos}
+        vuelos = Vuelo.objects.select_related('avion').in_bulk(ids)
+        return Response({
+            'fecha_desde': desde,
+            'fecha_hasta': hasta,
+            'rotacion_minima_minutos': int(rotaciones.rotacion_minima().total_seconds() // 60),
+            'total': len(conflictos),
+            'conflictos': [
+                {
+                    'tipo': conflicto['tipo'],
+                    'margen_minutos': conflicto['margen_minutos'],
+                    'avion': {'id': conflicto['avion'], 'modelo': vuelos[conflicto['vuelo']].avion.modelo},
+                    'vuelo': VueloSimpleSerializer(vuelos[conflicto['vuelo']]).data,
+                    'otro_vuelo': VueloSimpleSerializer(vuelos[conflicto['otro_vuelo']]).data,
+                }
+                for conflicto in conflictos
+            ],
+        })
+
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminOnly])
+    def generar_boletos(self, request, pk=None):
+        """
+        Encola los boletos de todas las reservas activas del vuelo en la cola
+        de trabajos PDF y responde con el trabajo (202 mientras no termina).
+
+        formato=zip (por defecto) o pdf. El worker deja además cada boleto en
+        la caché; formato=cache se acepta por compatibilidad y encola un ZIP.
+        """
+        vuelo = self.get_object()
+        formato = request.data.get('formato', 'zip')
+        if formato == 'cache':
+            formato = 'zip'
+        if formato not in dict(TrabajoPDF.FORMATOS):
+            return Response(
+                {'error': 'Formato inválido. Use zip o pdf'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not pdf.reportlab_disponible:
+            return Response(
+                {'error': 'La librería reportlab no está instalada'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        trabajo, _ = trabajos.encolar_boletos_vuelo(vuelo, formato, request.user)
+        url = request.build_absolute_uri(reverse('trabajo-pdf-detail', args=[trabajo.id]))
+        datos = {**TrabajoPDFSerializer(trabajo, context={'request': request}).data, 'url': url}
+        codigo = status.HTTP_200_OK if trabajo.estado == 'completado' else status.HTTP_202_ACCEPTED
+        return Response(datos, status=codigo, headers={'Location': url})
+
 
 class PasajeroViewSet(viewsets.ModelViewSet):
     """
@@ -154,7 +243,7 @@ class PasajeroViewSet(viewsets.ModelViewSet):
     queryset = Pasajero.objects.all()
     serializer_class = PasajeroSerializer
     permission_classes = [CanViewPasajero]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, PasajeroSearchFilter, filters.OrderingFilter]
     filterset_fields = ['tipo_documento']
     search_fields = ['nombre', 'apellido', 'documento', 'email']
     ordering_fields = ['nombre', 'apellido', 'fecha_nacimiento']
@@ -171,7 +260,8 @@ class PasajeroViewSet(viewsets.ModelViewSet):
         # Los usuarios regulares solo pueden ver pasajeros con los que tienen relación
         return queryset.filter(
             Q(email=self.request.user.email) |
-            Q(reservas__usuario=self.request.user)
+            Q(reservas__usuario=self.request.user) |
+            Q(reservas_archivadas__usuario=self.request.user)
         ).distinct()
     
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
@@ -182,23 +272,31 @@ class PasajeroViewSet(viewsets.ModelViewSet):
         # Verificar permisos
         if not request.user.is_staff and pasajero.email != request.user.email:
             # Verificar si el usuario tiene reservas con este pasajero
-            if not pasajero.reservas.filter(usuario=request.user).exists():
+            if not pasajero.reservas.filter(usuario=request.user).exists() and \
+                    not pasajero.reservas_archivadas.filter(usuario=request.user).exists():
                 return Response(
                     {'error': 'No tienes permisos para ver las reservas de este pasajero'},
                     status=status.HTTP_403_FORBIDDEN
                 )
         
         reservas = pasajero.reservas.all().order_by('-fecha_reserva')
+        # Reservas de vuelos pasados movidas al archivo (ver gestion/archivo.py)
+        archivadas = pasajero.reservas_archivadas.select_related(
+            'vuelo', 'asiento', 'usuario', 'boleto'
+        ).order_by('-fecha_reserva')
         
         # Si no es admin, filtrar solo reservas del usuario actual
         if not request.user.is_staff:
             reservas = reservas.filter(usuario=request.user)
+            archivadas = archivadas.filter(usuario=request.user)
         
         serializer = ReservaSerializer(reservas, many=True)
         return Response({
             'pasajero': PasajeroSerializer(pasajero).data,
             'reservas': serializer.data,
-            'total_reservas': reservas.count()
+            'total_reservas': reservas.count(),
+            'reservas_archivadas': ReservaArchivadaSerializer(archivadas, many=True).data,
+            'total_reservas_archivadas': len(archivadas),
         })
     
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
@@ -233,6 +331,44 @@ class PasajeroViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminOnly])
+    def importar(self, request):
+        """
+        Importa pasajeros desde un archivo CSV, JSON Lines o JSON (campo `archivo`).
+
+        Los pasajeros se identifican por documento: los existentes se
+        actualizan y el resto se crea. La respuesta es NDJSON y se envía a
+        medida que se procesa: una línea con el resultado de cada fila y una
+        última línea con el resumen. simular=true valida sin guardar.
+        """
+        archivo = request.FILES.get('archivo')
+        if archivo is None:
+            return Response(
+                {'error': 'Debe enviar el archivo en el campo "archivo"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        formato = request.data.get('formato') or importacion.formato_de(archivo.name)
+        if formato not in importacion.FORMATOS:
+            return Response(
+                {'error': f"Formato inválido. Use uno de: {', '.join(importacion.FORMATOS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        simular = str(request.data.get('simular', 'false')).lower() == 'true'
+        importador = importacion.ImportadorPasajeros(simular=simular)
+        filas = importacion.leer_filas(io.TextIOWrapper(archivo.file, encoding='utf-8-sig', newline=''), formato)
+
+        def lineas():
+            inicio = time.perf_counter()
+            try:
+                for resultado in importador.resultados(filas):
+                    yield json.dumps(resultado, ensure_ascii=False, default=str) + '\n'
+            except ValueError as error:
+                yield json.dumps({'error': str(error)}, ensure_ascii=False) + '\n'
+            yield json.dumps({'resumen': importador.resumen(inicio)}) + '\n'
+
+        return StreamingHttpResponse(lineas(), content_type='application/x-ndjson')
+
 
 class ReservaViewSet(viewsets.ModelViewSet):
     """
@@ -248,7 +384,7 @@ class ReservaViewSet(viewsets.ModelViewSet):
         'vuelo', 'pasajero', 'asiento', 'usuario'
     )
     permission_classes = [IsOwnerOrAdminReservation]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, ReservaSearchFilter]
     filterset_fields = ['estado', 'metodo_pago', 'vuelo']
     search_fields = ['codigo_reserva', 'pasajero__nombre', 'pasajero__apellido', 'pasajero__documento']
     ordering_fields = ['fecha_reserva', 'precio']
@@ -337,24 +473,29 @@ class ReservaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            reserva = Reserva.objects.get(codigo_reserva__iexact=codigo)
-            
-            # Verificar permisos
-            if not request.user.is_staff and reserva.usuario != request.user:
-                return Response(
-                    {'error': 'No tienes permisos para ver esta reserva'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            serializer = self.get_serializer(reserva)
-            return Response(serializer.data)
-            
-        except Reserva.DoesNotExist:
+        reserva = Reserva.objects.filter(codigo_reserva__iexact=codigo).first()
+        serializer_class = self.get_serializer_class()
+        if reserva is None:
+            # Las reservas de vuelos pasados pueden estar en el archivo
+            reserva = ReservaArchivada.objects.select_related(
+                'vuelo', 'pasajero', 'asiento', 'usuario', 'boleto'
+            ).filter(codigo_reserva__iexact=codigo).first()
+            serializer_class = ReservaArchivadaSerializer
+        if reserva is None:
             return Response(
                 {'error': 'No se encontró una reserva con ese código'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        
+        # Verificar permisos
+        if not request.user.is_staff and reserva.usuario != request.user:
+            return Response(
+                {'error': 'No tienes permisos para ver esta reserva'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = serializer_class(reserva, context=self.get_serializer_context())
+        return Response(serializer.data)
 
 
 class AvionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -551,6 +692,98 @@ class BoletoViewSet(viewsets.ReadOnlyModelViewSet):
             )
 
 
+
+class TrabajoPDFViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet para la cola de trabajos PDF
+
+    Funcionalidades:
+    - Encolar el boleto de una reserva o los boletos de un vuelo (admin)
+    - Consultar el estado de un trabajo
+    - Descargar el archivo de un trabajo completado
+
+    Los PDF los genera el worker `manage.py procesar_trabajos`; la petición
+    que encola responde enseguida con el trabajo (nuevo o uno equivalente
+    ya existente).
+    """
+
+    queryset = TrabajoPDF.objects.all().select_related('reserva')
+    serializer_class = TrabajoPDFSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['tipo', 'estado', 'reserva', 'vuelo']
+    ordering = ['-fecha_creacion']
+
+    def get_queryset(self):
+        """Los usuarios regulares solo ven los trabajos de sus reservas"""
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(reserva__usuario=self.request.user)
+
+    def create(self, request):
+        """Encola un trabajo: {tipo: boleto, reserva} o {tipo: boletos_vuelo, vuelo, formato}"""
+        if not pdf.reportlab_disponible:
+            return Response(
+                {'error': 'La librería reportlab no está instalada'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        tipo = request.data.get('tipo', 'boleto')
+        if tipo == 'boleto':
+            reserva = get_object_or_404(pdf.reserva_para_boleto(), id=request.data.get('reserva'))
+            if not request.user.is_staff and reserva.usuario_id != request.user.id:
+                return Response(
+                    {'error': 'No tienes permisos para generar el boleto de esta reserva'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            trabajo, creado = trabajos.encolar_boleto(reserva, request.user)
+        elif tipo == 'boletos_vuelo':
+            if not request.user.is_staff:
+                return Response(
+                    {'error': 'Solo los administradores pueden generar los boletos de un vuelo'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            vuelo = get_object_or_404(Vuelo, id=request.data.get('vuelo'))
+            formato = request.data.get('formato', 'zip')
+            if formato not in dict(TrabajoPDF.FORMATOS):
+                return Response(
+                    {'error': 'Formato inválido. Use pdf o zip'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            trabajo, creado = trabajos.encolar_boletos_vuelo(vuelo, formato, request.user)
+        else:
+            return Response(
+                {'error': 'Tipo inválido. Use boleto o boletos_vuelo'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = self.get_serializer(trabajo)
+        if trabajo.estado == 'completado':
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def descargar(self, request, pk=None):
+        """Descarga el archivo de un trabajo completado"""
+        trabajo = self.get_object()
+        if trabajo.estado != 'completado':
+            return Response(
+                {'error': f'El trabajo está {trabajo.get_estado_display().lower()}', 'estado': trabajo.estado},
+                status=status.HTTP_409_CONFLICT
+            )
+        try:
+            archivo = open(trabajo.archivo, 'rb')
+        except FileNotFoundError:
+            return Response(
+                {'error': 'El archivo del trabajo ya no está disponible; vuelva a encolarlo'},
+                status=status.HTTP_410_GONE
+            )
+        return FileResponse(
+            archivo, as_attachment=True, filename=trabajo.nombre_descarga(),
+            content_type='application/zip' if trabajo.formato == 'zip' else 'application/pdf'
+        )
+
 class ReportesViewSet(viewsets.ViewSet):
     """
     ViewSet para reportes y estadísticas
@@ -558,6 +791,11 @@ class ReportesViewSet(viewsets.ViewSet):
     Funcionalidades:
     - Endpoint para obtener listado de pasajeros por vuelo
     - Endpoint para obtener reservas activas de un pasajero
+    - Endpoint para obtener la matriz origen × destino de ocupación
+    - Endpoint para obtener los manifiestos de salida de un aeropuerto
+    
+    Los reportes se sirven desde la caché versionada de gestion.cache hasta
+    que cambia alguna de las entidades de las que dependen.
     """
     
     permission_classes = [CanAccessReports]
@@ -588,13 +826,22 @@ class ReportesViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        datos = cache_reportes.obtener_o_calcular(
+            'pasajeros_por_vuelo',
+            {'vuelo_id': vuelo.id},
+            ('vuelo', 'reserva', 'pasajero', 'boleto'),
+            lambda: self._calcular_pasajeros_por_vuelo(vuelo)
+        )
+        return Response(datos)
+    
+    def _calcular_pasajeros_por_vuelo(self, vuelo):
         # Obtener reservas confirmadas para el vuelo
         reservas = Reserva.objects.filter(
             vuelo=vuelo,
             estado__in=['confirmada', 'pagada']
         ).select_related('pasajero', 'asiento').order_by('asiento__fila', 'asiento__columna')
         
-        return Response({
+        return {
             'vuelo': VueloSerializer(vuelo).data,
             'total_pasajeros': reservas.count(),
             'reservas': ReservaSerializer(reservas, many=True).data,
@@ -604,7 +851,7 @@ class ReportesViewSet(viewsets.ViewSet):
                 'porcentaje_ocupacion': vuelo.porcentaje_ocupacion(),
                 'ingresos_totales': sum(r.precio for r in reservas)
             }
-        })
+        }
     
     @action(detail=False, methods=['get'])
     def reservas_activas_pasajero(self, request):
@@ -635,16 +882,28 @@ class ReportesViewSet(viewsets.ViewSet):
                     status=status.HTTP_403_FORBIDDEN
                 )
         
+        # Los usuarios regulares ven solo sus reservas: el resultado depende del usuario
+        usuario = None if request.user.is_staff else request.user
+        
+        datos = cache_reportes.obtener_o_calcular(
+            'reservas_activas_pasajero',
+            {'pasajero_id': pasajero.id, 'usuario_id': usuario.id if usuario else None},
+            ('vuelo', 'reserva', 'pasajero', 'boleto'),
+            lambda: self._calcular_reservas_activas_pasajero(pasajero, usuario)
+        )
+        return Response(datos)
+    
+    def _calcular_reservas_activas_pasajero(self, pasajero, usuario):
         # Obtener reservas activas (no canceladas)
         reservas_activas = pasajero.reservas.exclude(
             estado='cancelada'
         ).select_related('vuelo', 'asiento').order_by('-fecha_reserva')
         
         # Si no es admin, filtrar solo reservas del usuario actual
-        if not request.user.is_staff:
-            reservas_activas = reservas_activas.filter(usuario=request.user)
+        if usuario is not None:
+            reservas_activas = reservas_activas.filter(usuario=usuario)
         
-        return Response({
+        return {
             'pasajero': PasajeroSerializer(pasajero).data,
             'reservas_activas': ReservaSerializer(reservas_activas, many=True).data,
             'total_reservas_activas': reservas_activas.count(),
@@ -654,12 +913,21 @@ class ReportesViewSet(viewsets.ViewSet):
                 'reservas_pendientes': reservas_activas.filter(estado='pendiente').count(),
                 'valor_total': sum(r.precio for r in reservas_activas)
             }
-        })
+        }
     
     @action(detail=False, methods=['get'], permission_classes=[IsAdminOnly])
     def estadisticas_generales(self, request):
         """Obtiene estadísticas generales del sistema (solo administradores)"""
-        
+        datos = cache_reportes.obtener_o_calcular(
+            'estadisticas_generales',
+            {'fecha': date.today().isoformat()},
+            ('vuelo', 'reserva', 'pasajero'),
+            self._calcular_estadisticas_generales
+        )
+        # fecha_calculo es el momento en que se calcularon los datos (pueden venir de la caché)
+        return Response({**datos, 'fecha_reporte': timezone.now().isoformat()})
+    
+    def _calcular_estadisticas_generales(self):
         # Estadísticas de vuelos
         total_vuelos = Vuelo.objects.count()
         vuelos_activos = Vuelo.objects.filter(estado='programado').count()
@@ -689,7 +957,7 @@ class ReportesViewSet(viewsets.ViewSet):
             ocupaciones = [vuelo.porcentaje_ocupacion() for vuelo in vuelos_con_reservas]
             ocupacion_promedio = sum(ocupaciones) / len(ocupaciones)
         
-        return Response({
+        return {
             'vuelos': {
                 'total': total_vuelos,
                 'activos': vuelos_activos,
@@ -708,5 +976,85 @@ class ReportesViewSet(viewsets.ViewSet):
                 'ingresos_totales': ingresos_totales,
                 'ocupacion_promedio': round(ocupacion_promedio, 2)
             },
-            'fecha_reporte': timezone.now().isoformat()
-        })
\ No newline at end of file
+            'fecha_calculo': timezone.now().isoformat()
+        }
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminOnly])
+    def metricas_cache(self, request):
+        """Obtiene aciertos y fallos de la caché de reportes (solo administradores)"""
+        return Response(reportes.metricas_cache())
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminOnly])
+    def matriz_rutas(self, request):
+        """Obtiene la matriz origen × destino con vuelos, asientos y ocupación (solo administradores)"""
+        hoy = date.today()
+        fecha_desde = request.query_params.get('fecha_desde')
+        fecha_hasta = request.query_params.get('fecha_hasta')
+        
+        try:
+            desde = datetime.strptime(fecha_desde, '%Y-%m-%d').date() if fecha_desde else hoy - timedelta(days=30)
+            hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d').date() if fecha_hasta else hoy
+        except ValueError:
+            return Response(
+                {'error': 'Formato de fecha inválido. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if desde > hasta:
+            return Response(
+                {'error': 'La fecha desde debe ser anterior o igual a la fecha hasta'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(reportes.matriz_rutas(desde, hasta))
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminOnly])
+    def manifiesto_salidas(self, request):
+        """Obtiene los manifiestos de todos los vuelos que salen de un aeropuerto en las próximas horas"""
+        aeropuerto = request.query_params.get('aeropuerto')
+        
+        if not aeropuerto:
+            return Response(
+                {'error': 'Debe proporcionar el aeropuerto de salida'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            horas = int(request.query_params.get('horas', 24))
+        except ValueError:
+            return Response(
+                {'error': 'Número de horas inválido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        horas = min(max(horas, 1), 168)
+        
+        vuelos = []
+        for manifiesto in reportes.manifiestos_salida(aeropuerto, horas):
+            vuelos.append({
+                'vuelo': VueloSimpleSerializer(manifiesto['vuelo']).data,
+                'avion': manifiesto['vuelo'].avion.modelo,
+                'total_pasajeros': manifiesto['total_pasajeros'],
+                'asientos_disponibles': manifiesto['asientos_disponibles'],
+                'porcentaje_ocupacion': round(manifiesto['porcentaje_ocupacion'], 2),
+                'pasajeros': [
+                    {
+                        'codigo_reserva': reserva.codigo_reserva,
+                        'estado': reserva.estado,
+                        'asiento': reserva.asiento.numero,
+                        'pasajero': {
+                            'id': reserva.pasajero.id,
+                            'nombre_completo': reserva.pasajero.nombre_completo(),
+                            'tipo_documento': reserva.pasajero.tipo_documento,
+                            'documento': reserva.pasajero.documento,
+                        },
+                    }
+                    for reserva in manifiesto['reservas']
+                ],
+            })
+        
+        return Response({
+            'aeropuerto': aeropuerto,
+            'horas': horas,
+            'total_vuelos': len(vuelos),
+            'vuelos': vuelos,
+        })
@@ -5,3 +5,6 @@ class GestionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gestion'
     verbose_name = 'Gestión de Aerolíneas'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,104 @@
+"""
+Archivo de reservas de vuelos pasados
+
+Las reservas y los boletos de los vuelos que salieron hace más de N días
+ya no intervienen en la operación (disponibilidad de asientos, manifiestos,
+emisión de boletos), pero siguen pesando en cada listado, en los reportes y
+en las verificaciones de unicidad de la tabla de reservas. archivar() los
+mueve a ReservaArchivada y BoletoArchivado, pensado para ejecutarse
+periódicamente desde cron con `manage.py archivar_reservas`:
+
+- Las reservas se recorren por id en lotes; cada lote se copia con
+  bulk_create y se elimina de las tablas activas en su propia transacción,
+  así una ejecución interrumpida deja todo consistente y la siguiente
+  continúa donde quedó.
+- Se conservan el id, el código de reserva y el código de barra, que siguen
+  siendo únicos entre reservas activas y archivadas (ver
+  Reserva.generar_codigo_reserva).
+- Las reservas, sus boletos y sus trabajos PDF se eliminan sin pasar por
+  las señales de borrado, que harían varias escrituras en la caché por
+  fila. Como en las demás escrituras masivas, al confirmar cada lote se
+  incrementan una vez las versiones de la caché afectadas y se borran los
+  PDF guardados de sus reservas.
+
+Las reservas archivadas se consultan por código de reserva y en el
+historial de cada pasajero, en la web y en la API.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import cache as cache_reportes, pdf
+from .asientos import entidad_vuelo
+from .models import Boleto, BoletoArchivado, Reserva, ReservaArchivada, TrabajoPDF
+
+DIAS_ARCHIVO = 180
+TAMANIO_LOTE = 1000
+
+CAMPOS_RESERVA = [
+    'id', 'vuelo_id', 'pasajero_id', 'asiento_id', 'estado', 'fecha_reserva',
+    'precio', 'metodo_pago', 'codigo_reserva', 'usuario_id',
+]
+CAMPOS_BOLETO = ['id', 'reserva_id', 'codigo_barra', 'fecha_emision', 'estado']
+
+
+def reservas_archivables(dias=DIAS_ARCHIVO):
+    """Reservas de los vuelos que salieron hace más de `dias` días"""
+    limite = timezone.now() - timedelta(days=dias)
+    return Reserva.objects.filter(vuelo__fecha_salida__lt=limite)
+
+
+def archivar(dias=DIAS_ARCHIVO, tamanio_lote=TAMANIO_LOTE, simular=False, progreso=None):
+    """
+    Mueve al archivo las reservas (con sus boletos) de los vuelos que
+    salieron hace más de `dias` días. Con `simular` solo se cuentan.
+    Devuelve los totales de reservas, boletos, vuelos y lotes.
+    """
+    progreso = progreso or (lambda totales: None)
+    totales = {'reservas': 0, 'boletos': 0, 'vuelos': 0, 'lotes': 0}
+    vuelos = set()
+    pendientes = reservas_archivables(dias).order_by('id')
+    ultimo = 0
+    while True:
+        with transaction.atomic():
+            lote = list(pendientes.filter(id__gt=ultimo).values(*CAMPOS_RESERVA)[:tamanio_lote])
+            if not lote:
+                break
+            ids = [fila['id'] for fila in lote]
+            boletos = list(Boleto.objects.filter(reserva_id__in=ids).values(*CAMPOS_BOLETO))
+            if not simular:
+                ReservaArchivada.objects.bulk_create([ReservaArchivada(**fila) for fila in lote])
+                BoletoArchivado.objects.bulk_create([BoletoArchivado(**fila) for fila in boletos])
+                _eliminar(ids)
+        ultimo = ids[-1]
+        vuelos_lote = {fila['vuelo_id'] for fila in lote}
+        if not simular:
+            cache_reportes.incrementar_version(
+                'reserva', 'boleto', *(entidad_vuelo(vuelo_id) for vuelo_id in vuelos_lote)
+            )
+            for reserva_id in ids:
+                pdf.descartar_boletos(reserva_id)
+        vuelos.update(vuelos_lote)
+        totales['reservas'] += len(lote)
+        totales['boletos'] += len(boletos)
+        totales['vuelos'] = len(vuelos)
+        totales['lotes'] += 1
+        progreso(totales)
+    return totales
+
+
+def _eliminar(ids):
+    """Borra las reservas y lo que depende de ellas con DELETE directos, sin señales"""
+    marcadores = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        for modelo, columna in (
+            (TrabajoPDF, TrabajoPDF._meta.get_field('reserva').column),
+            (Boleto, Boleto._meta.get_field('reserva').column),
+            (Reserva, Reserva._meta.pk.column),
+        ):
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(modelo._meta.db_table)} '
+                f'WHERE {connection.ops.quote_name(columna)} IN ({marcadores})',
+                ids
+            )
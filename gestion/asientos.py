@@ -0,0 +1,86 @@
+"""
+Mapa de asientos de un vuelo
+
+Las vistas de reserva muestran los asientos del avión agrupados por fila y
+marcados como reservados o libres. El mapa se arma con datos planos y se
+guarda en la caché versionada (ver gestion.cache) con dos versiones propias
+del vuelo: la del vuelo y sus reservas y la de los asientos de su avión.
+Las señales las incrementan al guardar reservas, asientos o el vuelo, de
+modo que el mapa de cada vuelo solo se recalcula cuando cambia algo que lo
+afecta.
+"""
+from . import cache as cache_reportes
+from .models import Asiento, Reserva
+from .reportes import ESTADOS_RESERVA_ACTIVA
+
+
+def entidad_vuelo(vuelo_id):
+    """Entidad de versión que cambia con un vuelo y con sus reservas"""
+    return f'asientos_vuelo:{vuelo_id}'
+
+
+def entidad_avion(avion_id):
+    """Entidad de versión que cambia con los asientos de un avión"""
+    return f'asientos_avion:{avion_id}'
+
+
+class MapaAsientos:
+    """
+    Asientos de un vuelo agrupados por fila con su disponibilidad.
+
+    Cada asiento es un diccionario con id, numero, fila, columna, tipo,
+    estado, `reservado` (tiene una reserva activa en el vuelo) y `disponible`
+    (no está reservado y el asiento está habilitado).
+    """
+
+    def __init__(self, datos):
+        self.capacidad = datos['capacidad']
+        self.asientos_por_fila = datos['asientos_por_fila']
+        self.reservados = datos['reservados']
+
+    def asientos(self):
+        for asientos in self.asientos_por_fila.values():
+            yield from asientos
+
+    def ids_disponibles(self):
+        return [asiento['id'] for asiento in self.asientos() if asiento['disponible']]
+
+    def asientos_disponibles(self):
+        return self.capacidad - len(self.reservados)
+
+    def porcentaje_ocupacion(self):
+        if self.capacidad == 0:
+            return 0
+        return (len(self.reservados) / self.capacidad) * 100
+
+
+def calcular_mapa(vuelo):
+    reservados = set(
+        Reserva.objects.filter(
+            vuelo_id=vuelo.id, estado__in=ESTADOS_RESERVA_ACTIVA
+        ).values_list('asiento_id', flat=True)
+    )
+    asientos = Asiento.objects.filter(avion_id=vuelo.avion_id).order_by('fila', 'columna').values(
+        'id', 'numero', 'fila', 'columna', 'tipo', 'estado'
+    )
+    asientos_por_fila = {}
+    for asiento in asientos:
+        asiento['reservado'] = asiento['id'] in reservados
+        asiento['disponible'] = not asiento['reservado'] and asiento['estado'] == 'disponible'
+        asientos_por_fila.setdefault(asiento['fila'], []).append(asiento)
+    return {
+        'capacidad': vuelo.avion.capacidad,
+        'asientos_por_fila': asientos_por_fila,
+        'reservados': reservados,
+    }
+
+
+def mapa_asientos(vuelo):
+    """Mapa de asientos del vuelo desde la caché, recalculado si cambió"""
+    datos = cache_reportes.obtener_o_calcular(
+        'mapa_asientos',
+        {'vuelo': vuelo.id, 'avion': vuelo.avion_id},
+        (entidad_vuelo(vuelo.id), entidad_avion(vuelo.avion_id)),
+        lambda: calcular_mapa(vuelo)
+    )
+    return MapaAsientos(datos)
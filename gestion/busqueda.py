@@ -0,0 +1,177 @@
+"""
+Búsqueda de texto sobre pasajeros y reservas
+
+En SQLite las búsquedas usan las tablas FTS5 `gestion_pasajero_fts` y
+`gestion_reserva_fts` (creadas en las migraciones 0003 y 0004): cada palabra
+buscada se compara como prefijo de palabra y sin distinguir acentos ni
+mayúsculas, usando el índice en lugar de recorrer las tablas con
+`LIKE '%...%'`. Si el índice no existe (otro motor o SQLite sin FTS5) se
+recurre a los filtros `icontains` originales.
+
+Los documentos, los emails y los códigos de reserva se siguen comparando
+como subcadena con `icontains` aunque haya índice: un prefijo de palabra no
+encuentra, por ejemplo, los últimos dígitos de un documento. En PostgreSQL esas búsquedas
+usan los índices pg_trgm de la migración 0005.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+TABLA_FTS_PASAJEROS = 'gestion_pasajero_fts'
+TABLA_FTS_RESERVAS = 'gestion_reserva_fts'
+
+# Columnas del índice de reservas y el campo equivalente para `icontains`
+CAMPOS_RESERVA = {
+    'codigo': ['codigo_reserva'],
+    'pasajero': ['pasajero__nombre', 'pasajero__apellido'],
+    'documento': ['pasajero__documento'],
+    'ruta': ['vuelo__origen', 'vuelo__destino'],
+}
+
+# Campos de pasajero que se comparan como subcadena y no en el índice
+SUBCADENA_PASAJERO = ('documento', 'email')
+
+# Columnas de CAMPOS_RESERVA que se comparan como subcadena y no en el índice
+SUBCADENA_RESERVA = ('codigo', 'documento')
+
+# Peso de cada columna del índice de reservas en el ranking bm25
+PESOS_RESERVA = (10.0, 5.0, 5.0, 1.0)
+
+_tablas_disponibles = {}
+
+
+def indice_disponible(tabla, using='default'):
+    """Indica si la tabla de texto completo existe en la base de datos"""
+    clave = (using, tabla)
+    if clave not in _tablas_disponibles:
+        connection = connections[using]
+        _tablas_disponibles[clave] = (
+            connection.vendor == 'sqlite'
+            and tabla in connection.introspection.table_names()
+        )
+    return _tablas_disponibles[clave]
+
+
+def expresion_fts(texto, columnas=None, cualquiera=False):
+    """
+    Convierte el texto del usuario en una consulta MATCH de FTS5.
+
+    Cada palabra se busca como prefijo y entre comillas, de modo que los
+    caracteres especiales de la sintaxis de FTS5 no tengan efecto. Con
+    `cualquiera` basta que coincida una de las palabras. Devuelve None si el
+    texto no contiene palabras.
+    """
+    palabras = re.findall(r'\w+', texto)
+    if not palabras:
+        return None
+    expresion = (' OR ' if cualquiera else ' ').join(f'"{palabra}"*' for palabra in palabras)
+    if columnas:
+        return '{%s}: (%s)' % (' '.join(columnas), expresion)
+    return expresion
+
+
+def _coincidencias(tabla, expresion):
+    return RawSQL(f'SELECT rowid FROM {tabla} WHERE {tabla} MATCH %s', [expresion])
+
+
+def filtrar_por_indice(queryset, tabla, expresion):
+    """Restringe el queryset a las filas cuyo rowid coincide en la tabla FTS5"""
+    return queryset.filter(id__in=_coincidencias(tabla, expresion))
+
+
+def anotar_relevancia(queryset, tabla, expresion, pesos):
+    """
+    Agrega la anotación `relevancia` con el puntaje bm25 de cada fila (menor
+    es más relevante). Conviene aplicarla sobre un queryset ya filtrado con
+    filtrar_por_indice para que solo se calcule en las coincidencias.
+    """
+    alias = queryset.model._meta.db_table
+    ponderacion = ', '.join(str(peso) for peso in pesos)
+    return queryset.annotate(relevancia=RawSQL(
+        f'SELECT bm25({tabla}, {ponderacion}) FROM {tabla} '
+        f'WHERE {tabla} MATCH %s AND rowid = "{alias}"."id"',
+        [expresion]
+    ))
+
+
+def _filtrar_icontains(queryset, texto, campos):
+    condiciones = Q()
+    for palabra in texto.split():
+        condicion_palabra = Q()
+        for campo in campos:
+            condicion_palabra |= Q(**{f'{campo}__icontains': palabra})
+        condiciones &= condicion_palabra
+    return queryset.filter(condiciones)
+
+
+def _filtrar_mixto(queryset, tabla, texto, columnas, campos, campos_subcadena):
+    """
+    Cada palabra debe aparecer como prefijo de palabra en alguna de las
+    `columnas` del índice o como subcadena en alguno de `campos_subcadena`.
+    Las palabras sin letras ni números, que el índice no puede buscar, se
+    comparan con `icontains` en los `campos` equivalentes a las columnas.
+    """
+    condiciones = Q()
+    for palabra in texto.split():
+        condicion_palabra = Q()
+        for campo in campos_subcadena:
+            condicion_palabra |= Q(**{f'{campo}__icontains': palabra})
+        expresion = expresion_fts(palabra, columnas) if columnas else None
+        if expresion:
+            condicion_palabra |= Q(id__in=_coincidencias(tabla, expresion))
+        else:
+            for campo in campos:
+                condicion_palabra |= Q(**{f'{campo}__icontains': palabra})
+        condiciones &= condicion_palabra
+    return queryset.filter(condiciones)
+
+
+def buscar_pasajeros(queryset, texto, columnas=None):
+    """
+    Filtra pasajeros cuyo nombre o apellido empiezan con las palabras
+    buscadas, o cuyo documento o email las contienen. `columnas` restringe
+    la búsqueda a algunos campos.
+    """
+    columnas = columnas or ['nombre', 'apellido', 'documento', 'email']
+    if indice_disponible(TABLA_FTS_PASAJEROS, queryset.db):
+        en_indice = [columna for columna in columnas if columna not in SUBCADENA_PASAJERO]
+        return _filtrar_mixto(
+            queryset, TABLA_FTS_PASAJEROS, texto, en_indice, en_indice,
+            [columna for columna in columnas if columna in SUBCADENA_PASAJERO],
+        )
+
+    return _filtrar_icontains(queryset, texto, columnas)
+
+
+def buscar_reservas(queryset, texto, columnas=None, ordenar=False):
+    """
+    Filtra reservas por código, nombre o documento del pasajero y ruta del
+    vuelo. `columnas` restringe la búsqueda a algunas columnas de
+    CAMPOS_RESERVA; con `ordenar` los resultados se ordenan por relevancia
+    (solo cuando se usa el índice).
+    """
+    columnas = columnas or list(CAMPOS_RESERVA)
+    if indice_disponible(TABLA_FTS_RESERVAS, queryset.db):
+        en_indice = [columna for columna in columnas if columna not in SUBCADENA_RESERVA]
+        queryset = _filtrar_mixto(
+            queryset, TABLA_FTS_RESERVAS, texto, en_indice,
+            [campo for columna in en_indice for campo in CAMPOS_RESERVA[columna]],
+            [campo for columna in columnas if columna in SUBCADENA_RESERVA
+             for campo in CAMPOS_RESERVA[columna]],
+        )
+        expresion = expresion_fts(texto, en_indice, cualquiera=True) if en_indice else None
+        if ordenar and expresion:
+            # Las reservas encontradas solo por código o documento no tienen
+            # puntaje y van primero: son las coincidencias más precisas
+            queryset = anotar_relevancia(
+                queryset, TABLA_FTS_RESERVAS, expresion, PESOS_RESERVA
+            ).order_by(
+                F('relevancia').asc(nulls_first=True),
+                *(queryset.query.order_by or queryset.model._meta.ordering)
+            )
+        return queryset
+
+    campos = [campo for columna in columnas for campo in CAMPOS_RESERVA[columna]]
+    return _filtrar_icontains(queryset, texto, campos)
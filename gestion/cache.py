@@ -0,0 +1,134 @@
+"""
+Caché versionada de resultados de reportes
+
+Cada entidad del dominio (vuelo, reserva, pasajero, boleto) tiene un contador
+de versión en la caché. Las señales de guardado y borrado incrementan el
+contador de la entidad modificada, y los resultados se guardan bajo una clave
+que incluye el nombre del reporte, sus parámetros y las versiones de las
+entidades de las que depende. Así un resultado se sirve desde la caché hasta
+que cambia algo que realmente lo afecta, sin tener que borrar claves.
+
+Los resultados se calculan en la base principal aunque la petición lea de
+una réplica: lo que se guarda se sirve hasta el próximo cambio de versión.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .replicas import en_principal
+
+ENTIDADES = ('vuelo', 'reserva', 'pasajero', 'boleto')
+
+PREFIJO = 'gestion:cache'
+
+
+def _timeout_por_defecto():
+    return getattr(settings, 'REPORTES_CACHE_TIMEOUT', 60 * 60)
+
+
+def _clave_version(entidad):
+    return f'{PREFIJO}:version:{entidad}'
+
+
+def _version_inicial():
+    # Se parte de una marca de tiempo para que, si el contador se pierde
+    # (expulsión o reinicio de la caché), nunca vuelva a un valor ya usado.
+    return time.time_ns() // 1000
+
+
+def version(entidad):
+    """Devuelve la versión actual de una entidad"""
+    return versiones([entidad])[entidad]
+
+
+def versiones(entidades):
+    """Devuelve las versiones de varias entidades con una sola lectura a la caché"""
+    claves = {_clave_version(entidad): entidad for entidad in entidades}
+    encontradas = cache.get_many(list(claves))
+    resultado = {}
+    for clave, entidad in claves.items():
+        valor = encontradas.get(clave)
+        if valor is None:
+            cache.add(clave, _version_inicial(), timeout=None)
+            valor = cache.get(clave)
+        resultado[entidad] = valor
+    return resultado
+
+
+def incrementar_version(*entidades):
+    """
+    Invalida todos los resultados que dependen de las entidades indicadas.
+
+    Devuelve un diccionario con la versión nueva de cada entidad.
+    """
+    nuevas = {}
+    for entidad in entidades:
+        clave = _clave_version(entidad)
+        try:
+            nuevas[entidad] = cache.incr(clave)
+        except ValueError:
+            nuevas[entidad] = _version_inicial()
+            cache.set(clave, nuevas[entidad], timeout=None)
+    return nuevas
+
+
+def _clave_resultado(nombre, parametros, depende_de):
+    vigentes = versiones(depende_de)
+    firma = json.dumps(
+        {'parametros': parametros, 'versiones': vigentes},
+        sort_keys=True, default=str
+    )
+    resumen = hashlib.sha1(firma.encode('utf-8')).hexdigest()
+    return f'{PREFIJO}:reporte:{nombre}:{resumen}'
+
+
+def _registrar(nombre, evento):
+    clave = f'{PREFIJO}:metricas:{nombre}:{evento}'
+    if not cache.add(clave, 1, timeout=None):
+        try:
+            cache.incr(clave)
+        except ValueError:
+            cache.set(clave, 1, timeout=None)
+
+
+def obtener_o_calcular(nombre, parametros, depende_de, calcular, timeout=None):
+    """
+    Devuelve el resultado cacheado de un reporte o lo calcula y lo guarda.
+
+    `parametros` debe ser serializable a JSON y `depende_de` es la lista de
+    entidades cuyos cambios invalidan el resultado.
+    """
+    clave = _clave_resultado(nombre, parametros, depende_de)
+    resultado = cache.get(clave)
+    if resultado is not None:
+        _registrar(nombre, 'aciertos')
+        return resultado
+
+    _registrar(nombre, 'fallos')
+    with en_principal():
+        resultado = calcular()
+    cache.set(clave, resultado, _timeout_por_defecto() if timeout is None else timeout)
+    return resultado
+
+
+def metricas(nombres):
+    """Devuelve aciertos, fallos y tasa de aciertos de los reportes indicados"""
+    claves = [
+        f'{PREFIJO}:metricas:{nombre}:{evento}'
+        for nombre in nombres for evento in ('aciertos', 'fallos')
+    ]
+    valores = cache.get_many(claves)
+    resultado = {}
+    for nombre in nombres:
+        aciertos = valores.get(f'{PREFIJO}:metricas:{nombre}:aciertos', 0)
+        fallos = valores.get(f'{PREFIJO}:metricas:{nombre}:fallos', 0)
+        total = aciertos + fallos
+        resultado[nombre] = {
+            'aciertos': aciertos,
+            'fallos': fallos,
+            'tasa_aciertos': round(aciertos / total * 100, 2) if total else 0,
+        }
+    return resultado
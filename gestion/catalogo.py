@@ -0,0 +1,139 @@
+"""
+Catálogo de rutas y fechas de los vuelos programados
+
+Índice en memoria que asocia cada par (origen, destino) con la lista ordenada
+de fechas de salida de sus vuelos programados. Lo comparten el formulario de
+búsqueda, la vista `buscar_vuelos` y el endpoint JSON de fechas, de modo que
+ninguno de ellos necesita recorrer la tabla de vuelos en cada petición.
+
+El índice se construye una vez por proceso y se actualiza de forma
+incremental con las señales de `Vuelo`. Para enterarse de los cambios hechos
+por otros procesos compara la versión de la entidad `vuelo` de la caché
+(ver gestion.cache) y, si no coincide con la que tiene aplicada, se
+reconstruye desde la base de datos.
+"""
+import bisect
+import threading
+
+from django.utils import timezone
+
+from . import cache as cache_reportes
+from .models import Vuelo
+
+
+class CatalogoRutas:
+    """Índice (origen, destino) → fechas de salida de vuelos programados"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._version = None
+        # (origen, destino) -> {fecha: cantidad de vuelos}
+        self._conteos = {}
+        # (origen, destino) -> [fechas ordenadas]
+        self._fechas = {}
+        # id de vuelo -> (origen, destino, fecha) tal como está indexado
+        self._vuelos = {}
+
+    # Construcción y mantenimiento
+
+    def _cargar(self):
+        version = cache_reportes.version('vuelo')
+        self._conteos = {}
+        self._fechas = {}
+        self._vuelos = {}
+        programados = Vuelo.objects.filter(estado='programado').values_list(
+            'id', 'origen', 'destino', 'fecha_salida'
+        )
+        for vuelo_id, origen, destino, fecha_salida in programados.iterator():
+            self._agregar(vuelo_id, origen, destino, timezone.localdate(fecha_salida))
+        self._version = version
+
+    def _asegurar_cargado(self):
+        if self._version is None or self._version != cache_reportes.version('vuelo'):
+            self._cargar()
+
+    def _agregar(self, vuelo_id, origen, destino, fecha):
+        ruta = (origen, destino)
+        conteos = self._conteos.setdefault(ruta, {})
+        if fecha not in conteos:
+            conteos[fecha] = 0
+            bisect.insort(self._fechas.setdefault(ruta, []), fecha)
+        conteos[fecha] += 1
+        self._vuelos[vuelo_id] = (origen, destino, fecha)
+
+    def _quitar(self, vuelo_id):
+        indexado = self._vuelos.pop(vuelo_id, None)
+        if indexado is None:
+            return
+        origen, destino, fecha = indexado
+        ruta = (origen, destino)
+        conteos = self._conteos[ruta]
+        conteos[fecha] -= 1
+        if conteos[fecha] == 0:
+            del conteos[fecha]
+            fechas = self._fechas[ruta]
+            del fechas[bisect.bisect_left(fechas, fecha)]
+            if not fechas:
+                del self._conteos[ruta]
+                del self._fechas[ruta]
+
+    def vuelo_guardado(self, vuelo, version):
+        """Aplica el alta o la modificación de un vuelo al índice"""
+        with self._lock:
+            if not self._puede_aplicar(version):
+                return
+            self._quitar(vuelo.id)
+            if vuelo.estado == 'programado':
+                self._agregar(vuelo.id, vuelo.origen, vuelo.destino, timezone.localdate(vuelo.fecha_salida))
+            self._version = version
+
+    def vuelo_eliminado(self, vuelo_id, version):
+        """Quita un vuelo eliminado del índice"""
+        with self._lock:
+            if not self._puede_aplicar(version):
+                return
+            self._quitar(vuelo_id)
+            self._version = version
+
+    def _puede_aplicar(self, version):
+        # Solo se aplica el cambio si el índice estaba al día justo antes de
+        # él; si no, se descarta para reconstruirlo en la próxima consulta.
+        if self._version is not None and version == self._version + 1:
+            return True
+        self._version = None
+        return False
+
+    def invalidar(self):
+        with self._lock:
+            self._version = None
+
+    # Consultas
+
+    def origenes(self):
+        with self._lock:
+            self._asegurar_cargado()
+            return sorted({origen for origen, _ in self._fechas})
+
+    def destinos(self, origen=None):
+        with self._lock:
+            self._asegurar_cargado()
+            return sorted({
+                destino for (o, destino) in self._fechas
+                if origen is None or o == origen
+            })
+
+    def fechas(self, origen=None, destino=None):
+        """Fechas de salida ordenadas, opcionalmente restringidas a una ruta"""
+        with self._lock:
+            self._asegurar_cargado()
+            if origen and destino:
+                return list(self._fechas.get((origen, destino), []))
+            return sorted({
+                fecha
+                for (o, d), fechas in self._fechas.items()
+                if (not origen or o == origen) and (not destino or d == destino)
+                for fecha in fechas
+            })
+
+
+catalogo_rutas = CatalogoRutas()
@@ -0,0 +1,118 @@
+"""
+Snapshot del panel de inicio
+
+La página de inicio muestra totales de vuelos, pasajeros y reservas y los
+próximos vuelos con su disponibilidad. Todo eso se arma en un snapshot de
+datos planos que se guarda en la caché; la vista solo lee el snapshot.
+
+Cuando el snapshot supera su antigüedad máxima o cambian las versiones de
+las entidades de las que depende, se sigue sirviendo la copia existente y
+se reconstruye en un hilo en segundo plano, de modo que ninguna visita
+espera a que se recalculen los conteos.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import cache as cache_reportes
+from .models import Vuelo, Pasajero, Reserva
+
+CLAVE_SNAPSHOT = 'gestion:dashboard:snapshot'
+CLAVE_BLOQUEO = 'gestion:dashboard:reconstruyendo'
+DEPENDENCIAS = ('vuelo', 'reserva', 'pasajero')
+CANTIDAD_VUELOS_PROXIMOS = 5
+
+
+def _ttl():
+    return getattr(settings, 'DASHBOARD_SNAPSHOT_TTL', 30)
+
+
+def construir_snapshot():
+    """Calcula los datos del panel de inicio como estructuras planas"""
+    hoy = timezone.localdate()
+    versiones = cache_reportes.versiones(DEPENDENCIAS)
+
+    vuelos = Vuelo.objects.aggregate(
+        total=Count('id'),
+        hoy=Count('id', filter=Q(fecha_salida__date=hoy)),
+    )
+
+    proximos = Vuelo.objects.filter(
+        fecha_salida__gte=timezone.now(),
+        estado='programado'
+    ).select_related('avion').annotate(
+        reservados=Count('reservas', filter=Q(reservas__estado__in=['confirmada', 'pagada']))
+    ).order_by('fecha_salida')[:CANTIDAD_VUELOS_PROXIMOS]
+
+    vuelos_proximos = [
+        {
+            'id': vuelo.id,
+            'origen': vuelo.origen,
+            'destino': vuelo.destino,
+            'fecha_salida': vuelo.fecha_salida,
+            'estado': vuelo.estado,
+            'estado_display': vuelo.get_estado_display(),
+            'avion': {
+                'modelo': vuelo.avion.modelo,
+                'capacidad': vuelo.avion.capacidad,
+            },
+            'asientos_disponibles': vuelo.avion.capacidad - vuelo.reservados,
+        }
+        for vuelo in proximos
+    ]
+
+    return {
+        'total_vuelos': vuelos['total'],
+        'vuelos_hoy': vuelos['hoy'],
+        'total_pasajeros': Pasajero.objects.count(),
+        'total_reservas': Reserva.objects.count(),
+        'vuelos_proximos': vuelos_proximos,
+        'generado': time.time(),
+        'fecha': hoy,
+        'versiones': versiones,
+    }
+
+
+def _guardar(snapshot):
+    # La caché conserva el snapshot bastante más que su TTL para poder
+    # servir la copia anterior mientras se reconstruye.
+    cache.set(CLAVE_SNAPSHOT, snapshot, _ttl() * 20)
+
+
+def _reconstruir_en_segundo_plano():
+    try:
+        _guardar(construir_snapshot())
+    finally:
+        cache.delete(CLAVE_BLOQUEO)
+        connection.close()
+
+
+def _esta_vencido(snapshot):
+    if time.time() - snapshot['generado'] > _ttl():
+        return True
+    if snapshot['fecha'] != timezone.localdate():
+        return True
+    return snapshot['versiones'] != cache_reportes.versiones(DEPENDENCIAS)
+
+
+def obtener_snapshot():
+    """
+    Devuelve el snapshot del panel de inicio.
+
+    Solo se calcula en el momento si no hay ninguna copia en la caché; si la
+    copia está vencida se devuelve igual y se lanza una reconstrucción.
+    """
+    snapshot = cache.get(CLAVE_SNAPSHOT)
+    if snapshot is None:
+        snapshot = construir_snapshot()
+        _guardar(snapshot)
+        return snapshot
+
+    if _esta_vencido(snapshot) and cache.add(CLAVE_BLOQUEO, True, _ttl()):
+        threading.Thread(target=_reconstruir_en_segundo_plano, daemon=True).start()
+    return snapshot
@@ -0,0 +1,376 @@
+"""
+Datos sintéticos para pruebas de carga
+
+Genera aviones con sus asientos, un cronograma de vuelos, pasajeros,
+reservas y boletos con inserciones masivas (bulk_create), de forma
+reproducible: con la misma semilla y la misma base de partida se obtienen
+los mismos datos.
+
+- Cada avión encadena tramos desde la ciudad donde terminó el anterior,
+  con tiempo de rotación entre tramos, así que los vuelos de un mismo avión
+  nunca se superponen. La red es de tipo hub (Buenos Aires) con algunos
+  tramos punto a punto; la duración y el precio salen de la distancia.
+- Cada vuelo se llena hasta el factor de ocupación pedido (con variación)
+  con asientos y pasajeros distintos elegidos al azar.
+- Se trabaja un día de cronograma por transacción, así la memoria no crece
+  con el volumen total.
+
+bulk_create no llama a save() ni dispara señales: los códigos de reserva y
+de boleto y los asientos se generan acá, y al terminar se incrementan las
+versiones de la caché de reportes (con una caché compartida eso invalida
+también los resultados de los servidores web).
+"""
+import math
+import random
+import string
+import time
+import unicodedata
+from datetime import date, datetime, time as hora, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache as cache_reportes
+from .catalogo import catalogo_rutas
+from .models import Avion, Asiento, Vuelo, Pasajero, Reserva, Boleto, ReservaArchivada, BoletoArchivado
+
+# Ciudad: (latitud, longitud)
+CIUDADES = {
+    'Buenos Aires': (-34.56, -58.42),
+    'Córdoba': (-31.32, -64.21),
+    'Mendoza': (-32.83, -68.79),
+    'Bariloche': (-41.15, -71.16),
+    'Salta': (-24.86, -65.49),
+    'Rosario': (-32.90, -60.78),
+    'Mar del Plata': (-37.93, -57.57),
+    'Tucumán': (-26.84, -65.10),
+    'Neuquén': (-38.95, -68.16),
+    'Ushuaia': (-54.84, -68.30),
+    'Iguazú': (-25.74, -54.47),
+    'Comodoro Rivadavia': (-45.79, -67.47),
+    'Santiago de Chile': (-33.39, -70.79),
+    'Montevideo': (-34.84, -56.03),
+    'São Paulo': (-23.43, -46.47),
+    'Lima': (-12.02, -77.11),
+}
+HUB = 'Buenos Aires'
+
+# Modelo, filas, columnas
+MODELOS_AVION = [
+    ('Boeing 737-800', 30, 6),
+    ('Airbus A320', 28, 6),
+    ('Airbus A321', 36, 6),
+    ('Embraer E190', 25, 4),
+    ('Boeing 787-9', 35, 9),
+    ('Airbus A330', 38, 8),
+]
+
+NOMBRES = [
+    'María', 'José', 'Juan', 'Ana', 'Carlos', 'Lucía', 'Luis', 'Sofía', 'Diego', 'Valentina',
+    'Martín', 'Camila', 'Jorge', 'Florencia', 'Pablo', 'Martina', 'Roberto', 'Julieta', 'Miguel', 'Paula',
+    'Federico', 'Agustina', 'Santiago', 'Carolina', 'Nicolás', 'Victoria', 'Matías', 'Laura', 'Gustavo', 'Silvia',
+    'Facundo', 'Romina', 'Alejandro', 'Natalia', 'Sebastián', 'Gabriela', 'Tomás', 'Mariana', 'Ricardo', 'Elena',
+]
+APELLIDOS = [
+    'González', 'Rodríguez', 'Gómez', 'Fernández', 'López', 'Díaz', 'Martínez', 'Pérez', 'García', 'Sánchez',
+    'Romero', 'Sosa', 'Torres', 'Álvarez', 'Ruiz', 'Ramírez', 'Flores', 'Benítez', 'Acosta', 'Medina',
+    'Herrera', 'Suárez', 'Aguirre', 'Giménez', 'Gutiérrez', 'Pereyra', 'Rojas', 'Molina', 'Castro', 'Ortiz',
+    'Silva', 'Núñez', 'Luna', 'Juárez', 'Cabrera', 'Ríos', 'Morales', 'Ferreyra', 'Godoy', 'Domínguez',
+]
+DOMINIOS = ['gmail.com', 'hotmail.com', 'yahoo.com.ar', 'outlook.com', 'ejemplo.com']
+
+# Estados de reserva y su peso
+ESTADOS_RESERVA = [('pagada', 60), ('confirmada', 25), ('pendiente', 8), ('cancelada', 7)]
+RECARGO_CLASE = {'economica': Decimal('1'), 'ejecutiva': Decimal('2.5'), 'primera': Decimal('4')}
+
+VELOCIDAD_KMH = 750
+ROTACION_MINUTOS = (40, 75)
+TAMANIO_LOTE = 2000
+# Valores por consulta al comprobar códigos contra la base (límite de SQLite)
+LOTE_CONSULTA = 900
+
+
+def distancia_km(origen, destino):
+    (lat1, lon1), (lat2, lon2) = CIUDADES[origen], CIUDADES[destino]
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((fi2 - fi1) / 2) ** 2
+         + math.cos(fi1) * math.cos(fi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+
+def duracion_tramo(origen, destino):
+    """Tiempo de vuelo más rodaje, redondeado a 5 minutos"""
+    minutos = distancia_km(origen, destino) / VELOCIDAD_KMH * 60 + 30
+    return timedelta(minutes=5 * round(minutos / 5))
+
+
+def _sin_acentos(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+
+def _lotes(elementos, tamanio):
+    for inicio in range(0, len(elementos), tamanio):
+        yield elementos[inicio:inicio + tamanio]
+
+
+def _codigos_unicos(cantidad, generar, existentes):
+    """
+    `cantidad` códigos distintos entre sí y que no estén en la base.
+
+    existentes(lote) devuelve los códigos del lote que ya están guardados.
+    Se conserva el orden de generación para que los datos sean reproducibles.
+    """
+    codigos, vistos = [], set()
+    while len(codigos) < cantidad:
+        candidatos = []
+        for _ in range(cantidad - len(codigos)):
+            codigo = generar()
+            if codigo not in vistos:
+                vistos.add(codigo)
+                candidatos.append(codigo)
+        ocupados = set()
+        for lote in _lotes(candidatos, LOTE_CONSULTA):
+            ocupados.update(existentes(lote))
+        codigos += [codigo for codigo in candidatos if codigo not in ocupados]
+    return codigos
+
+
+class GeneradorDatos:
+    """
+    Genera un volumen configurable de datos sintéticos.
+
+    progreso: función opcional progreso(fase, hechos, total) para informar
+    el avance de cada fase.
+    """
+
+    def __init__(self, aviones=20, dias=30, vuelos_por_dia=60, pasajeros=50000,
+                 ocupacion=0.8, semilla=42, desde=None, progreso=None):
+        self.cantidad_aviones = aviones
+        self.dias = dias
+        self.vuelos_por_dia = vuelos_por_dia
+        self.cantidad_pasajeros = pasajeros
+        self.ocupacion = ocupacion
+        self.desde = desde or (timezone.localdate() - timedelta(days=dias // 2))
+        self.rng = random.Random(semilla)
+        self.progreso = progreso or (lambda fase, hechos, total: None)
+        self.totales = {'aviones': 0, 'asientos': 0, 'vuelos': 0, 'pasajeros': 0, 'reservas': 0, 'boletos': 0}
+
+    def generar(self):
+        """Genera todos los datos y devuelve los totales y la duración"""
+        inicio = time.perf_counter()
+        aviones = self.crear_aviones()
+        pasajero_ids = self.crear_pasajeros()
+        self.crear_cronograma(aviones, pasajero_ids)
+
+        cache_reportes.incrementar_version('vuelo', 'reserva', 'pasajero', 'boleto')
+        catalogo_rutas.invalidar()
+
+        segundos = time.perf_counter() - inicio
+        filas = sum(self.totales.values())
+        return {
+            **self.totales,
+            'segundos': round(segundos, 1),
+            'filas_por_segundo': round(filas / segundos) if segundos else 0,
+        }
+
+    # Aviones y asientos
+
+    def crear_aviones(self):
+        """Crea la flota y sus asientos; devuelve una lista de (avion, asientos)"""
+        aviones = []
+        for numero in range(self.cantidad_aviones):
+            modelo, filas, columnas = MODELOS_AVION[numero % len(MODELOS_AVION)]
+            aviones.append(Avion(
+                modelo=f'{modelo} #{numero + 1:03d}', filas=filas, columnas=columnas,
+                capacidad=filas * columnas,
+            ))
+
+        flota = []
+        with transaction.atomic():
+            Avion.objects.bulk_create(aviones)
+            for avion in aviones:
+                asientos = Asiento.objects.bulk_create(self._asientos(avion), batch_size=TAMANIO_LOTE)
+                flota.append((avion, [(asiento.id, asiento.tipo) for asiento in asientos]))
+                self.totales['asientos'] += len(asientos)
+        self.totales['aviones'] = len(aviones)
+        self.progreso('aviones', len(aviones), len(aviones))
+        return flota
+
+    def _asientos(self, avion):
+        # Mismo esquema de numeración que Avion.crear_asientos
+        letras = string.ascii_uppercase
+        fuselaje_ancho = avion.columnas >= 8
+        asientos = []
+        for fila in range(1, avion.filas + 1):
+            if fuselaje_ancho and fila <= 2:
+                tipo = 'primera'
+            elif fila <= (6 if fuselaje_ancho else 3):
+                tipo = 'ejecutiva'
+            else:
+                tipo = 'economica'
+            for columna in range(avion.columnas):
+                letra = letras[columna] if columna < len(letras) else f"A{columna}"
+                asientos.append(Asiento(
+                    avion_id=avion.id, numero=f"{fila}{letra}", fila=fila, columna=letra, tipo=tipo,
+                ))
+        return asientos
+
+    # Pasajeros
+
+    def crear_pasajeros(self):
+        """Crea los pasajeros y devuelve sus ids"""
+        rng = self.rng
+        ids = []
+        for hechos in range(0, self.cantidad_pasajeros, TAMANIO_LOTE):
+            cantidad = min(TAMANIO_LOTE, self.cantidad_pasajeros - hechos)
+            documentos = _codigos_unicos(
+                cantidad, self._documento,
+                lambda lote: Pasajero.objects.filter(documento__in=lote).values_list('documento', flat=True),
+            )
+            lote = []
+            for documento in documentos:
+                nombre, apellido = rng.choice(NOMBRES), rng.choice(APELLIDOS)
+                if documento[0].isalpha():
+                    tipo = 'pasaporte'
+                else:
+                    tipo = 'cedula' if rng.random() < 0.02 else 'dni'
+                lote.append(Pasajero(
+                    nombre=nombre, apellido=apellido, documento=documento, tipo_documento=tipo,
+                    email=(f"{_sin_acentos(nombre).lower()}.{_sin_acentos(apellido).lower()}"
+                           f"{rng.randint(1, 9999)}@{rng.choice(DOMINIOS)}"),
+                    telefono=f"+54 9 11 {rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                    fecha_nacimiento=date(1940, 1, 1) + timedelta(days=rng.randint(0, 75 * 365)),
+                ))
+            with transaction.atomic():
+                ids += [pasajero.id for pasajero in Pasajero.objects.bulk_create(lote)]
+            self.progreso('pasajeros', len(ids), self.cantidad_pasajeros)
+        self.totales['pasajeros'] = len(ids)
+        return ids
+
+    def _documento(self):
+        # Uno de cada doce es un pasaporte, con dos letras delante del número
+        numero = f'{self.rng.randint(10_000_000, 49_999_999)}'
+        if self.rng.random() < 0.08:
+            return ''.join(self.rng.choices(string.ascii_uppercase, k=2)) + numero
+        return numero
+
+    # Vuelos, reservas y boletos
+
+    def crear_cronograma(self, flota, pasajero_ids):
+        """Crea los vuelos día por día y llena cada uno con reservas y boletos"""
+        if not flota:
+            return
+        ahora = timezone.now()
+        # Cada avión empieza en el hub y sigue desde donde aterrizó
+        ubicacion = {avion.id: HUB for avion, _ in flota}
+        disponible_desde = {avion.id: None for avion, _ in flota}
+
+        for dia in range(self.dias):
+            fecha = self.desde + timedelta(days=dia)
+            apertura = timezone.make_aware(datetime.combine(fecha, hora(6, 0)))
+            with transaction.atomic():
+                vuelos = self._vuelos_del_dia(flota, ubicacion, disponible_desde, apertura, ahora)
+                Vuelo.objects.bulk_create([vuelo for vuelo, _ in vuelos], batch_size=TAMANIO_LOTE)
+                self._llenar_vuelos(vuelos, pasajero_ids)
+            self.totales['vuelos'] += len(vuelos)
+            self.progreso('vuelos', dia + 1, self.dias)
+
+    def _vuelos_del_dia(self, flota, ubicacion, disponible_desde, apertura, ahora):
+        rng = self.rng
+        vuelos = []
+        # Los tramos del día se reparten entre los aviones en ronda
+        tramos = [self.vuelos_por_dia // len(flota)] * len(flota)
+        for indice in rng.sample(range(len(flota)), self.vuelos_por_dia % len(flota)):
+            tramos[indice] += 1
+
+        for (avion, asientos), cantidad in zip(flota, tramos):
+            salida = max(disponible_desde[avion.id] or apertura, apertura)
+            salida += timedelta(minutes=5 * rng.randint(0, 18))
+            for _ in range(cantidad):
+                origen = ubicacion[avion.id]
+                destino = self._destino(origen)
+                duracion = duracion_tramo(origen, destino)
+                llegada = salida + duracion
+                vuelos.append((Vuelo(
+                    avion=avion, origen=origen, destino=destino,
+                    fecha_salida=salida, fecha_llegada=llegada, duracion=duracion,
+                    precio_base=self._precio(origen, destino, salida),
+                    estado=self._estado_vuelo(salida, llegada, ahora),
+                ), asientos))
+                ubicacion[avion.id] = destino
+                salida = llegada + timedelta(minutes=rng.randint(*ROTACION_MINUTOS))
+            disponible_desde[avion.id] = salida
+        return vuelos
+
+    def _destino(self, origen):
+        rng = self.rng
+        if origen == HUB:
+            return rng.choice([ciudad for ciudad in CIUDADES if ciudad != HUB])
+        # Desde las demás ciudades la mayoría de los tramos vuelven al hub
+        if rng.random() < 0.8:
+            return HUB
+        return rng.choice([ciudad for ciudad in CIUDADES if ciudad not in (HUB, origen)])
+
+    def _precio(self, origen, destino, salida):
+        precio = 8000 + distancia_km(origen, destino) * 25
+        if salida.weekday() in (4, 6):
+            precio *= 1.15
+        precio *= self.rng.uniform(0.85, 1.15)
+        return Decimal(round(precio, -2))
+
+    def _estado_vuelo(self, salida, llegada, ahora):
+        azar = self.rng.random()
+        if azar < 0.02:
+            return 'cancelado'
+        if llegada < ahora:
+            return 'completado'
+        if salida <= ahora:
+            return 'en_vuelo'
+        return 'retrasado' if azar < 0.05 else 'programado'
+
+    def _llenar_vuelos(self, vuelos, pasajero_ids):
+        rng = self.rng
+        estados, pesos = zip(*ESTADOS_RESERVA)
+        reservas = []
+        for vuelo, asientos in vuelos:
+            ocupacion = min(1.0, self.ocupacion * rng.uniform(0.85, 1.15))
+            cantidad = min(round(len(asientos) * ocupacion), len(pasajero_ids))
+            elegidos = rng.sample(asientos, cantidad)
+            for (asiento_id, tipo), pasajero_id in zip(elegidos, rng.sample(pasajero_ids, cantidad)):
+                estado = 'cancelada' if vuelo.estado == 'cancelado' else rng.choices(estados, pesos)[0]
+                precio = vuelo.precio_base * RECARGO_CLASE[tipo] * Decimal(str(round(rng.uniform(0.9, 1.1), 2)))
+                reservas.append(Reserva(
+                    vuelo_id=vuelo.id, pasajero_id=pasajero_id, asiento_id=asiento_id, estado=estado,
+                    precio=precio.quantize(Decimal('0.01')),
+                    metodo_pago='tarjeta' if rng.random() < 0.7 else 'efectivo',
+                ))
+
+        codigos = _codigos_unicos(
+            len(reservas), lambda: ''.join(rng.choices(string.ascii_uppercase + string.digits, k=6)),
+            lambda lote: [
+                *Reserva.objects.filter(codigo_reserva__in=lote).values_list('codigo_reserva', flat=True),
+                *ReservaArchivada.objects.filter(codigo_reserva__in=lote).values_list('codigo_reserva', flat=True),
+            ],
+        )
+        for reserva, codigo in zip(reservas, codigos):
+            reserva.codigo_reserva = codigo
+        Reserva.objects.bulk_create(reservas, batch_size=TAMANIO_LOTE)
+
+        completados = {vuelo.id for vuelo, _ in vuelos if vuelo.estado == 'completado'}
+        emitidas = [reserva for reserva in reservas if reserva.estado in ('confirmada', 'pagada')]
+        codigos = _codigos_unicos(
+            len(emitidas), lambda: ''.join(rng.choices(string.digits, k=12)),
+            lambda lote: [
+                *Boleto.objects.filter(codigo_barra__in=lote).values_list('codigo_barra', flat=True),
+                *BoletoArchivado.objects.filter(codigo_barra__in=lote).values_list('codigo_barra', flat=True),
+            ],
+        )
+        Boleto.objects.bulk_create([
+            Boleto(reserva_id=reserva.id, codigo_barra=codigo,
+                   estado='usado' if reserva.vuelo_id in completados else 'emitido')
+            for reserva, codigo in zip(emitidas, codigos)
+        ], batch_size=TAMANIO_LOTE)
+
+        self.totales['reservas'] += len(reservas)
+        self.totales['boletos'] += len(emitidas)
@@ -1,7 +1,9 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from .models import Pasajero, Reserva, Vuelo
+from .models import Pasajero, Reserva, Vuelo, Asiento
+from .asientos import mapa_asientos
+from .catalogo import catalogo_rutas
 from datetime import date, datetime
 
 class PasajeroForm(forms.ModelForm):
@@ -38,22 +40,18 @@ class ReservaForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         vuelo_id = kwargs.pop('vuelo_id', None)
+        vuelo = kwargs.pop('vuelo', None)
+        mapa = kwargs.pop('mapa', None)
         super().__init__(*args, **kwargs)
         self.fields['pasajero'].required = False
-        if vuelo_id:
-            try:
-                vuelo = Vuelo.objects.get(id=vuelo_id)
-                self.fields['vuelo'].initial = vuelo
-                self.fields['vuelo'].widget = forms.HiddenInput()
-                asientos_reservados = Reserva.objects.filter(
-                    vuelo=vuelo,
-                    estado__in=['confirmada', 'pagada']
-                ).values_list('asiento_id', flat=True)
-                self.fields['asiento'].queryset = vuelo.avion.asientos.exclude(
-                    id__in=asientos_reservados
-                ).filter(estado='disponible')
-            except Vuelo.DoesNotExist:
-                pass
+        if vuelo is None and vuelo_id:
+            vuelo = Vuelo.objects.select_related('avion').filter(id=vuelo_id).first()
+        if vuelo is not None:
+            if mapa is None:
+                mapa = mapa_asientos(vuelo)
+            self.fields['vuelo'].initial = vuelo
+            self.fields['vuelo'].widget = forms.HiddenInput()
+            self.fields['asiento'].queryset = Asiento.objects.filter(id__in=mapa.ids_disponibles())
 
 class BusquedaVueloForm(forms.Form):
     origen = forms.ChoiceField(choices=[], widget=forms.Select(attrs={'class': 'form-control'}))
@@ -62,10 +60,9 @@ class BusquedaVueloForm(forms.Form):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        vuelos = Vuelo.objects.filter(estado='programado')
-        origenes = sorted(set(v.origen for v in vuelos))
-        destinos = sorted(set(v.destino for v in vuelos))
-        fechas = sorted(set(v.fecha_salida.date() for v in vuelos))
+        origenes = catalogo_rutas.origenes()
+        destinos = catalogo_rutas.destinos()
+        fechas = catalogo_rutas.fechas()
         self.fields['origen'].choices = [('', '---------')] + [(o, o) for o in origenes]
         self.fields['destino'].choices = [('', '---------')] + [(d, d) for d in destinos]
         self.fields['fecha_salida'].choices = [('', '---------')] + [ (f.strftime('%Y-%m-%d'), f.strftime('%d/%m/%Y')) for f in fechas ]
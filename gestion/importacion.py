@@ -0,0 +1,318 @@
+"""
+Importación masiva de vuelos y pasajeros
+
+Los cronogramas llegan del sistema de planificación y los manifiestos de
+pasajeros de las agencias como CSV, JSON Lines o JSON. El archivo se lee
+fila por fila y se procesa en lotes:
+
+- Cada fila se valida con el serializer de importación de la entidad (las
+  reglas del serializer de la API, sin consultas por fila), con un único
+  serializer para todo el archivo.
+- Las filas se identifican por una clave natural: (origen, destino,
+  fecha_salida) para los vuelos y el documento para los pasajeros. Un
+  índice en memoria con la clave y la huella de cada fila detecta las
+  repetidas dentro del archivo.
+- Los registros del lote que ya existen se buscan con una consulta y se
+  actualizan con bulk_update si cambió algo; el resto se crea con
+  bulk_create. Cada lote se guarda en su propia transacción.
+- Los vuelos se verifican además contra la agenda de su avión (ver
+  gestion.rotaciones), cargada una vez por lote.
+
+Las filas con errores no detienen la importación. Cada fila produce un
+resultado (creado, actualizado, sin_cambios, duplicado o error) que se
+puede consumir a medida que se procesa. bulk_create y bulk_update no
+disparan las señales de guardado, así que al terminar cada lote se
+incrementan las versiones de la caché correspondientes.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from rest_framework import serializers
+
+from . import cache as cache_reportes, rotaciones
+from .api.serializers import PasajeroImportacionSerializer, VueloImportacionSerializer
+from .asientos import entidad_vuelo
+from .catalogo import catalogo_rutas
+from .models import Avion, Pasajero, Vuelo
+
+FORMATOS = ('csv', 'jsonl', 'json')
+TAMANIO_LOTE = 500
+RESULTADOS = ('creado', 'actualizado', 'sin_cambios', 'duplicado', 'error')
+
+
+def formato_de(ruta):
+    """Formato según la extensión del archivo"""
+    extension = str(ruta).rsplit('.', 1)[-1].lower()
+    return {'ndjson': 'jsonl'}.get(extension, extension)
+
+
+def leer_filas(archivo, formato):
+    """
+    Genera (número de fila, diccionario) a partir de un archivo de texto.
+
+    CSV y JSON Lines se leen de a una línea; un JSON debe ser una lista de
+    objetos y se carga completo. Las filas se numeran desde 1 sin contar el
+    encabezado del CSV.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}")
+    if formato == 'csv':
+        for numero, fila in enumerate(csv.DictReader(archivo), start=1):
+            # Las celdas vacías cuentan como columnas ausentes
+            yield numero, {campo: valor for campo, valor in fila.items() if campo and valor not in ('', None)}
+    elif formato == 'jsonl':
+        numero = 0
+        for linea in archivo:
+            if not linea.strip():
+                continue
+            numero += 1
+            try:
+                yield numero, json.loads(linea)
+            except json.JSONDecodeError as error:
+                yield numero, {'_error': f"JSON inválido: {error.msg}"}
+    else:
+        datos = json.load(archivo)
+        if not isinstance(datos, list):
+            raise ValueError('El JSON debe ser una lista de objetos')
+        yield from enumerate(datos, start=1)
+
+
+def _lotes(iterable, tamanio):
+    iterador = iter(iterable)
+    while lote := list(islice(iterador, tamanio)):
+        yield lote
+
+
+def mapa_aviones():
+    """Id y modelo de cada avión -> id; los modelos repetidos quedan como 'ambiguo'"""
+    por_modelo, por_id = {}, {}
+    for avion_id, modelo in Avion.objects.values_list('id', 'modelo'):
+        por_modelo[modelo] = 'ambiguo' if modelo in por_modelo else avion_id
+        por_id[str(avion_id)] = avion_id
+    return {**por_modelo, **por_id}
+
+
+class Importador:
+    """
+    Base de los importadores: lotes, validación, repetidos y totales.
+
+    resultados(filas) genera un diccionario por fila con fila, resultado y,
+    según el caso, id (y documento) o datos y errores. importar(filas) los consume,
+    guarda los errores en `errores` y devuelve los totales. Con `simular` se
+    valida y se cuenta qué se crearía y actualizaría sin escribir en la base.
+    """
+
+    def __init__(self, simular=False, tamanio_lote=TAMANIO_LOTE, progreso=None):
+        self.simular = simular
+        self.tamanio_lote = tamanio_lote
+        self.progreso = progreso or (lambda filas: None)
+        self.serializer = self.crear_serializer()
+        # Clave natural -> (número de fila, huella), para detectar repetidos en el archivo
+        self.vistas = {}
+        self.errores = []
+        self.totales = {'filas': 0, **{resultado: 0 for resultado in RESULTADOS}}
+
+    def crear_serializer(self):
+        raise NotImplementedError
+
+    def clave(self, datos):
+        raise NotImplementedError
+
+    def guardar(self, validas):
+        """Guarda las filas válidas del lote y devuelve sus resultados"""
+        raise NotImplementedError
+
+    def resultados(self, filas):
+        for lote in _lotes(filas, self.tamanio_lote):
+            resultados, validas = self._validar(lote)
+            if validas:
+                resultados += self.guardar(validas)
+            for resultado in sorted(resultados, key=lambda resultado: resultado['fila']):
+                self.totales[resultado['resultado']] += 1
+                yield resultado
+            self.progreso(self.totales['filas'])
+
+    def importar(self, filas):
+        inicio = time.perf_counter()
+        for resultado in self.resultados(filas):
+            if resultado['resultado'] == 'error':
+                self.errores.append(resultado)
+        return self.resumen(inicio)
+
+    def resumen(self, inicio):
+        segundos = time.perf_counter() - inicio
+        return {
+            **self.totales,
+            'segundos': round(segundos, 2),
+            'filas_por_segundo': round(self.totales['filas'] / segundos) if segundos else 0,
+        }
+
+    def _error(self, numero, datos, errores):
+        return {'fila': numero, 'resultado': 'error', 'datos': datos, 'errores': errores}
+
+    def repetida(self, numero, datos, anterior, misma_huella):
+        """
+        Resultado de una fila cuya clave ya apareció en el archivo: con los
+        mismos datos es un duplicado y no se vuelve a guardar; con datos
+        distintos es un error.
+        """
+        if misma_huella:
+            return {'fila': numero, 'resultado': 'duplicado', 'fila_original': anterior}
+        return self._error(numero, datos, {
+            'non_field_errors': [f"Registro repetido en el archivo con otros datos (fila {anterior})"]
+        })
+
+    def _validar(self, lote):
+        """Devuelve (resultados de las filas inválidas o repetidas, {clave: (fila, datos validados)})"""
+        resultados, validas = [], {}
+        for numero, datos in lote:
+            self.totales['filas'] += 1
+            if not isinstance(datos, dict):
+                resultados.append(self._error(numero, datos, {'non_field_errors': ['La fila debe ser un objeto']}))
+                continue
+            if '_error' in datos:
+                resultados.append(self._error(numero, None, {'non_field_errors': [datos['_error']]}))
+                continue
+            try:
+                validados = self.serializer.run_validation(datos)
+            except serializers.ValidationError as error:
+                resultados.append(self._error(numero, datos, error.detail))
+                continue
+            clave = self.clave(validados)
+            huella = hash(tuple(sorted(validados.items())))
+            if clave in self.vistas:
+                anterior, huella_anterior = self.vistas[clave]
+                resultados.append(self.repetida(numero, datos, anterior, huella == huella_anterior))
+                continue
+            self.vistas[clave] = (numero, huella)
+            validas[clave] = (numero, validados)
+        return resultados, validas
+
+    def _aplicar(self, existente, campos):
+        """Copia los campos en el registro existente; devuelve si cambió algo"""
+        if all(getattr(existente, campo) == valor for campo, valor in campos.items()):
+            return False
+        for campo, valor in campos.items():
+            setattr(existente, campo, valor)
+        return True
+
+
+class ImportadorVuelos(Importador):
+    """Vuelos por (origen, destino, fecha_salida); el avión se indica por id o modelo"""
+
+    campos_actualizables = ['avion_id', 'fecha_llegada', 'duracion', 'precio_base', 'estado']
+
+    def crear_serializer(self):
+        return VueloImportacionSerializer(context={'aviones': mapa_aviones()})
+
+    def clave(self, datos):
+        return datos['origen'], datos['destino'], datos['fecha_salida']
+
+    def guardar(self, validas):
+        existentes = {}
+        consulta = Vuelo.objects.filter(fecha_salida__in={clave[2] for clave in validas}).order_by('-id')
+        for vuelo in consulta:
+            # Si la base ya tiene vuelos repetidos se actualiza el más antiguo
+            existentes[(vuelo.origen, vuelo.destino, vuelo.fecha_salida)] = vuelo
+
+        # Agendas de los aviones del lote, sin los vuelos que el lote reemplaza;
+        # cada fila se agrega en orden y choca con la base o con filas anteriores
+        agendas = rotaciones.cargar_agendas(
+            {datos['avion'] for _, datos in validas.values()},
+            min(datos['fecha_salida'] for _, datos in validas.values()),
+            max(datos['fecha_llegada'] for _, datos in validas.values()),
+            excluir=[existentes[clave].id for clave in validas if clave in existentes],
+        )
+
+        nuevos, modificados, resultados, errores = [], [], [], []
+        for clave, (numero, datos) in validas.items():
+            if datos.get('estado') != 'cancelado':
+                existente = existentes.get(clave)
+                conflictos = agendas[datos['avion']].agregar(
+                    datos['fecha_salida'], datos['fecha_llegada'],
+                    existente.id if existente else f'la fila {numero} del archivo',
+                )
+                if conflictos:
+                    errores.append(self._error(numero, datos, {'avion': rotaciones.describir(conflictos)}))
+                    continue
+            campos = {
+                'avion_id': datos['avion'],
+                'fecha_llegada': datos['fecha_llegada'],
+                'duracion': datos['fecha_llegada'] - datos['fecha_salida'],
+                'precio_base': datos['precio_base'],
+            }
+            if 'estado' in datos:
+                campos['estado'] = datos['estado']
+            vuelo = existentes.get(clave)
+            if vuelo is None:
+                vuelo = Vuelo(origen=clave[0], destino=clave[1], fecha_salida=clave[2], **campos)
+                nuevos.append(vuelo)
+                resultado = 'creado'
+            elif self._aplicar(vuelo, campos):
+                modificados.append(vuelo)
+                resultado = 'actualizado'
+            else:
+                resultado = 'sin_cambios'
+            resultados.append((numero, resultado, vuelo))
+
+        if not self.simular:
+            with transaction.atomic():
+                Vuelo.objects.bulk_create(nuevos)
+                Vuelo.objects.bulk_update(modificados, self.campos_actualizables)
+            if nuevos or modificados:
+                cache_reportes.incrementar_version('vuelo', *(entidad_vuelo(vuelo.id) for vuelo in modificados))
+                catalogo_rutas.invalidar()
+        return errores + [
+            {'fila': numero, 'resultado': resultado, 'id': vuelo.id}
+            for numero, resultado, vuelo in resultados
+        ]
+
+
+class ImportadorPasajeros(Importador):
+    """Pasajeros por documento"""
+
+    campos_actualizables = ['nombre', 'apellido', 'tipo_documento', 'email', 'telefono', 'fecha_nacimiento']
+
+    def crear_serializer(self):
+        return PasajeroImportacionSerializer()
+
+    def clave(self, datos):
+        return datos['documento']
+
+    def repetida(self, numero, datos, anterior, misma_huella):
+        if misma_huella:
+            return {'fila': numero, 'resultado': 'duplicado', 'documento': datos.get('documento'), 'fila_original': anterior}
+        return self._error(numero, datos, {
+            'documento': [f"Documento repetido en el archivo con otros datos (fila {anterior})"]
+        })
+
+    def guardar(self, validas):
+        existentes = Pasajero.objects.in_bulk(list(validas), field_name='documento')
+
+        nuevos, modificados, resultados = [], [], []
+        for documento, (numero, datos) in validas.items():
+            pasajero = existentes.get(documento)
+            if pasajero is None:
+                pasajero = Pasajero(**datos)
+                nuevos.append(pasajero)
+                resultado = 'creado'
+            elif self._aplicar(pasajero, {campo: valor for campo, valor in datos.items() if campo != 'documento'}):
+                modificados.append(pasajero)
+                resultado = 'actualizado'
+            else:
+                resultado = 'sin_cambios'
+            resultados.append((numero, resultado, pasajero))
+
+        if not self.simular:
+            with transaction.atomic():
+                Pasajero.objects.bulk_create(nuevos)
+                Pasajero.objects.bulk_update(modificados, self.campos_actualizables)
+            if nuevos or modificados:
+                cache_reportes.incrementar_version('pasajero')
+        return [
+            {'fila': numero, 'resultado': resultado, 'documento': pasajero.documento, 'id': pasajero.id}
+            for numero, resultado, pasajero in resultados
+        ]
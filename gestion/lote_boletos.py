@@ -0,0 +1,134 @@
+"""
+Generación de boletos por lote
+
+Genera de una vez los boletos de todas las reservas activas de uno o más
+vuelos, por ejemplo al abrir el check-in:
+
+- Las reservas se cargan con una sola consulta (`pdf.reserva_para_boleto`)
+  y los datos y la huella de cada boleto se calculan en el proceso principal.
+- Los boletos que ya están en la caché en disco con la huella actual se
+  saltean (salvo con `forzar`); el resto se dibuja en un pool de procesos,
+  porque ReportLab es Python puro y con hilos no se aprovecharían los
+  núcleos. Cada proceso escribe sus PDF directamente en la caché.
+- Con destino 'zip' el archivo se arma con los PDF de la caché; con destino
+  'pdf' se dibujan todos los boletos en un único documento (ReportLab no
+  puede unir PDF ya generados, así que ese documento lo arma un solo proceso).
+"""
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+from django.utils import timezone
+
+from . import pdf
+from .models import Reserva
+from .reportes import ESTADOS_RESERVA_ACTIVA
+
+DESTINOS = ('cache', 'zip', 'pdf')
+
+
+def reservas_de_vuelos(vuelo_ids):
+    """Reservas activas de los vuelos, listas para el boleto, en una consulta"""
+    return list(pdf.reserva_para_boleto(
+        Reserva.objects.filter(vuelo_id__in=vuelo_ids, estado__in=ESTADOS_RESERVA_ACTIVA)
+    ).order_by('vuelo_id', 'asiento__fila', 'asiento__columna'))
+
+
+def _renderizar(tarea):
+    reserva_id, huella, datos, generado = tarea
+    pdf.guardar_boleto(reserva_id, huella, pdf.renderizar_boleto(datos, generado))
+    return reserva_id
+
+
+def procesos_por_defecto():
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def generar_boletos(vuelo_ids, destino='cache', salida=None, procesos=None,
+                    forzar=False, progreso=None):
+    """
+    Genera los boletos de las reservas activas de los vuelos.
+
+    destino: 'cache' (solo la caché en disco), 'zip' (además un ZIP con un
+    PDF por reserva en `salida`) o 'pdf' (un único PDF en `salida`).
+    `salida` puede ser una ruta o un archivo binario abierto para escritura.
+    progreso: función opcional progreso(hechos, total) que se llama a medida
+    que se terminan boletos.
+
+    Devuelve un resumen con total, generados, en_cache, segundos y
+    boletos_por_segundo.
+    """
+    if destino not in DESTINOS:
+        raise ValueError(f"Destino inválido: {destino}")
+    if destino != 'cache' and not salida:
+        raise ValueError(f"El destino '{destino}' necesita un archivo de salida")
+
+    inicio = time.perf_counter()
+    generado = timezone.now()
+    reservas = reservas_de_vuelos(vuelo_ids)
+    boletos = [(reserva, pdf.datos_boleto(reserva)) for reserva in reservas]
+    total = len(boletos)
+
+    if destino == 'pdf':
+        contenido = pdf.renderizar_boletos([datos for _, datos in boletos], generado)
+        if hasattr(salida, 'write'):
+            salida.write(contenido)
+        else:
+            with open(salida, 'wb') as archivo:
+                archivo.write(contenido)
+        if progreso:
+            progreso(total, total)
+        return _resumen(total, total, 0, inicio)
+
+    rutas = {}
+    pendientes = []
+    for reserva, datos in boletos:
+        huella = pdf.huella_boleto(datos)
+        rutas[reserva.id] = (reserva.codigo_reserva, pdf.ruta_boleto(reserva.id, huella))
+        if forzar or not rutas[reserva.id][1].exists():
+            pendientes.append((reserva.id, huella, datos, generado))
+
+    en_cache = total - len(pendientes)
+    hechos = en_cache
+    if progreso:
+        progreso(hechos, total)
+
+    procesos = min(procesos or procesos_por_defecto(), len(pendientes) or 1)
+    if procesos == 1:
+        for tarea in pendientes:
+            _renderizar(tarea)
+            hechos += 1
+            if progreso:
+                progreso(hechos, total)
+    else:
+        # Las conexiones abiertas no se pueden compartir con los procesos hijos
+        connections.close_all()
+        tamanio_bloque = max(1, len(pendientes) // (procesos * 4))
+        # Con el método 'spawn' los procesos arrancan sin Django configurado;
+        # DJANGO_SETTINGS_MODULE les llega por el entorno heredado
+        with ProcessPoolExecutor(max_workers=procesos, initializer=django.setup) as pool:
+            for _ in pool.map(_renderizar, pendientes, chunksize=tamanio_bloque):
+                hechos += 1
+                if progreso:
+                    progreso(hechos, total)
+
+    if destino == 'zip':
+        with zipfile.ZipFile(salida, 'w', zipfile.ZIP_DEFLATED) as archivo:
+            for codigo, ruta in rutas.values():
+                archivo.write(ruta, f'reserva_{codigo}.pdf')
+
+    return _resumen(total, len(pendientes), en_cache, inicio)
+
+
+def _resumen(total, generados, en_cache, inicio):
+    segundos = time.perf_counter() - inicio
+    return {
+        'total': total,
+        'generados': generados,
+        'en_cache': en_cache,
+        'segundos': round(segundos, 2),
+        'boletos_por_segundo': round(generados / segundos, 1) if segundos and generados else 0,
+    }
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion import archivo
+
+
+class Command(BaseCommand):
+    help = ('Mueve al archivo las reservas y los boletos de los vuelos que salieron hace más de N días. '
+            'Pensado para ejecutarse periódicamente')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=archivo.DIAS_ARCHIVO,
+                            help='antigüedad mínima de los vuelos, en días desde la salida')
+        parser.add_argument('--lote', type=int, default=archivo.TAMANIO_LOTE,
+                            help='reservas por transacción')
+        parser.add_argument('--simular', action='store_true', help='contar las reservas sin moverlas')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser mayor que cero')
+        if options['lote'] < 1:
+            raise CommandError('--lote debe ser mayor que cero')
+
+        totales = archivo.archivar(
+            dias=options['dias'], tamanio_lote=options['lote'], simular=options['simular'],
+            progreso=self.mostrar_progreso,
+        )
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Simulación: ' if options['simular'] else ''}{totales['reservas']} reservas y "
+            f"{totales['boletos']} boletos de {totales['vuelos']} vuelos archivados en {totales['lotes']} lotes"
+        ))
+
+    def mostrar_progreso(self, totales):
+        self.stdout.write(f"\r{totales['reservas']} reservas", ending='')
+        self.stdout.flush()
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion import programacion
+from gestion.models import PatronVuelo
+
+
+class Command(BaseCommand):
+    help = ('Genera los vuelos de los patrones de vuelo hasta el horizonte indicado y ajusta los ya '
+            'generados a los cambios de cada patrón. Pensado para ejecutarse una vez por día')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patron', type=int, nargs='+', dest='patrones', help='ids de los patrones (por defecto, todos)')
+        parser.add_argument('--dias', type=int, default=programacion.HORIZONTE_DIAS,
+                            help='horizonte en días desde ahora')
+        parser.add_argument('--simular', action='store_true', help='contar los cambios sin guardarlos')
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser mayor que cero')
+        patrones = PatronVuelo.objects.select_related('avion')
+        if options['patrones']:
+            patrones = patrones.filter(id__in=options['patrones'])
+            faltantes = set(options['patrones']) - {patron.id for patron in patrones}
+            if faltantes:
+                raise CommandError(f"No existen los patrones: {', '.join(map(str, sorted(faltantes)))}")
+
+        totales = programacion.expandir(patrones, dias=options['dias'], simular=options['simular'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Simulación: ' if options['simular'] else ''}{totales['patrones']} patrones: "
+            f"{totales['creados']} vuelos creados, {totales['actualizados']} actualizados, "
+            f"{totales['eliminados']} eliminados, {totales['existentes']} ya cargados fuera del patrón"
+        ))
+        if totales['con_reservas']:
+            self.stdout.write(self.style.WARNING(
+                f"{totales['con_reservas']} vuelos con reservas difieren del patrón y no se modificaron"
+            ))
+        if totales['conflictos']:
+            self.stdout.write(self.style.WARNING(
+                f"{totales['conflictos']} vuelos no se crearon ni modificaron porque el avión tiene otro vuelo "
+                f"a esa hora (ver /api/v1/vuelos/conflictos/)"
+            ))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion import lote_boletos, pdf
+from gestion.models import Vuelo
+
+
+class Command(BaseCommand):
+    help = 'Genera los boletos en PDF de todas las reservas activas de uno o más vuelos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('vuelos', nargs='+', type=int, help='ids de los vuelos')
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='procesos en paralelo (por defecto, uno por núcleo hasta 8)')
+        salida = parser.add_mutually_exclusive_group()
+        salida.add_argument('--zip', dest='archivo_zip', help='además, guardar un ZIP con un PDF por reserva')
+        salida.add_argument('--pdf', dest='archivo_pdf', help='guardar todos los boletos en un único PDF')
+        parser.add_argument('--forzar', action='store_true',
+                            help='volver a generar los boletos que ya están en la caché')
+
+    def handle(self, *args, **options):
+        if not pdf.reportlab_disponible:
+            raise CommandError('La librería reportlab no está instalada')
+        vuelos = options['vuelos']
+        faltantes = set(vuelos) - set(Vuelo.objects.filter(id__in=vuelos).values_list('id', flat=True))
+        if faltantes:
+            raise CommandError(f"No existen los vuelos: {', '.join(map(str, sorted(faltantes)))}")
+
+        if options['archivo_zip']:
+            destino, salida = 'zip', options['archivo_zip']
+        elif options['archivo_pdf']:
+            destino, salida = 'pdf', options['archivo_pdf']
+        else:
+            destino, salida = 'cache', None
+
+        resumen = lote_boletos.generar_boletos(
+            vuelos, destino=destino, salida=salida, procesos=options['procesos'],
+            forzar=options['forzar'], progreso=self.mostrar_progreso,
+        )
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumen['total']} boletos: {resumen['generados']} generados, "
+            f"{resumen['en_cache']} ya estaban en la caché, en {resumen['segundos']} s "
+            f"({resumen['boletos_por_segundo']} boletos/s)"
+        ))
+        if salida:
+            self.stdout.write(f"Archivo: {salida}")
+
+    def mostrar_progreso(self, hechos, total):
+        # Alrededor de veinte actualizaciones por lote
+        if hechos != total and hechos % max(1, total // 20):
+            return
+        self.stdout.write(f"\r{hechos}/{total} boletos", ending='')
+        self.stdout.flush()
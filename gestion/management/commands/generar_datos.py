@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.datos_sinteticos import GeneradorDatos
+
+
+class Command(BaseCommand):
+    help = ('Genera datos sintéticos reproducibles (aviones, vuelos, pasajeros, reservas y boletos) '
+            'para pruebas de carga. Se agregan a los existentes: usar una base de prueba')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aviones', type=int, default=20)
+        parser.add_argument('--dias', type=int, default=30, help='días de cronograma')
+        parser.add_argument('--vuelos-por-dia', type=int, default=60)
+        parser.add_argument('--pasajeros', type=int, default=50000)
+        parser.add_argument('--ocupacion', type=float, default=0.8,
+                            help='factor de ocupación medio de los vuelos (0 a 1)')
+        parser.add_argument('--semilla', type=int, default=42,
+                            help='la misma semilla sobre la misma base genera los mismos datos')
+        parser.add_argument('--desde', type=date.fromisoformat, default=None,
+                            help='primer día del cronograma, AAAA-MM-DD (por defecto, hoy menos la mitad de --dias)')
+
+    def handle(self, *args, **options):
+        for opcion in ('aviones', 'dias', 'vuelos_por_dia', 'pasajeros'):
+            if options[opcion] < 1:
+                raise CommandError(f"--{opcion.replace('_', '-')} debe ser mayor que cero")
+        if not 0 <= options['ocupacion'] <= 1:
+            raise CommandError('--ocupacion debe estar entre 0 y 1')
+
+        generador = GeneradorDatos(
+            aviones=options['aviones'], dias=options['dias'], vuelos_por_dia=options['vuelos_por_dia'],
+            pasajeros=options['pasajeros'], ocupacion=options['ocupacion'], semilla=options['semilla'],
+            desde=options['desde'], progreso=self.mostrar_progreso,
+        )
+        resumen = generador.generar()
+        self.stdout.write(self.style.SUCCESS(
+            f"{resumen['aviones']} aviones, {resumen['asientos']} asientos, {resumen['vuelos']} vuelos, "
+            f"{resumen['pasajeros']} pasajeros, {resumen['reservas']} reservas y {resumen['boletos']} boletos "
+            f"en {resumen['segundos']} s ({resumen['filas_por_segundo']} filas/s)"
+        ))
+
+    def mostrar_progreso(self, fase, hechos, total):
+        self.stdout.write(f"\r{fase}: {hechos}/{total}", ending='\n' if hechos == total else '')
+        self.stdout.flush()
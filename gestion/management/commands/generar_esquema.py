@@ -0,0 +1,29 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from aerolineas_efi import esquema
+
+
+class Command(BaseCommand):
+    help = 'Genera el esquema OpenAPI de la API en JSON y YAML para servirlo sin recalcularlo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directorio', default=None,
+                            help='directorio de salida (por defecto, settings.OPENAPI_DIR)')
+
+    def handle(self, *args, **options):
+        directorio = Path(options['directorio'] or settings.OPENAPI_DIR)
+        directorio.mkdir(parents=True, exist_ok=True)
+        for formato, (nombre, _) in esquema.FORMATOS.items():
+            inicio = time.perf_counter()
+            datos = esquema.generar_esquema(formato)
+            ruta = directorio / nombre
+            temporal = ruta.with_suffix(ruta.suffix + '.tmp')
+            temporal.write_bytes(datos)
+            temporal.replace(ruta)
+            self.stdout.write(self.style.SUCCESS(
+                f"{ruta} ({len(datos) / 1024:.1f} KB en {time.perf_counter() - inicio:.2f} s)"
+            ))
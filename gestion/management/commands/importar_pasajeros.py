@@ -0,0 +1,10 @@
+from gestion import importacion
+
+from .importar_vuelos import Command as ImportarVuelos
+
+
+class Command(ImportarVuelos):
+    help = ('Importa pasajeros desde CSV, JSON Lines o JSON (por ejemplo, el manifiesto de una agencia). '
+            'Los pasajeros se identifican por documento: los existentes se actualizan y el resto se crea')
+    importador_class = importacion.ImportadorPasajeros
+    entidad = 'pasajeros'
@@ -0,0 +1,67 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion import importacion
+
+
+class Command(BaseCommand):
+    help = ('Importa un cronograma de vuelos desde CSV, JSON Lines o JSON. Los vuelos se identifican '
+            'por origen, destino y fecha_salida: los existentes se actualizan y el resto se crea')
+    importador_class = importacion.ImportadorVuelos
+    entidad = 'vuelos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help="ruta del archivo, o '-' para leer de la entrada estándar")
+        parser.add_argument('--formato', choices=importacion.FORMATOS,
+                            help='por defecto, según la extensión del archivo')
+        parser.add_argument('--simular', action='store_true',
+                            help='validar y contar los cambios sin guardar nada')
+        parser.add_argument('--reporte', help='guardar las filas con errores en este archivo (JSON Lines)')
+        parser.add_argument('--lote', type=int, default=importacion.TAMANIO_LOTE, help='filas por lote')
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+        formato = options['formato'] or (None if ruta == '-' else importacion.formato_de(ruta))
+        if formato not in importacion.FORMATOS:
+            raise CommandError(f"Indicar --formato ({', '.join(importacion.FORMATOS)})")
+
+        importador = self.importador_class(
+            simular=options['simular'], tamanio_lote=options['lote'], progreso=self.mostrar_progreso
+        )
+        try:
+            if ruta == '-':
+                resumen = importador.importar(importacion.leer_filas(sys.stdin, formato))
+            else:
+                with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+                    resumen = importador.importar(importacion.leer_filas(archivo, formato))
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        self.stdout.write('')
+        estilo = self.style.WARNING if resumen['error'] else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f"{'Simulación: ' if options['simular'] else ''}{resumen['filas']} filas: "
+            f"{resumen['creado']} {self.entidad} creados, {resumen['actualizado']} actualizados, "
+            f"{resumen['sin_cambios']} sin cambios, {resumen['duplicado']} repetidos en el archivo, "
+            f"{resumen['error']} con errores, "
+            f"en {resumen['segundos']} s ({resumen['filas_por_segundo']} filas/s)"
+        ))
+
+        if options['reporte']:
+            with open(options['reporte'], 'w', encoding='utf-8') as reporte:
+                for error in importador.errores:
+                    reporte.write(json.dumps(error, ensure_ascii=False, default=str) + '\n')
+            self.stdout.write(f"Reporte de errores: {options['reporte']}")
+        for error in importador.errores[:20]:
+            detalle = '; '.join(
+                f"{campo}: {' '.join(map(str, mensajes))}" for campo, mensajes in error['errores'].items()
+            )
+            self.stderr.write(f"Fila {error['fila']}: {detalle}")
+        if len(importador.errores) > 20:
+            self.stderr.write(f"... y {len(importador.errores) - 20} errores más")
+
+    def mostrar_progreso(self, filas):
+        self.stdout.write(f"\r{filas} filas", ending='')
+        self.stdout.flush()
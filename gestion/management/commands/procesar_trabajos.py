@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from gestion import trabajos
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de trabajos PDF (boletos y lotes de boletos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='segundos de espera cuando la cola está vacía')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='procesar los trabajos pendientes y terminar')
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='procesos para dibujar los lotes de boletos de un vuelo')
+        parser.add_argument('--tiempo-maximo', type=int, default=600,
+                            help='segundos sin latido tras los que un trabajo en proceso vuelve a la cola')
+        parser.add_argument('--retencion-horas', type=int, default=24,
+                            help='horas que se conservan los trabajos terminados')
+
+    def handle(self, *args, **options):
+        if options['tiempo_maximo'] <= trabajos.LATIDO_SEGUNDOS:
+            raise CommandError(f'--tiempo-maximo debe superar los {trabajos.LATIDO_SEGUNDOS} s del latido')
+        if not options['una_vez']:
+            self.stdout.write('Esperando trabajos PDF (Ctrl+C para terminar)...')
+        procesados = 0
+        try:
+            while True:
+                close_old_connections()
+                trabajo = trabajos.tomar_siguiente()
+                if trabajo is None:
+                    reencolados = trabajos.reencolar_colgados(options['tiempo_maximo'])
+                    if reencolados:
+                        self.stdout.write(self.style.WARNING(f"{reencolados} trabajos colgados vuelven a la cola"))
+                        continue
+                    trabajos.purgar(options['retencion_horas'])
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+
+                inicio = time.perf_counter()
+                propio = trabajos.procesar(trabajo, procesos=options['procesos'])
+                segundos = time.perf_counter() - inicio
+                if not propio:
+                    self.stdout.write(self.style.WARNING(f"{trabajo}: lo tomó otro worker, se descarta el resultado"))
+                    continue
+                procesados += 1
+                if trabajo.estado == 'completado':
+                    self.stdout.write(self.style.SUCCESS(f"{trabajo} en {segundos:.2f} s"))
+                else:
+                    self.stderr.write(f"{trabajo}:\n{trabajo.error}")
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"{procesados} trabajos procesados"))
@@ -0,0 +1,81 @@
+"""
+Índice de texto completo de pasajeros (SQLite FTS5)
+
+Crea la tabla virtual `gestion_pasajero_fts` con contenido externo sobre
+`gestion_pasajero` y los triggers que la mantienen sincronizada en cada
+alta, modificación o baja de pasajeros (incluidas las cargas masivas).
+El tokenizador elimina diacríticos para que las búsquedas no distingan
+acentos. En otros motores, o si SQLite no tiene FTS5, no se crea nada y la
+búsqueda usa los filtros `icontains` de siempre.
+"""
+from django.db import migrations, OperationalError
+
+CREAR = [
+    """
+    CREATE VIRTUAL TABLE gestion_pasajero_fts USING fts5(
+        nombre, apellido, documento, email,
+        content='gestion_pasajero', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER gestion_pasajero_fts_ai AFTER INSERT ON gestion_pasajero BEGIN
+        INSERT INTO gestion_pasajero_fts(rowid, nombre, apellido, documento, email)
+        VALUES (new.id, new.nombre, new.apellido, new.documento, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER gestion_pasajero_fts_ad AFTER DELETE ON gestion_pasajero BEGIN
+        INSERT INTO gestion_pasajero_fts(gestion_pasajero_fts, rowid, nombre, apellido, documento, email)
+        VALUES ('delete', old.id, old.nombre, old.apellido, old.documento, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER gestion_pasajero_fts_au AFTER UPDATE ON gestion_pasajero BEGIN
+        INSERT INTO gestion_pasajero_fts(gestion_pasajero_fts, rowid, nombre, apellido, documento, email)
+        VALUES ('delete', old.id, old.nombre, old.apellido, old.documento, old.email);
+        INSERT INTO gestion_pasajero_fts(rowid, nombre, apellido, documento, email)
+        VALUES (new.id, new.nombre, new.apellido, new.documento, new.email);
+    END
+    """,
+    "INSERT INTO gestion_pasajero_fts(gestion_pasajero_fts) VALUES ('rebuild')",
+]
+
+ELIMINAR = [
+    "DROP TRIGGER IF EXISTS gestion_pasajero_fts_au",
+    "DROP TRIGGER IF EXISTS gestion_pasajero_fts_ad",
+    "DROP TRIGGER IF EXISTS gestion_pasajero_fts_ai",
+    "DROP TABLE IF EXISTS gestion_pasajero_fts",
+]
+
+
+def crear_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_disponible USING fts5(x)")
+            cursor.execute("DROP TABLE temp.fts5_disponible")
+        except OperationalError:
+            return
+    for sentencia in CREAR:
+        schema_editor.execute(sentencia)
+
+
+def eliminar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sentencia in ELIMINAR:
+        schema_editor.execute(sentencia)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0002_reserva_metodo_pago'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
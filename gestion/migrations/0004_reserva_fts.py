@@ -0,0 +1,113 @@
+"""
+Índice de texto completo de reservas (SQLite FTS5)
+
+Crea la tabla virtual `gestion_reserva_fts`, un índice desnormalizado con el
+código de reserva, el nombre y el documento del pasajero y la ruta del
+vuelo, cuyo rowid es el id de la reserva. Lo mantienen triggers sobre
+reservas, pasajeros y vuelos, que solo reescriben la fila cuando cambia
+alguno de los datos indexados. En otros motores, o si SQLite no tiene FTS5,
+no se crea nada y la búsqueda usa los filtros `icontains` de siempre.
+"""
+from django.db import migrations, OperationalError
+
+FILA_RESERVA = """
+    INSERT INTO gestion_reserva_fts(rowid, codigo, pasajero, documento, ruta)
+    SELECT r.id, r.codigo_reserva, p.nombre || ' ' || p.apellido, p.documento,
+           v.origen || ' ' || v.destino
+    FROM gestion_reserva r
+    JOIN gestion_pasajero p ON p.id = r.pasajero_id
+    JOIN gestion_vuelo v ON v.id = r.vuelo_id
+"""
+
+CREAR = [
+    """
+    CREATE VIRTUAL TABLE gestion_reserva_fts USING fts5(
+        codigo, pasajero, documento, ruta,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER gestion_reserva_fts_ai AFTER INSERT ON gestion_reserva BEGIN
+        {FILA_RESERVA} WHERE r.id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER gestion_reserva_fts_ad AFTER DELETE ON gestion_reserva BEGIN
+        DELETE FROM gestion_reserva_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER gestion_reserva_fts_au AFTER UPDATE ON gestion_reserva
+    WHEN old.codigo_reserva IS NOT new.codigo_reserva
+      OR old.pasajero_id IS NOT new.pasajero_id
+      OR old.vuelo_id IS NOT new.vuelo_id
+    BEGIN
+        DELETE FROM gestion_reserva_fts WHERE rowid = old.id;
+        {FILA_RESERVA} WHERE r.id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER gestion_reserva_fts_pasajero_au AFTER UPDATE ON gestion_pasajero
+    WHEN old.nombre IS NOT new.nombre
+      OR old.apellido IS NOT new.apellido
+      OR old.documento IS NOT new.documento
+    BEGIN
+        DELETE FROM gestion_reserva_fts WHERE rowid IN (
+            SELECT id FROM gestion_reserva WHERE pasajero_id = new.id
+        );
+        {FILA_RESERVA} WHERE r.pasajero_id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER gestion_reserva_fts_vuelo_au AFTER UPDATE ON gestion_vuelo
+    WHEN old.origen IS NOT new.origen OR old.destino IS NOT new.destino
+    BEGIN
+        DELETE FROM gestion_reserva_fts WHERE rowid IN (
+            SELECT id FROM gestion_reserva WHERE vuelo_id = new.id
+        );
+        {FILA_RESERVA} WHERE r.vuelo_id = new.id;
+    END
+    """,
+    FILA_RESERVA,
+]
+
+ELIMINAR = [
+    "DROP TRIGGER IF EXISTS gestion_reserva_fts_vuelo_au",
+    "DROP TRIGGER IF EXISTS gestion_reserva_fts_pasajero_au",
+    "DROP TRIGGER IF EXISTS gestion_reserva_fts_au",
+    "DROP TRIGGER IF EXISTS gestion_reserva_fts_ad",
+    "DROP TRIGGER IF EXISTS gestion_reserva_fts_ai",
+    "DROP TABLE IF EXISTS gestion_reserva_fts",
+]
+
+
+def crear_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_disponible USING fts5(x)")
+            cursor.execute("DROP TABLE temp.fts5_disponible")
+        except OperationalError:
+            return
+    for sentencia in CREAR:
+        schema_editor.execute(sentencia)
+
+
+def eliminar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sentencia in ELIMINAR:
+        schema_editor.execute(sentencia)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0003_pasajero_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
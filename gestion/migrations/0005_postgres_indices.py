@@ -0,0 +1,72 @@
+"""
+Índices específicos de PostgreSQL
+
+- Índice único parcial: un asiento no puede tener dos reservas activas
+  (confirmada o pagada) en el mismo vuelo, incluso con reservas simultáneas.
+- BRIN sobre `gestion_vuelo.fecha_salida`: los vuelos se cargan
+  aproximadamente en orden de fecha, así que un índice por rangos de bloques
+  alcanza para los filtros por fecha ocupando una fracción de un B-tree.
+- Trigramas (pg_trgm) sobre los campos de búsqueda de pasajeros, reservas y
+  vuelos, con la misma expresión `UPPER(campo::text)` que genera Django para
+  `icontains`, de modo que esas búsquedas usen el índice.
+
+En SQLite no se crea nada: la búsqueda usa las tablas FTS5 de las
+migraciones 0003 y 0004.
+"""
+from django.db import migrations
+
+CAMPOS_TRIGRAMA = [
+    ('gestion_pasajero', 'nombre'),
+    ('gestion_pasajero', 'apellido'),
+    ('gestion_pasajero', 'documento'),
+    ('gestion_pasajero', 'email'),
+    ('gestion_reserva', 'codigo_reserva'),
+    ('gestion_vuelo', 'origen'),
+    ('gestion_vuelo', 'destino'),
+]
+
+CREAR = [
+    """
+    CREATE UNIQUE INDEX gestion_reserva_asiento_activo_uniq
+    ON gestion_reserva (vuelo_id, asiento_id)
+    WHERE estado IN ('confirmada', 'pagada')
+    """,
+    "CREATE INDEX gestion_vuelo_fecha_salida_brin ON gestion_vuelo USING brin (fecha_salida)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+] + [
+    f"CREATE INDEX {tabla}_{campo}_trgm ON {tabla} USING gin (UPPER({campo}::text) gin_trgm_ops)"
+    for tabla, campo in CAMPOS_TRIGRAMA
+]
+
+ELIMINAR = [
+    f"DROP INDEX IF EXISTS {tabla}_{campo}_trgm"
+    for tabla, campo in CAMPOS_TRIGRAMA
+] + [
+    "DROP INDEX IF EXISTS gestion_vuelo_fecha_salida_brin",
+    "DROP INDEX IF EXISTS gestion_reserva_asiento_activo_uniq",
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sentencia in CREAR:
+        schema_editor.execute(sentencia)
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sentencia in ELIMINAR:
+        schema_editor.execute(sentencia)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0004_reserva_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
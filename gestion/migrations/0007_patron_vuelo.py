@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:17
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0006_trabajo_pdf'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatronVuelo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('origen', models.CharField(max_length=100)),
+                ('destino', models.CharField(max_length=100)),
+                ('dias_semana', models.CharField(default='0123456', help_text='Días en que opera: 0 = lunes ... 6 = domingo. Por ejemplo, 012345 es de lunes a sábado', max_length=7, validators=[django.core.validators.RegexValidator('^[0-6]{1,7}$', 'Use dígitos del 0 (lunes) al 6 (domingo)')])),
+                ('horas_salida', models.CharField(help_text='Horarios de salida, por ejemplo 07:00, 19:30', max_length=200, validators=[django.core.validators.RegexValidator('^\\d{1,2}:\\d{2}( *, *\\d{1,2}:\\d{2})*$', 'Use horarios HH:MM separados por comas')])),
+                ('duracion', models.DurationField()),
+                ('precio_base', models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ('vigente_desde', models.DateField()),
+                ('vigente_hasta', models.DateField(blank=True, help_text='Vacío: sin fecha de fin', null=True)),
+                ('activo', models.BooleanField(default=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+                ('avion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='patrones', to='gestion.avion')),
+            ],
+            options={
+                'verbose_name': 'Patrón de vuelo',
+                'verbose_name_plural': 'Patrones de vuelo',
+                'ordering': ['origen', 'destino'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vuelo',
+            name='patron',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vuelos', to='gestion.patronvuelo'),
+        ),
+    ]
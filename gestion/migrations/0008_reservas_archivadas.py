@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gestion', '0007_patron_vuelo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservaArchivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('confirmada', 'Confirmada'), ('pagada', 'Pagada'), ('cancelada', 'Cancelada'), ('completada', 'Completada')], max_length=20)),
+                ('fecha_reserva', models.DateTimeField()),
+                ('precio', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('metodo_pago', models.CharField(choices=[('tarjeta', 'Tarjeta'), ('efectivo', 'Efectivo')], max_length=20)),
+                ('codigo_reserva', models.CharField(max_length=10, unique=True)),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+                ('asiento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservas_archivadas', to='gestion.asiento')),
+                ('pasajero', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservas_archivadas', to='gestion.pasajero')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservas_archivadas', to=settings.AUTH_USER_MODEL)),
+                ('vuelo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservas_archivadas', to='gestion.vuelo')),
+            ],
+            options={
+                'verbose_name': 'Reserva archivada',
+                'verbose_name_plural': 'Reservas archivadas',
+                'ordering': ['-fecha_reserva'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BoletoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('codigo_barra', models.CharField(max_length=50, unique=True)),
+                ('fecha_emision', models.DateTimeField()),
+                ('estado', models.CharField(choices=[('emitido', 'Emitido'), ('usado', 'Usado'), ('cancelado', 'Cancelado')], max_length=20)),
+                ('reserva', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='boleto', to='gestion.reservaarchivada')),
+            ],
+            options={
+                'verbose_name': 'Boleto archivado',
+                'verbose_name_plural': 'Boletos archivados',
+            },
+        ),
+    ]
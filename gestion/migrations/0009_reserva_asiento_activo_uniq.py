@@ -0,0 +1,43 @@
+"""
+Declara en el modelo el índice único parcial de asientos con reserva activa
+
+En PostgreSQL el índice ya existe desde la migración 0005, así que solo se
+registra en el estado de las migraciones; en los demás motores se crea.
+"""
+from django.db import migrations, models
+
+RESTRICCION = models.UniqueConstraint(
+    fields=['vuelo', 'asiento'],
+    condition=models.Q(estado__in=['confirmada', 'pagada']),
+    name='gestion_reserva_asiento_activo_uniq',
+)
+
+
+def crear_restriccion(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    schema_editor.add_constraint(apps.get_model('gestion', 'Reserva'), RESTRICCION)
+
+
+def eliminar_restriccion(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    schema_editor.remove_constraint(apps.get_model('gestion', 'Reserva'), RESTRICCION)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0008_reservas_archivadas'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(crear_restriccion, eliminar_restriccion),
+            ],
+            state_operations=[
+                migrations.AddConstraint(model_name='reserva', constraint=RESTRICCION),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0009_reserva_asiento_activo_uniq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajopdf',
+            name='latido',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trabajopdf',
+            name='token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
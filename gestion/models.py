@@ -1,6 +1,9 @@
+from datetime import datetime
+
 from django.db import models
 from django.contrib.auth.models import User
-from django.core.validators import MinValueValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator, RegexValidator
 
 class Avion(models.Model):
     modelo = models.CharField(max_length=100)
@@ -37,6 +40,69 @@ class Avion(models.Model):
                     tipo='economica'
                 )
 
+class PatronVuelo(models.Model):
+    """Vuelo recurrente: una ruta que opera ciertos días de la semana a horarios fijos"""
+
+    DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+    origen = models.CharField(max_length=100)
+    destino = models.CharField(max_length=100)
+    avion = models.ForeignKey(Avion, on_delete=models.CASCADE, related_name='patrones')
+    dias_semana = models.CharField(
+        max_length=7, default='0123456',
+        validators=[RegexValidator(r'^[0-6]{1,7}$', 'Use dígitos del 0 (lunes) al 6 (domingo)')],
+        help_text='Días en que opera: 0 = lunes ... 6 = domingo. Por ejemplo, 012345 es de lunes a sábado'
+    )
+    horas_salida = models.CharField(
+        max_length=200,
+        validators=[RegexValidator(r'^\d{1,2}:\d{2}( *, *\d{1,2}:\d{2})*$', 'Use horarios HH:MM separados por comas')],
+        help_text='Horarios de salida, por ejemplo 07:00, 19:30'
+    )
+    duracion = models.DurationField()
+    precio_base = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    vigente_desde = models.DateField()
+    vigente_hasta = models.DateField(null=True, blank=True, help_text='Vacío: sin fecha de fin')
+    activo = models.BooleanField(default=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Patrón de vuelo"
+        verbose_name_plural = "Patrones de vuelo"
+        ordering = ['origen', 'destino']
+
+    def __str__(self):
+        return f"{self.origen} → {self.destino} ({self.descripcion_dias()} {self.horas_salida})"
+
+    def clean(self):
+        errores = {}
+        if self.vigente_hasta and self.vigente_desde and self.vigente_hasta < self.vigente_desde:
+            errores['vigente_hasta'] = 'Debe ser posterior a la fecha de inicio de vigencia'
+        if self.origen and self.origen == self.destino:
+            errores['destino'] = 'El destino debe ser distinto del origen'
+        try:
+            self.horarios()
+        except ValueError:
+            errores['horas_salida'] = 'Hay un horario inválido'
+        if errores:
+            raise ValidationError(errores)
+
+    def dias(self):
+        """Días de la semana en que opera (0 = lunes)"""
+        return {int(dia) for dia in self.dias_semana}
+
+    def horarios(self):
+        """Horarios de salida ordenados"""
+        return sorted(
+            datetime.strptime(hora.strip(), '%H:%M').time()
+            for hora in self.horas_salida.split(',') if hora.strip()
+        )
+
+    def descripcion_dias(self):
+        if self.dias() == set(range(7)):
+            return 'Diario'
+        return ', '.join(self.DIAS_SEMANA[dia][:3] for dia in sorted(self.dias()))
+
 class Vuelo(models.Model):
     ESTADOS_VUELO = [
         ('programado', 'Programado'),
@@ -54,6 +120,8 @@ class Vuelo(models.Model):
     duracion = models.DurationField()
     estado = models.CharField(max_length=20, choices=ESTADOS_VUELO, default='programado')
     precio_base = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    # Patrón que generó el vuelo (ver gestion.programacion); vacío si se cargó a mano
+    patron = models.ForeignKey(PatronVuelo, on_delete=models.SET_NULL, null=True, blank=True, related_name='vuelos')
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -64,6 +132,14 @@ class Vuelo(models.Model):
     def __str__(self):
         return f"{self.origen} → {self.destino} - {self.fecha_salida.strftime('%d/%m/%Y %H:%M')}"
     
+    def clean(self):
+        # Un avión no puede tener vuelos superpuestos ni sin el tiempo mínimo en tierra
+        if self.avion_id and self.fecha_salida and self.fecha_llegada and self.estado != 'cancelado':
+            from .rotaciones import describir, verificar_vuelo
+            conflictos = verificar_vuelo(self.avion_id, self.fecha_salida, self.fecha_llegada, self.pk)
+            if conflictos:
+                raise ValidationError({'avion': describir(conflictos)})
+
     def asientos_disponibles(self):
         total_asientos = self.avion.capacidad
         reservados = self.reservas.filter(estado__in=['confirmada', 'pagada']).count()
@@ -164,6 +240,14 @@ class Reserva(models.Model):
         verbose_name_plural = "Reservas"
         unique_together = ['vuelo', 'pasajero']
         ordering = ['-fecha_reserva']
+        constraints = [
+            # Un asiento no puede tener dos reservas activas en el mismo vuelo
+            models.UniqueConstraint(
+                fields=['vuelo', 'asiento'],
+                condition=models.Q(estado__in=['confirmada', 'pagada']),
+                name='gestion_reserva_asiento_activo_uniq',
+            ),
+        ]
     
     def __str__(self):
         return f"Reserva {self.codigo_reserva} - {self.pasajero.nombre_completo()}"
@@ -178,7 +262,9 @@ class Reserva(models.Model):
         import string
         while True:
             codigo = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            if not Reserva.objects.filter(codigo_reserva=codigo).exists():
+            # Los códigos de las reservas archivadas siguen siendo válidos para buscarlas
+            if not Reserva.objects.filter(codigo_reserva=codigo).exists() and \
+                    not ReservaArchivada.objects.filter(codigo_reserva=codigo).exists():
                 return codigo
 
 class Boleto(models.Model):
@@ -209,5 +295,107 @@ class Boleto(models.Model):
         import random
         while True:
             codigo = ''.join(random.choices('0123456789', k=12))
-            if not Boleto.objects.filter(codigo_barra=codigo).exists():
+            if not Boleto.objects.filter(codigo_barra=codigo).exists() and \
+                    not BoletoArchivado.objects.filter(codigo_barra=codigo).exists():
                 return codigo
+
+class ReservaArchivada(models.Model):
+    """
+    Reserva de un vuelo ya operado, movida fuera de la tabla de reservas por
+    `manage.py archivar_reservas` (ver gestion/archivo.py). Conserva el id,
+    el código y los datos de la reserva original.
+    """
+    archivada = True
+
+    id = models.BigIntegerField(primary_key=True)
+    vuelo = models.ForeignKey(Vuelo, on_delete=models.CASCADE, related_name='reservas_archivadas')
+    pasajero = models.ForeignKey(Pasajero, on_delete=models.CASCADE, related_name='reservas_archivadas')
+    asiento = models.ForeignKey(Asiento, on_delete=models.CASCADE, related_name='reservas_archivadas')
+    estado = models.CharField(max_length=20, choices=Reserva.ESTADOS_RESERVA)
+    fecha_reserva = models.DateTimeField()
+    precio = models.DecimalField(max_digits=10, decimal_places=2)
+    metodo_pago = models.CharField(max_length=20, choices=Reserva.METODOS_PAGO)
+    codigo_reserva = models.CharField(max_length=10, unique=True)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='reservas_archivadas')
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Reserva archivada"
+        verbose_name_plural = "Reservas archivadas"
+        ordering = ['-fecha_reserva']
+
+    def __str__(self):
+        return f"Reserva {self.codigo_reserva} - {self.pasajero.nombre_completo()} (archivada)"
+
+class BoletoArchivado(models.Model):
+    """Boleto de una reserva archivada, con el id y el código de barra originales"""
+    id = models.BigIntegerField(primary_key=True)
+    reserva = models.OneToOneField(ReservaArchivada, on_delete=models.CASCADE, related_name='boleto')
+    codigo_barra = models.CharField(max_length=50, unique=True)
+    fecha_emision = models.DateTimeField()
+    estado = models.CharField(max_length=20, choices=Boleto.ESTADOS_BOLETO)
+
+    class Meta:
+        verbose_name = "Boleto archivado"
+        verbose_name_plural = "Boletos archivados"
+
+    def __str__(self):
+        return f"Boleto {self.codigo_barra} - {self.reserva.codigo_reserva} (archivado)"
+
+class TrabajoPDF(models.Model):
+    TIPOS = [
+        ('boleto', 'Boleto de una reserva'),
+        ('boletos_vuelo', 'Boletos de un vuelo'),
+    ]
+
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En proceso'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+    ]
+
+    FORMATOS = [
+        ('pdf', 'PDF'),
+        ('zip', 'ZIP'),
+    ]
+
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    reserva = models.ForeignKey(Reserva, on_delete=models.CASCADE, null=True, blank=True, related_name='trabajos_pdf')
+    vuelo = models.ForeignKey(Vuelo, on_delete=models.CASCADE, null=True, blank=True, related_name='trabajos_pdf')
+    formato = models.CharField(max_length=3, choices=FORMATOS, default='pdf')
+    # Identifica trabajos equivalentes: mismos parámetros y mismos datos
+    clave = models.CharField(max_length=100, db_index=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    archivo = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    solicitado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='trabajos_pdf')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    # Worker que tiene el trabajo en proceso y última señal de vida que dio
+    token = models.CharField(max_length=32, blank=True)
+    latido = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Trabajo PDF"
+        verbose_name_plural = "Trabajos PDF"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion'], name='trabajo_pdf_cola_idx'),
+        ]
+        constraints = [
+            # Un solo trabajo pendiente o en proceso por clave
+            models.UniqueConstraint(
+                fields=['clave'], condition=models.Q(estado__in=['pendiente', 'en_proceso']),
+                name='trabajo_pdf_activo_unico'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Trabajo {self.id} - {self.get_tipo_display()} ({self.get_estado_display()})"
+
+    def nombre_descarga(self):
+        if self.tipo == 'boleto':
+            return f"reserva_{self.reserva.codigo_reserva}.pdf"
+        return f"boletos_vuelo_{self.vuelo_id}.{self.formato}"
@@ -0,0 +1,23 @@
+"""
+Paginación con total conocido
+
+`Paginator` ejecuta un `COUNT(*)` sobre el queryset completo para calcular el
+número de páginas. Cuando el total ya se conoce (por ejemplo, a partir de las
+facetas cacheadas de vuelos) se puede pasar directamente y evitar esa consulta.
+"""
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class PaginadorConTotal(Paginator):
+    """Paginator que usa un total precalculado si se le proporciona"""
+
+    def __init__(self, object_list, per_page, total=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._total = total
+
+    @cached_property
+    def count(self):
+        if self._total is not None:
+            return self._total
+        return super().count
@@ -0,0 +1,384 @@
+"""
+Boleto electrónico en PDF
+
+La plantilla del boleto se arma en dos pasos: `datos_boleto` pasa una
+reserva (cargada con `reserva_para_boleto`, una sola consulta) a un
+diccionario de textos ya formateados, y `renderizar_boleto` dibuja ese
+diccionario con ReportLab y devuelve los bytes del PDF. Los estilos de
+párrafo y de tabla se crean una sola vez por proceso, la primera vez que se
+genera un boleto.
+
+Los PDF generados se guardan en disco (settings.PDF_CACHE_DIR) bajo el id de
+la reserva y una huella de sus datos. Si cambia cualquier dato que aparece en
+el boleto (reserva, pasajero, asiento o vuelo) cambia la huella y el boleto
+se vuelve a generar; mientras tanto las descargas repetidas solo leen el
+archivo. Las versiones reemplazadas se borran recién MARGEN_VERSIONES
+segundos después, para no quitarle el archivo a una descarga en curso.
+"""
+import functools
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Reserva
+
+# ReportLab se importa recién al dibujar el primer boleto: cargarlo lleva más
+# tiempo que el resto de la aplicación y la mayoría de los procesos (comandos,
+# workers que no sirven PDF) nunca lo usan.
+reportlab_disponible = importlib.util.find_spec('reportlab') is not None
+
+MESES = {
+    1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril',
+    5: 'mayo', 6: 'junio', 7: 'julio', 8: 'agosto',
+    9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
+}
+
+DIAS = {
+    0: 'lunes', 1: 'martes', 2: 'miércoles', 3: 'jueves',
+    4: 'viernes', 5: 'sábado', 6: 'domingo'
+}
+
+METODOS_PAGO = {
+    'tarjeta': 'Tarjeta de crédito/débito',
+    'efectivo': 'Efectivo',
+}
+
+
+def reserva_para_boleto(queryset=None):
+    """Reservas con todo lo que usa el boleto cargado en la misma consulta"""
+    queryset = Reserva.objects.all() if queryset is None else queryset
+    return queryset.select_related('vuelo__avion', 'pasajero', 'asiento', 'boleto')
+
+
+def fecha_en_letras(fecha):
+    fecha = timezone.localtime(fecha)
+    dia_semana = DIAS[fecha.weekday()]
+    return (
+        f"{dia_semana.capitalize()}, {fecha.day} de {MESES[fecha.month]} de {fecha.year}"
+        f" - {fecha.strftime('%H:%M')} hs"
+    )
+
+
+def datos_boleto(reserva):
+    """Textos del boleto de una reserva, listos para renderizar_boleto"""
+    pasajero = reserva.pasajero
+    try:
+        codigo_boleto = reserva.boleto.codigo_barra
+    except Reserva.boleto.RelatedObjectDoesNotExist:
+        codigo_boleto = None
+    return {
+        'codigo_reserva': reserva.codigo_reserva,
+        'ruta': f"{reserva.vuelo.origen} → {reserva.vuelo.destino}",
+        'fecha_vuelo': fecha_en_letras(reserva.vuelo.fecha_salida),
+        'pasajero': [
+            ['Nombre completo:', f"{pasajero.nombre} {pasajero.apellido}"],
+            ['Documento:', f"{pasajero.get_tipo_documento_display()}: {pasajero.documento}"],
+            ['Email:', pasajero.email],
+            ['Teléfono:', pasajero.telefono or '-'],
+        ],
+        'vuelo': [
+            ['Aeronave:', reserva.vuelo.avion.modelo],
+            ['Asiento asignado:', f"**{reserva.asiento.numero}**"],
+            ['Clase:', reserva.asiento.get_tipo_display() or 'Económica'],
+        ],
+        'reserva': [
+            ['Estado:', reserva.get_estado_display()],
+            ['Fecha de emisión:', timezone.localtime(reserva.fecha_reserva).strftime("%d/%m/%Y %H:%M")],
+            ['Tarifa:', f"${reserva.precio}"],
+            ['Forma de pago:', METODOS_PAGO.get(reserva.metodo_pago, 'No especificado')],
+        ],
+        'codigo_boleto': codigo_boleto,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def estilos():
+    """Estilos del boleto, creados una vez por proceso"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+
+    base = getSampleStyleSheet()
+    return {
+        'titulo': ParagraphStyle(
+            'CustomTitle',
+            parent=base['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#1e40af')
+        ),
+        'subtitulo': ParagraphStyle(
+            'CustomSubtitle',
+            parent=base['Heading2'],
+            fontSize=14,
+            spaceAfter=12,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#666666')
+        ),
+        'seccion': ParagraphStyle(
+            'SectionTitle',
+            parent=base['Heading3'],
+            fontSize=12,
+            spaceAfter=8,
+            spaceBefore=16,
+            textColor=colors.HexColor('#1e40af'),
+            borderWidth=1,
+            borderColor=colors.HexColor('#e5e7eb'),
+            borderPadding=5
+        ),
+        'codigo_reserva': ParagraphStyle(
+            'CodigoReserva',
+            parent=base['Normal'],
+            fontSize=16,
+            alignment=TA_CENTER,
+            textColor=colors.white,
+            backColor=colors.HexColor('#dc2626'),
+            borderWidth=1,
+            borderColor=colors.HexColor('#fecaca'),
+            borderPadding=10
+        ),
+        'ruta': ParagraphStyle(
+            'RutaVuelo',
+            parent=base['Normal'],
+            fontSize=16,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#059669'),
+            spaceAfter=12
+        ),
+        'fecha': ParagraphStyle(
+            'FechaVuelo',
+            parent=base['Normal'],
+            fontSize=12,
+            alignment=TA_CENTER
+        ),
+        'codigo_boleto': ParagraphStyle(
+            'CodigoBoleto',
+            parent=base['Normal'],
+            fontSize=14,
+            alignment=TA_CENTER,
+            fontName='Courier-Bold',
+            textColor=colors.black,
+            backColor=colors.HexColor('#f9fafb'),
+            borderWidth=1,
+            borderColor=colors.HexColor('#9ca3af'),
+            borderPadding=10,
+            spaceAfter=8
+        ),
+        'instrucciones_boleto': ParagraphStyle(
+            'BoletoInstr',
+            parent=base['Normal'],
+            fontSize=9,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#666666')
+        ),
+        'pie': ParagraphStyle(
+            'Footer',
+            parent=base['Normal'],
+            fontSize=9,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#6b7280'),
+            borderWidth=1,
+            borderColor=colors.HexColor('#d1d5db'),
+            borderPadding=8
+        ),
+        'tabla': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]),
+    }
+
+
+def _tabla(filas):
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Table
+
+    tabla = Table(filas, colWidths=[4*cm, 10*cm])
+    tabla.setStyle(estilos()['tabla'])
+    return tabla
+
+
+def _contenido_boleto(datos, generado):
+    from reportlab.platypus import Paragraph, Spacer
+
+    e = estilos()
+    story = [
+        Paragraph("AEROÉFI", e['titulo']),
+        Paragraph("Boleto Electrónico / E-Ticket", e['subtitulo']),
+        Spacer(1, 12),
+        Paragraph(f"<b>CÓDIGO DE RESERVA: {datos['codigo_reserva']}</b>", e['codigo_reserva']),
+        Spacer(1, 20),
+        Paragraph(f"<b>{datos['ruta']}</b>", e['ruta']),
+        Paragraph(f"<b>{datos['fecha_vuelo']}</b>", e['fecha']),
+        Spacer(1, 20),
+        Paragraph("INFORMACIÓN DEL PASAJERO", e['seccion']),
+        _tabla(datos['pasajero']),
+        Spacer(1, 20),
+        Paragraph("DETALLES DEL VUELO", e['seccion']),
+        _tabla(datos['vuelo']),
+        Spacer(1, 20),
+        Paragraph("INFORMACIÓN DE LA RESERVA", e['seccion']),
+        _tabla(datos['reserva']),
+        Spacer(1, 20),
+    ]
+
+    if datos['codigo_boleto']:
+        story += [
+            Paragraph("CÓDIGO DE BOLETO", e['seccion']),
+            Paragraph(datos['codigo_boleto'], e['codigo_boleto']),
+            Paragraph("Presente este código en el mostrador de check-in", e['instrucciones_boleto']),
+            Spacer(1, 20),
+        ]
+
+    story += [
+        Spacer(1, 30),
+        Paragraph(
+            f"<b>AeroÉFI</b> - Sistema de Gestión de Aerolíneas<br/>"
+            f"Documento generado el {generado.strftime('%d/%m/%Y %H:%M')}",
+            e['pie']
+        ),
+    ]
+    return story
+
+
+def _construir(story):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate
+
+    salida = io.BytesIO()
+    doc = SimpleDocTemplate(salida, pagesize=A4,
+                            rightMargin=2*cm, leftMargin=2*cm,
+                            topMargin=2*cm, bottomMargin=2*cm)
+    doc.build(story)
+    return salida.getvalue()
+
+
+def renderizar_boleto(datos, generado=None):
+    """
+    Dibuja el boleto a partir de datos_boleto y devuelve el PDF en bytes.
+
+    `generado` es la fecha que se muestra en el pie (por defecto, ahora).
+    """
+    generado = timezone.localtime(generado or timezone.now())
+    return _construir(_contenido_boleto(datos, generado))
+
+
+def renderizar_boletos(lista_datos, generado=None):
+    """Dibuja varios boletos en un único PDF, uno por página"""
+    from reportlab.platypus import PageBreak
+
+    generado = timezone.localtime(generado or timezone.now())
+    story = []
+    for datos in lista_datos:
+        if story:
+            story.append(PageBreak())
+        story += _contenido_boleto(datos, generado)
+    return _construir(story)
+
+
+# Caché en disco
+
+# Segundos que se conserva una versión anterior de un boleto después de reemplazarla
+MARGEN_VERSIONES = 10 * 60
+
+def _directorio_cache():
+    return Path(getattr(settings, 'PDF_CACHE_DIR', Path(settings.BASE_DIR) / 'cache_pdf'))
+
+
+def _directorio_reserva(reserva_id):
+    # Se reparte en subdirectorios para no acumular todas las reservas en uno
+    return _directorio_cache() / f'{reserva_id % 1000:03d}' / str(reserva_id)
+
+
+def huella_boleto(datos):
+    """Huella de los datos del boleto; sirve de nombre de archivo y de ETag"""
+    contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:32]
+
+
+def ruta_boleto(reserva_id, huella):
+    return _directorio_reserva(reserva_id) / f'{huella}.pdf'
+
+
+def guardar_boleto(reserva_id, huella, contenido):
+    """
+    Guarda el PDF de un boleto en la caché y descarta las versiones que
+    fueron reemplazadas hace más de MARGEN_VERSIONES segundos.
+    """
+    ruta = ruta_boleto(reserva_id, huella)
+    directorio = ruta.parent
+    directorio.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+    except BaseException:
+        Path(temporal).unlink(missing_ok=True)
+        raise
+    _descartar_versiones(directorio)
+    return ruta
+
+
+def _descartar_versiones(directorio):
+    # Una versión reemplazada se conserva un tiempo: una descarga concurrente
+    # puede haber obtenido su ruta y estar por abrirla
+    versiones = []
+    for ruta in directorio.glob('*.pdf'):
+        try:
+            versiones.append((ruta.stat().st_mtime, ruta))
+        except FileNotFoundError:
+            continue
+    versiones.sort()
+    limite = time.time() - MARGEN_VERSIONES
+    # Cada versión quedó reemplazada cuando se escribió la siguiente
+    for (_, ruta), (reemplazada, _) in zip(versiones, versiones[1:]):
+        if reemplazada < limite:
+            ruta.unlink(missing_ok=True)
+
+
+def boleto_en_cache(reserva):
+    """
+    Devuelve (ruta, huella) del boleto con los datos actuales de la reserva,
+    sin generarlo: la ruta puede no existir todavía.
+    """
+    huella = huella_boleto(datos_boleto(reserva))
+    return ruta_boleto(reserva.id, huella), huella
+
+
+def obtener_boleto(reserva):
+    """
+    Devuelve (ruta, huella) del PDF del boleto de la reserva, generándolo
+    solo si no hay uno en disco con los datos actuales.
+    """
+    datos = datos_boleto(reserva)
+    huella = huella_boleto(datos)
+    ruta = ruta_boleto(reserva.id, huella)
+    if not ruta.exists():
+        guardar_boleto(reserva.id, huella, renderizar_boleto(datos))
+    return ruta, huella
+
+
+def descartar_boletos(reserva_id):
+    """Elimina los PDF en disco de una reserva"""
+    shutil.rmtree(_directorio_reserva(reserva_id), ignore_errors=True)
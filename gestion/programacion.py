@@ -0,0 +1,161 @@
+"""
+Expansión de patrones de vuelo
+
+Un PatronVuelo describe una ruta que opera ciertos días de la semana a
+horarios fijos dentro de un período de vigencia. expandir() genera los
+vuelos concretos de cada patrón hasta un horizonte (por defecto 90 días)
+y se puede ejecutar todas las veces que haga falta, por ejemplo una vez por
+día desde cron con `manage.py expandir_patrones`, o al guardar un patrón
+desde el admin:
+
+- Se calculan las salidas que el patrón debería tener en el horizonte y se
+  comparan con sus vuelos futuros, cargados con una consulta por patrón.
+- Las salidas que faltan se crean con bulk_create. Si ya hay un vuelo con
+  la misma ruta y horario que no pertenece al patrón (cargado a mano o
+  importado), no se duplica.
+- Los vuelos del patrón cuyo avión, duración o precio ya no coinciden se
+  actualizan con bulk_update, y los que dejaron de corresponder (se quitó
+  un día o un horario, se acortó la vigencia, se desactivó el patrón) se
+  eliminan.
+- Los vuelos que ya tienen reservas no se modifican ni se eliminan; se
+  informan para revisarlos a mano. Los vuelos pasados nunca se tocan.
+- Un vuelo nuevo o modificado que chocaría con otro vuelo del mismo avión
+  (ver gestion.rotaciones) se omite y se informa como conflicto.
+"""
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import cache as cache_reportes, rotaciones
+from .asientos import entidad_vuelo
+from .catalogo import catalogo_rutas
+from .models import PatronVuelo, Vuelo
+
+HORIZONTE_DIAS = 90
+CAMPOS_ACTUALIZABLES = ['avion_id', 'fecha_llegada', 'duracion', 'precio_base']
+
+
+def salidas(patron, desde, hasta):
+    """Fechas y horas de salida del patrón entre dos instantes (desde excluido)"""
+    dias = patron.dias()
+    horarios = patron.horarios()
+    fecha = max(timezone.localtime(desde).date(), patron.vigente_desde)
+    ultima = timezone.localtime(hasta).date()
+    if patron.vigente_hasta:
+        ultima = min(ultima, patron.vigente_hasta)
+    while fecha <= ultima:
+        if fecha.weekday() in dias:
+            for hora in horarios:
+                salida = timezone.make_aware(datetime.combine(fecha, hora))
+                if desde < salida <= hasta:
+                    yield salida
+        fecha += timedelta(days=1)
+
+
+def expandir(patrones=None, dias=HORIZONTE_DIAS, simular=False):
+    """
+    Sincroniza los vuelos futuros de los patrones con su definición.
+
+    patrones: iterable de PatronVuelo (por defecto, todos). Con `simular`
+    solo se cuentan los cambios. Devuelve los totales de vuelos creados,
+    actualizados, eliminados, existentes (ya cargados fuera del patrón),
+    con_reservas (no se tocaron porque tienen reservas) y conflictos (no se
+    crearon ni modificaron porque el avión tiene otro vuelo a esa hora).
+    """
+    if patrones is None:
+        patrones = PatronVuelo.objects.all()
+    desde = timezone.now()
+    hasta = desde + timedelta(days=dias)
+    totales = {
+        'patrones': 0, 'creados': 0, 'actualizados': 0, 'eliminados': 0,
+        'existentes': 0, 'con_reservas': 0, 'conflictos': 0,
+    }
+
+    for patron in patrones:
+        totales['patrones'] += 1
+        nuevos, modificados, sobrantes = _diferencias(patron, desde, hasta, totales)
+        if not simular and (nuevos or modificados or sobrantes):
+            with transaction.atomic():
+                Vuelo.objects.bulk_create(nuevos)
+                Vuelo.objects.bulk_update(modificados, CAMPOS_ACTUALIZABLES)
+                Vuelo.objects.filter(id__in=sobrantes).delete()
+            cache_reportes.incrementar_version('vuelo', *(entidad_vuelo(vuelo.id) for vuelo in modificados))
+            catalogo_rutas.invalidar()
+        totales['creados'] += len(nuevos)
+        totales['actualizados'] += len(modificados)
+        totales['eliminados'] += len(sobrantes)
+    return totales
+
+
+def _diferencias(patron, desde, hasta, totales):
+    """Vuelos a crear, a actualizar e ids a eliminar para que el patrón quede al día"""
+    deseadas = set(salidas(patron, desde, hasta)) if patron.activo else set()
+
+    # Los vuelos del patrón se buscan sin límite superior para encontrar
+    # también los que quedaron fuera de una vigencia o un horizonte más corto
+    vuelos = Vuelo.objects.filter(
+        Q(patron=patron) | Q(origen=patron.origen, destino=patron.destino, fecha_salida__lte=hasta),
+        fecha_salida__gt=desde,
+    ).annotate(cantidad_reservas=Count('reservas'))
+    propios, ajenos = {}, set()
+    for vuelo in vuelos:
+        if vuelo.patron_id == patron.id:
+            propios[vuelo.fecha_salida] = vuelo
+        else:
+            ajenos.add(vuelo.fecha_salida)
+
+    candidatos, quedan, sobrantes = [], [], []
+    for salida in sorted(deseadas):
+        campos = {
+            'avion_id': patron.avion_id,
+            'fecha_llegada': salida + patron.duracion,
+            'duracion': patron.duracion,
+            'precio_base': patron.precio_base,
+        }
+        vuelo = propios.get(salida)
+        if vuelo is None:
+            if salida in ajenos:
+                totales['existentes'] += 1
+            else:
+                candidatos.append(Vuelo(
+                    origen=patron.origen, destino=patron.destino, fecha_salida=salida, patron=patron, **campos
+                ))
+        elif any(getattr(vuelo, campo) != valor for campo, valor in campos.items()):
+            if vuelo.cantidad_reservas:
+                totales['con_reservas'] += 1
+                quedan.append(vuelo)
+                continue
+            for campo, valor in campos.items():
+                setattr(vuelo, campo, valor)
+            candidatos.append(vuelo)
+        else:
+            quedan.append(vuelo)
+
+    for salida, vuelo in propios.items():
+        if salida in deseadas:
+            continue
+        if vuelo.cantidad_reservas:
+            totales['con_reservas'] += 1
+            quedan.append(vuelo)
+        else:
+            sobrantes.append(vuelo.id)
+
+    # Los vuelos nuevos o modificados no pueden chocar con otros vuelos del
+    # avión (ver gestion.rotaciones); los que chocan se informan y se omiten
+    agenda = rotaciones.cargar_agendas(
+        [patron.avion_id], desde, hasta, excluir=[vuelo.id for vuelo in propios.values()]
+    )[patron.avion_id]
+    for vuelo in quedan:
+        if vuelo.avion_id == patron.avion_id and vuelo.estado != 'cancelado':
+            agenda.agregar(vuelo.fecha_salida, vuelo.fecha_llegada, vuelo.id, forzar=True)
+    nuevos, modificados = [], []
+    for vuelo in candidatos:
+        if agenda.agregar(vuelo.fecha_salida, vuelo.fecha_llegada, vuelo.id):
+            totales['conflictos'] += 1
+        elif vuelo.id is None:
+            nuevos.append(vuelo)
+        else:
+            modificados.append(vuelo)
+    return nuevos, modificados, sobrantes
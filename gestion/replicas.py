@@ -0,0 +1,111 @@
+"""
+Réplicas de lectura
+
+Con réplicas configuradas (settings.DATABASE_REPLICAS) las lecturas de las
+peticiones GET, HEAD y OPTIONS se reparten entre ellas y todo lo demás usa la
+base principal:
+
+- Las escrituras siempre van a `default`. Una vez que una petición escribe
+  datos del dominio, el resto de sus lecturas también van a `default`; las
+  escrituras en la caché en base de datos y en las sesiones no cuentan.
+- Tras una petición que escribió, ReplicaMiddleware deja una cookie que fija
+  las peticiones siguientes del mismo navegador a la base principal durante
+  REPLICAS_PRIMARIA_SEGUNDOS, el margen de retraso de replicación tolerado.
+  Así quien acaba de reservar ve su reserva aunque la réplica no la tenga.
+- Fuera de una petición (comandos, hilos en segundo plano) y dentro de
+  transacciones se usa siempre la base principal.
+
+Los resultados de la caché versionada se calculan siempre en la base
+principal (ver en_principal): uno calculado en una réplica atrasada quedaría
+guardado bajo la versión vigente hasta el siguiente cambio, no solo durante
+el retraso de replicación.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+COOKIE_PRIMARIA = 'aeroefi_primaria'
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+# Apps cuyas escrituras no fijan la petición a la base principal
+APPS_SIN_FIJAR = ('django_cache', 'sessions')
+
+# Si las lecturas del contexto actual pueden ir a una réplica
+_lecturas_en_replica = contextvars.ContextVar('lecturas_en_replica', default=False)
+# Si el contexto actual escribió en la base principal
+_escribio = contextvars.ContextVar('escribio', default=False)
+
+
+def replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+@contextmanager
+def en_principal():
+    """Envía a `default` las lecturas hechas dentro del bloque"""
+    token = _lecturas_en_replica.set(False)
+    try:
+        yield
+    finally:
+        _lecturas_en_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Envía las lecturas seguras a una réplica y el resto a `default`"""
+
+    def db_for_read(self, model, **hints):
+        # La caché en base de datos (DatabaseCache) guarda los contadores de
+        # versión: leerla de una réplica atrasada desharía las invalidaciones
+        if model._meta.app_label == 'django_cache':
+            return 'default'
+        if not _lecturas_en_replica.get() or connections['default'].in_atomic_block:
+            return 'default'
+        disponibles = replicas()
+        return random.choice(disponibles) if disponibles else 'default'
+
+    def db_for_write(self, model, **hints):
+        # Las escrituras en la caché en base de datos (versiones, métricas) y
+        # en las sesiones no cambian datos del dominio: no fijan la petición
+        if model._meta.app_label in APPS_SIN_FIJAR:
+            return 'default'
+        _escribio.set(True)
+        _lecturas_en_replica.set(False)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que la principal
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # El esquema de las réplicas llega por replicación
+        return db not in replicas()
+
+
+class ReplicaMiddleware:
+    """Habilita las réplicas para las lecturas de cada petición que lo admita"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        habilitar = (
+            bool(replicas())
+            and request.method in METODOS_LECTURA
+            and COOKIE_PRIMARIA not in request.COOKIES
+        )
+        token_lectura = _lecturas_en_replica.set(habilitar)
+        token_escritura = _escribio.set(False)
+        try:
+            response = self.get_response(request)
+            if replicas() and _escribio.get():
+                response.set_cookie(
+                    COOKIE_PRIMARIA, '1',
+                    max_age=getattr(settings, 'REPLICAS_PRIMARIA_SEGUNDOS', 5),
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            _lecturas_en_replica.reset(token_lectura)
+            _escribio.reset(token_escritura)
@@ -0,0 +1,221 @@
+"""
+Reportes agregados del sistema de aerolíneas
+
+Este módulo contiene las consultas de reportes que agrupan datos de varios
+vuelos a la vez. Cada reporte se resuelve con consultas agrupadas en la base
+de datos en lugar de llamar a los métodos de cada vuelo por separado.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import cache as cache_reportes
+from .models import Vuelo, Reserva
+
+ESTADOS_RESERVA_ACTIVA = ['confirmada', 'pagada']
+
+# Reportes que pasan por la caché versionada (ver gestion.cache)
+REPORTES_CACHEADOS = (
+    'matriz_rutas',
+    'pasajeros_por_vuelo',
+    'reservas_activas_pasajero',
+    'estadisticas_generales',
+    'facetas_vuelos',
+)
+
+
+def calcular_matriz_rutas(fecha_desde, fecha_hasta):
+    """
+    Calcula la matriz origen × destino para las salidas entre dos fechas.
+
+    Se resuelve en una sola consulta agrupada: los asientos vendidos de cada
+    vuelo se obtienen con una subconsulta correlacionada para no multiplicar
+    la capacidad del avión por el número de reservas al agrupar.
+    """
+    vendidos = Reserva.objects.filter(
+        vuelo=OuterRef('pk'),
+        estado__in=ESTADOS_RESERVA_ACTIVA
+    ).order_by().values('vuelo').annotate(total=Count('id')).values('total')
+
+    filas = Vuelo.objects.filter(
+        fecha_salida__date__gte=fecha_desde,
+        fecha_salida__date__lte=fecha_hasta,
+    ).exclude(
+        estado='cancelado'
+    ).annotate(
+        vendidos=Coalesce(Subquery(vendidos, output_field=IntegerField()), 0)
+    ).order_by().values('origen', 'destino').annotate(
+        vuelos=Count('id'),
+        asientos_ofrecidos=Sum('avion__capacidad'),
+        asientos_vendidos=Sum('vendidos'),
+    ).order_by('origen', 'destino')
+
+    matriz = {}
+    totales = {'vuelos': 0, 'asientos_ofrecidos': 0, 'asientos_vendidos': 0}
+    for fila in filas:
+        ofrecidos = fila['asientos_ofrecidos'] or 0
+        vendidos_ruta = fila['asientos_vendidos'] or 0
+        matriz.setdefault(fila['origen'], {})[fila['destino']] = {
+            'vuelos': fila['vuelos'],
+            'asientos_ofrecidos': ofrecidos,
+            'asientos_vendidos': vendidos_ruta,
+            'factor_ocupacion': round(vendidos_ruta / ofrecidos * 100, 2) if ofrecidos else 0,
+        }
+        totales['vuelos'] += fila['vuelos']
+        totales['asientos_ofrecidos'] += ofrecidos
+        totales['asientos_vendidos'] += vendidos_ruta
+
+    totales['factor_ocupacion'] = (
+        round(totales['asientos_vendidos'] / totales['asientos_ofrecidos'] * 100, 2)
+        if totales['asientos_ofrecidos'] else 0
+    )
+
+    return {
+        'fecha_desde': fecha_desde.isoformat(),
+        'fecha_hasta': fecha_hasta.isoformat(),
+        'origenes': sorted(matriz),
+        'destinos': sorted({destino for destinos in matriz.values() for destino in destinos}),
+        'matriz': matriz,
+        'totales': totales,
+    }
+
+
+def matriz_rutas(fecha_desde, fecha_hasta):
+    """Obtiene la matriz de rutas desde la caché o la calcula si no existe"""
+    return cache_reportes.obtener_o_calcular(
+        'matriz_rutas',
+        {'fecha_desde': fecha_desde.isoformat(), 'fecha_hasta': fecha_hasta.isoformat()},
+        ('vuelo', 'reserva'),
+        lambda: calcular_matriz_rutas(fecha_desde, fecha_hasta),
+    )
+
+
+class FacetasVuelos:
+    """
+    Conteos de vuelos por (origen, destino, estado).
+
+    Con estos conteos se arman las opciones de los filtros del listado de
+    vuelos y se obtiene el total de cualquier combinación de filtros sin
+    consultar la base de datos.
+    """
+
+    def __init__(self, filas, solo_programados=False):
+        if solo_programados:
+            filas = [fila for fila in filas if fila[2] == 'programado']
+        self.filas = filas
+
+    def _agrupar(self, posicion):
+        conteos = {}
+        for fila in self.filas:
+            conteos[fila[posicion]] = conteos.get(fila[posicion], 0) + fila[3]
+        return sorted(conteos.items())
+
+    def origenes(self):
+        return self._agrupar(0)
+
+    def destinos(self):
+        return self._agrupar(1)
+
+    def estados(self):
+        conteos = dict(self._agrupar(2))
+        return [
+            (valor, nombre, conteos.get(valor, 0))
+            for valor, nombre in Vuelo.ESTADOS_VUELO
+        ]
+
+    def total(self, origen='', destino='', estado=''):
+        return sum(
+            cantidad for o, d, e, cantidad in self.filas
+            if (not origen or o == origen)
+            and (not destino or d == destino)
+            and (not estado or e == estado)
+        )
+
+
+def calcular_facetas_vuelos():
+    filas = Vuelo.objects.order_by().values_list('origen', 'destino', 'estado').annotate(
+        cantidad=Count('id')
+    )
+    return [tuple(fila) for fila in filas]
+
+
+def facetas_vuelos(solo_programados=False):
+    """Facetas de vuelos desde la caché, invalidadas con cada cambio de vuelos"""
+    filas = cache_reportes.obtener_o_calcular(
+        'facetas_vuelos', {}, ('vuelo',), calcular_facetas_vuelos
+    )
+    return FacetasVuelos(filas, solo_programados)
+
+
+def metricas_cache():
+    """Aciertos y fallos de la caché para cada reporte cacheado"""
+    return cache_reportes.metricas(REPORTES_CACHEADOS)
+
+
+def vuelos_con_manifiesto(origen, horas):
+    """
+    Devuelve los vuelos que salen de un aeropuerto en las próximas horas
+    con sus reservas activas precargadas en el atributo `reservas_activas`.
+
+    Se ejecutan siempre dos consultas (vuelos + reservas con pasajero y
+    asiento) sin importar la cantidad de vuelos.
+    """
+    ahora = timezone.now()
+    reservas_activas = Reserva.objects.filter(
+        estado__in=ESTADOS_RESERVA_ACTIVA
+    ).select_related('pasajero', 'asiento').order_by('asiento__fila', 'asiento__columna')
+
+    return Vuelo.objects.filter(
+        origen=origen,
+        fecha_salida__gte=ahora,
+        fecha_salida__lte=ahora + timedelta(hours=horas),
+    ).exclude(
+        estado='cancelado'
+    ).select_related('avion').prefetch_related(
+        Prefetch('reservas', queryset=reservas_activas, to_attr='reservas_activas')
+    ).order_by('fecha_salida')
+
+
+def manifiestos_salida(origen, horas):
+    """Agrupa los manifiestos por vuelo calculando la ocupación en memoria"""
+    manifiestos = []
+    for vuelo in vuelos_con_manifiesto(origen, horas):
+        ocupados = len(vuelo.reservas_activas)
+        capacidad = vuelo.avion.capacidad
+        manifiestos.append({
+            'vuelo': vuelo,
+            'reservas': vuelo.reservas_activas,
+            'total_pasajeros': ocupados,
+            'asientos_disponibles': capacidad - ocupados,
+            'porcentaje_ocupacion': (ocupados / capacidad) * 100 if capacidad else 0,
+        })
+    return manifiestos
+
+
+COLUMNAS_MANIFIESTO = [
+    'vuelo_id', 'origen', 'destino', 'fecha_salida', 'avion', 'asiento',
+    'apellido', 'nombre', 'tipo_documento', 'documento', 'codigo_reserva', 'estado',
+]
+
+
+def filas_manifiesto(origen, horas, tamanio_lote=100):
+    """
+    Genera las filas del manifiesto para exportación en streaming.
+
+    Los vuelos se recorren por lotes con `iterator()`, de modo que la memoria
+    usada no depende del total de pasajeros del período.
+    """
+    yield COLUMNAS_MANIFIESTO
+    vuelos = vuelos_con_manifiesto(origen, horas).iterator(chunk_size=tamanio_lote)
+    for vuelo in vuelos:
+        salida = timezone.localtime(vuelo.fecha_salida).strftime('%Y-%m-%d %H:%M')
+        for reserva in vuelo.reservas_activas:
+            pasajero = reserva.pasajero
+            yield [
+                vuelo.id, vuelo.origen, vuelo.destino, salida, vuelo.avion.modelo,
+                reserva.asiento.numero, pasajero.apellido, pasajero.nombre,
+                pasajero.get_tipo_documento_display(), pasajero.documento,
+                reserva.codigo_reserva, reserva.estado,
+            ]
@@ -0,0 +1,169 @@
+"""
+Rotación de aviones: superposiciones y tiempo mínimo en tierra
+
+Un avión no puede tener dos vuelos cuyos horarios se superpongan, y entre
+la llegada de un vuelo y la salida del siguiente tiene que pasar al menos
+settings.ROTACION_MINIMA_MINUTOS. Los vuelos cancelados no cuentan.
+
+- AgendaAvion mantiene los vuelos de un avión ordenados por salida. Como
+  una agenda válida no tiene superposiciones, un vuelo nuevo solo puede
+  chocar con el anterior y el siguiente, que se encuentran con una
+  búsqueda binaria: cada verificación cuesta O(log n).
+- cargar_agendas() arma las agendas de varios aviones para una ventana de
+  tiempo con una sola consulta; la usan la validación de un vuelo (modelo y
+  API), la importación de cronogramas y la expansión de patrones.
+- barrido() revisa vuelos ya guardados, que pueden tener conflictos entre
+  sí, en una sola pasada ordenada por avión y salida; lo usa el reporte de
+  conflictos para planificación.
+"""
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+
+from .models import Vuelo
+
+
+def rotacion_minima():
+    return timedelta(minutes=getattr(settings, 'ROTACION_MINIMA_MINUTOS', 30))
+
+
+def _conflicto(tipo, vuelo_id, otro_id, margen):
+    return {
+        'tipo': tipo,
+        'vuelo': vuelo_id,
+        'otro_vuelo': otro_id,
+        # Negativo: minutos de superposición; positivo: minutos en tierra
+        'margen_minutos': round(margen.total_seconds() / 60),
+    }
+
+
+def _comparar(anterior, siguiente, rotacion):
+    """Conflicto entre dos tramos (salida, llegada, id) con anterior.salida <= siguiente.salida"""
+    margen = siguiente[0] - anterior[1]
+    if margen < timedelta(0):
+        return 'superposicion', margen
+    if margen < rotacion:
+        return 'rotacion', margen
+    return None, margen
+
+
+class AgendaAvion:
+    """Vuelos de un avión como tramos (salida, llegada, id) ordenados por salida"""
+
+    def __init__(self, tramos=(), rotacion=None):
+        self.rotacion = rotacion if rotacion is not None else rotacion_minima()
+        self.tramos = sorted(tramos, key=lambda tramo: tramo[:2])
+
+    def __len__(self):
+        return len(self.tramos)
+
+    def conflictos(self, salida, llegada, vuelo_id=None):
+        """Conflictos que tendría el tramo con los vecinos de la agenda"""
+        tramo = (salida, llegada, vuelo_id)
+        posicion = bisect_left(self.tramos, (salida, llegada), key=lambda existente: existente[:2])
+        resultado = []
+        if posicion > 0:
+            anterior = self.tramos[posicion - 1]
+            tipo, margen = _comparar(anterior, tramo, self.rotacion)
+            if tipo:
+                resultado.append(_conflicto(tipo, vuelo_id, anterior[2], margen))
+        if posicion < len(self.tramos):
+            siguiente = self.tramos[posicion]
+            tipo, margen = _comparar(tramo, siguiente, self.rotacion)
+            if tipo:
+                resultado.append(_conflicto(tipo, vuelo_id, siguiente[2], margen))
+        return resultado
+
+    def agregar(self, salida, llegada, vuelo_id=None, forzar=False):
+        """
+        Agrega el tramo si no tiene conflictos y devuelve la lista de
+        conflictos (vacía si se agregó). Con `forzar` se agrega igual; sirve
+        para vuelos que ya existen y se mantienen.
+        """
+        conflictos = [] if forzar else self.conflictos(salida, llegada, vuelo_id)
+        if not conflictos:
+            insort(self.tramos, (salida, llegada, vuelo_id), key=lambda tramo: tramo[:2])
+        return conflictos
+
+
+def cargar_agendas(avion_ids, desde, hasta, excluir=()):
+    """
+    Agendas de los aviones con los vuelos que pueden chocar con tramos entre
+    `desde` y `hasta`, con una consulta. `excluir`: ids de vuelos que no se
+    cargan (por ejemplo, los que se van a reemplazar).
+    """
+    rotacion = rotacion_minima()
+    tramos = {avion_id: [] for avion_id in avion_ids}
+    vuelos = Vuelo.objects.filter(
+        avion_id__in=tramos, fecha_llegada__gt=desde - rotacion, fecha_salida__lt=hasta + rotacion,
+    ).exclude(estado='cancelado').exclude(id__in=list(excluir))
+    for vuelo_id, avion_id, salida, llegada in vuelos.values_list('id', 'avion_id', 'fecha_salida', 'fecha_llegada'):
+        tramos[avion_id].append((salida, llegada, vuelo_id))
+    return {avion_id: AgendaAvion(lista, rotacion) for avion_id, lista in tramos.items()}
+
+
+def verificar_vuelo(avion_id, salida, llegada, vuelo_id=None):
+    """Conflictos de un vuelo (nuevo o modificado) con los demás vuelos de su avión"""
+    agenda = cargar_agendas([avion_id], salida, llegada, excluir=[vuelo_id] if vuelo_id else ())[avion_id]
+    # Si la base ya tiene conflictos el vuelo puede chocar con más de un
+    # vecino: se revisan todos los tramos cargados, que son pocos
+    resultado = []
+    tramo = (salida, llegada, vuelo_id)
+    for existente in agenda.tramos:
+        anterior, siguiente = sorted([existente, tramo], key=lambda t: t[:2])
+        tipo, margen = _comparar(anterior, siguiente, agenda.rotacion)
+        if tipo:
+            resultado.append(_conflicto(tipo, vuelo_id, existente[2], margen))
+    return resultado
+
+
+def describir(conflictos):
+    """Mensajes legibles para errores de validación"""
+    mensajes = []
+    for conflicto in conflictos:
+        otro = conflicto['otro_vuelo']
+        # Los tramos que todavía no están guardados se identifican con un texto
+        otro = f"el vuelo {otro}" if isinstance(otro, int) else otro
+        if conflicto['tipo'] == 'superposicion':
+            mensajes.append(f"El avión ya tiene {otro} en ese horario")
+        else:
+            mensajes.append(
+                f"El avión tiene {otro} con solo {conflicto['margen_minutos']} minutos en tierra "
+                f"(mínimo {int(rotacion_minima().total_seconds() // 60)})"
+            )
+    return mensajes
+
+
+def barrido(vuelos):
+    """
+    Conflictos entre vuelos guardados, en una pasada por avión.
+
+    vuelos: iterable de (id, avion_id, salida, llegada). Cada vuelo se
+    compara con el que llega más tarde entre los anteriores del mismo
+    avión, así se detectan también superposiciones con vuelos largos.
+    """
+    rotacion = rotacion_minima()
+    conflictos = []
+    avion_actual, ultimo = None, None
+    for vuelo_id, avion_id, salida, llegada in sorted(vuelos, key=lambda vuelo: (vuelo[1], vuelo[2], vuelo[3])):
+        tramo = (salida, llegada, vuelo_id)
+        if avion_id != avion_actual:
+            avion_actual, ultimo = avion_id, tramo
+            continue
+        tipo, margen = _comparar(ultimo, tramo, rotacion)
+        if tipo:
+            conflicto = _conflicto(tipo, vuelo_id, ultimo[2], margen)
+            conflicto['avion'] = avion_id
+            conflictos.append(conflicto)
+        if llegada > ultimo[1]:
+            ultimo = tramo
+    return conflictos
+
+
+def conflictos_programados(desde, hasta, avion_id=None):
+    """Conflictos entre los vuelos no cancelados que salen entre `desde` y `hasta`"""
+    vuelos = Vuelo.objects.filter(fecha_salida__gte=desde, fecha_salida__lt=hasta).exclude(estado='cancelado')
+    if avion_id:
+        vuelos = vuelos.filter(avion_id=avion_id)
+    return barrido(vuelos.values_list('id', 'avion_id', 'fecha_salida', 'fecha_llegada'))
@@ -0,0 +1,86 @@
+"""
+Señales de la aplicación gestion
+
+Incrementan los contadores de versión de la caché de reportes cada vez que
+se guarda o elimina una entidad, de modo que los resultados que dependen de
+ella dejen de servirse. Cada vuelo tiene además su propia versión, que
+cambia con el vuelo y con sus reservas, y cada avión una versión de sus
+asientos; las usan el mapa de asientos y los fragmentos de plantilla
+cacheados. Los cambios de vuelos se aplican también al catálogo de rutas en
+memoria, y al eliminar una reserva se borran sus boletos PDF guardados en
+disco. El incremento se hace al confirmar la transacción para que ninguna
+lectura concurrente cachee datos previos al cambio con la versión nueva.
+
+También se configura cada conexión SQLite nueva con los pragmas de
+SQLITE_PRAGMAS, si el entorno los define.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import cache as cache_reportes, pdf
+from .asientos import entidad_avion, entidad_vuelo
+from .catalogo import catalogo_rutas
+from .models import Vuelo, Reserva, Pasajero, Boleto, Asiento
+
+
+@receiver(post_save, sender=Vuelo)
+def vuelo_guardado(sender, instance, **kwargs):
+    def aplicar():
+        version = cache_reportes.incrementar_version('vuelo', entidad_vuelo(instance.id))['vuelo']
+        catalogo_rutas.vuelo_guardado(instance, version)
+    transaction.on_commit(aplicar)
+
+
+@receiver(post_delete, sender=Vuelo)
+def vuelo_eliminado(sender, instance, **kwargs):
+    vuelo_id = instance.id
+
+    def aplicar():
+        version = cache_reportes.incrementar_version('vuelo')['vuelo']
+        catalogo_rutas.vuelo_eliminado(vuelo_id, version)
+    transaction.on_commit(aplicar)
+
+
+@receiver(post_save, sender=Reserva)
+@receiver(post_delete, sender=Reserva)
+def reserva_modificada(sender, instance, **kwargs):
+    vuelo = entidad_vuelo(instance.vuelo_id)
+    transaction.on_commit(lambda: cache_reportes.incrementar_version('reserva', vuelo))
+
+
+@receiver(post_delete, sender=Reserva)
+def reserva_eliminada(sender, instance, **kwargs):
+    reserva_id = instance.id
+    transaction.on_commit(lambda: pdf.descartar_boletos(reserva_id))
+
+
+@receiver(post_save, sender=Pasajero)
+@receiver(post_delete, sender=Pasajero)
+def pasajero_modificado(sender, **kwargs):
+    transaction.on_commit(lambda: cache_reportes.incrementar_version('pasajero'))
+
+
+@receiver(post_save, sender=Boleto)
+@receiver(post_delete, sender=Boleto)
+def boleto_modificado(sender, **kwargs):
+    transaction.on_commit(lambda: cache_reportes.incrementar_version('boleto'))
+
+
+@receiver(post_save, sender=Asiento)
+@receiver(post_delete, sender=Asiento)
+def asiento_modificado(sender, instance, **kwargs):
+    avion = entidad_avion(instance.avion_id)
+    transaction.on_commit(lambda: cache_reportes.incrementar_version(avion))
+
+
+@receiver(connection_created)
+def configurar_sqlite(sender, connection, **kwargs):
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for nombre, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nombre} = {valor}')
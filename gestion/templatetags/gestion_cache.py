@@ -0,0 +1,31 @@
+"""
+Etiquetas para armar las claves de `{% cache %}` de los fragmentos
+
+Devuelven las versiones de la caché versionada (ver gestion.cache) de las
+que depende cada fragmento, de modo que un fragmento cacheado deja de usarse
+en cuanto cambia el vuelo, sus reservas o los asientos de su avión.
+
+    {% load cache gestion_cache %}
+    {% version_vuelo vuelo.id as version %}
+    {% cache 3600 fila_vuelo vuelo.id version LANGUAGE_CODE %}...{% endcache %}
+"""
+from django import template
+
+from .. import cache as cache_reportes
+from ..asientos import entidad_avion, entidad_vuelo
+
+register = template.Library()
+
+
+@register.simple_tag
+def version_vuelo(vuelo_id):
+    """Versión que cambia con el vuelo y con sus reservas"""
+    return cache_reportes.version(entidad_vuelo(vuelo_id))
+
+
+@register.simple_tag
+def version_mapa_asientos(vuelo):
+    """Versión del mapa de asientos: reservas del vuelo y asientos del avión"""
+    entidades = (entidad_vuelo(vuelo.id), entidad_avion(vuelo.avion_id))
+    vigentes = cache_reportes.versiones(entidades)
+    return '-'.join(str(vigentes[entidad]) for entidad in entidades)
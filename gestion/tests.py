@@ -0,0 +1,167 @@
+from datetime import date, datetime, timedelta, timezone as tz
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import rotaciones
+from .importacion import ImportadorPasajeros, ImportadorVuelos
+from .models import Asiento, Avion, Pasajero, Reserva, Vuelo
+
+
+def hora(horas, minutos=0):
+    return datetime(2030, 1, 1, tzinfo=tz.utc) + timedelta(hours=horas, minutes=minutos)
+
+
+@override_settings(ROTACION_MINIMA_MINUTOS=30)
+class AgendaAvionTests(SimpleTestCase):
+    def setUp(self):
+        self.agenda = rotaciones.AgendaAvion([(hora(8), hora(10), 1), (hora(14), hora(16), 2)])
+
+    def test_agrega_tramo_con_rotacion_suficiente(self):
+        self.assertEqual(self.agenda.agregar(hora(10, 30), hora(13, 30), 3), [])
+        self.assertEqual([tramo[2] for tramo in self.agenda.tramos], [1, 3, 2])
+
+    def test_superposicion(self):
+        conflictos = self.agenda.agregar(hora(9), hora(11), 3)
+        self.assertEqual(conflictos, [{'tipo': 'superposicion', 'vuelo': 3, 'otro_vuelo': 1, 'margen_minutos': -60}])
+        self.assertEqual(len(self.agenda), 2)
+
+    def test_rotacion_minima(self):
+        conflictos = self.agenda.conflictos(hora(10, 20), hora(13, 50), 3)
+        self.assertEqual(
+            [(conflicto['tipo'], conflicto['otro_vuelo'], conflicto['margen_minutos']) for conflicto in conflictos],
+            [('rotacion', 1, 20), ('rotacion', 2, 10)]
+        )
+
+    def test_forzar_agrega_con_conflictos(self):
+        self.assertEqual(self.agenda.agregar(hora(9), hora(11), 3, forzar=True), [])
+        self.assertEqual(len(self.agenda), 3)
+
+    def test_barrido_detecta_superposicion_con_vuelo_largo(self):
+        conflictos = rotaciones.barrido([
+            (1, 'A', hora(0), hora(10)),
+            (2, 'A', hora(2), hora(3)),
+            (3, 'A', hora(4), hora(5)),
+            (4, 'B', hora(4), hora(5)),
+        ])
+        self.assertEqual([(conflicto['vuelo'], conflicto['otro_vuelo']) for conflicto in conflictos], [(2, 1), (3, 1)])
+        self.assertTrue(all(conflicto['tipo'] == 'superposicion' for conflicto in conflictos))
+
+    def test_barrido_rotacion(self):
+        conflictos = rotaciones.barrido([(1, 'A', hora(8), hora(10)), (2, 'A', hora(10, 15), hora(12))])
+        self.assertEqual(conflictos, [
+            {'tipo': 'rotacion', 'vuelo': 2, 'otro_vuelo': 1, 'margen_minutos': 15, 'avion': 'A'}
+        ])
+
+
+@override_settings(ROTACION_MINIMA_MINUTOS=30)
+class ImportacionVuelosTests(TestCase):
+    def setUp(self):
+        self.avion = Avion.objects.create(modelo='A320', capacidad=4, filas=2, columnas=2)
+
+    def fila(self, salida, llegada, **campos):
+        return {
+            'origen': 'Mendoza', 'destino': 'Córdoba', 'avion': 'A320', 'precio_base': '100.00',
+            'fecha_salida': salida.isoformat(), 'fecha_llegada': llegada.isoformat(), **campos,
+        }
+
+    def importar(self, *filas):
+        importador = ImportadorVuelos()
+        return [resultado['resultado'] for resultado in importador.resultados(enumerate(filas, start=1))]
+
+    def test_creado_duplicado_y_repetido_con_otros_datos(self):
+        fila = self.fila(hora(8), hora(10))
+        resultados = self.importar(fila, dict(fila), {**fila, 'precio_base': '200.00'})
+        self.assertEqual(resultados, ['creado', 'duplicado', 'error'])
+        self.assertEqual(Vuelo.objects.count(), 1)
+
+    def test_actualizado_y_sin_cambios(self):
+        self.importar(self.fila(hora(8), hora(10)))
+        self.assertEqual(self.importar(self.fila(hora(8), hora(10), precio_base='150.00')), ['actualizado'])
+        self.assertEqual(self.importar(self.fila(hora(8), hora(10), precio_base='150.00')), ['sin_cambios'])
+        self.assertEqual(str(Vuelo.objects.get().precio_base), '150.00')
+
+    def test_fila_invalida(self):
+        self.assertEqual(self.importar(self.fila(hora(10), hora(8)), self.fila(hora(8), hora(10), avion='B737')),
+                         ['error', 'error'])
+
+    def test_rotacion_contra_la_base_y_el_mismo_archivo(self):
+        self.importar(self.fila(hora(8), hora(10)))
+        resultados = self.importar(
+            self.fila(hora(9), hora(11), destino='Salta'),
+            self.fila(hora(12), hora(14), destino='Jujuy'),
+            self.fila(hora(14, 10), hora(16), destino='Neuquén'),
+        )
+        self.assertEqual(resultados, ['error', 'creado', 'error'])
+
+    def test_cancelado_no_ocupa_el_avion(self):
+        self.importar(self.fila(hora(8), hora(10)))
+        self.assertEqual(self.importar(self.fila(hora(9), hora(11), destino='Salta', estado='cancelado')), ['creado'])
+
+
+class ImportacionPasajerosTests(TestCase):
+    fila = {
+        'documento': '30111222', 'tipo_documento': 'dni', 'nombre': 'Ana', 'apellido': 'Pérez',
+        'email': 'ana@example.com', 'telefono': '2615550000', 'fecha_nacimiento': '1990-05-01',
+    }
+
+    def importar(self, *filas):
+        return list(ImportadorPasajeros().resultados(enumerate(filas, start=1)))
+
+    def test_resultados(self):
+        resultados = self.importar(self.fila, dict(self.fila), {**self.fila, 'nombre': 'Ana María'}, {'documento': '1'})
+        self.assertEqual([resultado['resultado'] for resultado in resultados], ['creado', 'duplicado', 'error', 'error'])
+        self.assertEqual(resultados[1]['fila_original'], 1)
+        self.assertIn('documento', resultados[2]['errores'])
+
+        resultados = self.importar({**self.fila, 'telefono': '2615551111'}, {**self.fila, 'documento': '30111333'})
+        self.assertEqual([resultado['resultado'] for resultado in resultados], ['actualizado', 'creado'])
+        self.assertEqual(Pasajero.objects.get(documento='30111222').telefono, '2615551111')
+
+
+class BusquedaApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        avion = Avion.objects.create(modelo='A320', capacidad=4, filas=2, columnas=2)
+        vuelo = Vuelo.objects.create(
+            avion=avion, origen='Mendoza', destino='Ushuaia', fecha_salida=hora(8), fecha_llegada=hora(12),
+            duracion=timedelta(hours=4), precio_base=100,
+        )
+        cls.pasajero = Pasajero.objects.create(
+            nombre='Lucía', apellido='Fernández', documento='28765432', email='lucia.fernandez@example.com',
+            telefono='2615550000', fecha_nacimiento=date(1985, 3, 2),
+        )
+        Pasajero.objects.create(
+            nombre='Juan', apellido='Gómez', documento='40123456', email='juan@example.com',
+            telefono='2615550001', fecha_nacimiento=date(1992, 7, 9),
+        )
+        cls.reserva = Reserva.objects.create(
+            vuelo=vuelo, pasajero=cls.pasajero, asiento=Asiento.objects.filter(avion=avion).first(),
+            estado='confirmada', precio=100, metodo_pago='tarjeta',
+        )
+        cls.admin = User.objects.create_user('admin_busqueda', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def cantidad(self, url, busqueda):
+        datos = self.client.get(url, {'search': busqueda}).json()
+        return datos['count'] if isinstance(datos, dict) else len(datos)
+
+    def test_pasajeros(self):
+        url = '/api/v1/pasajeros/'
+        self.assertEqual(self.cantidad(url, 'Fern'), 1)
+        self.assertEqual(self.cantidad(url, 'lucia'), 1)
+        self.assertEqual(self.cantidad(url, '65432'), 1)
+        self.assertEqual(self.cantidad(url, 'fernandez@exam'), 1)
+        self.assertEqual(self.cantidad(url, 'Lucía 5432'), 1)
+        self.assertEqual(self.cantidad(url, 'Juan 5432'), 0)
+
+    def test_reservas(self):
+        url = '/api/v1/reservas/'
+        self.assertEqual(self.cantidad(url, self.reserva.codigo_reserva[2:]), 1)
+        self.assertEqual(self.cantidad(url, '65432'), 1)
+        self.assertEqual(self.cantidad(url, 'Ushu'), 1)
+        self.assertEqual(self.cantidad(url, 'Gómez'), 0)
@@ -0,0 +1,192 @@
+"""
+Cola de trabajos PDF
+
+Los PDF que no conviene dibujar dentro de una petición (el boleto de una
+reserva que todavía no está en la caché, los boletos de un vuelo entero) se
+encolan como filas de TrabajoPDF y los genera un proceso aparte:
+
+    python manage.py procesar_trabajos
+
+No hace falta ningún broker: el worker consulta la tabla cada pocos segundos
+y toma el trabajo pendiente más antiguo con un UPDATE condicionado al estado,
+de modo que varios workers pueden convivir sin tomar el mismo trabajo.
+
+Al tomar un trabajo el worker le asigna un token propio y, mientras lo
+procesa, renueva su `latido` cada LATIDO_SEGUNDOS. Solo vuelven a la cola
+los trabajos cuyo latido se detuvo (worker caído), y el resultado se guarda
+únicamente si el trabajo sigue en manos del token que lo tomó.
+
+Cada trabajo tiene una clave formada por sus parámetros y la huella de los
+datos que va a dibujar. Pedir otra vez el mismo PDF con los mismos datos
+devuelve el trabajo existente (pendiente, en proceso o ya completado) en
+lugar de encolar uno nuevo.
+"""
+import hashlib
+import threading
+import traceback
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import lote_boletos, pdf
+from .models import TrabajoPDF
+
+ESTADOS_ACTIVOS = ('pendiente', 'en_proceso')
+
+# Cada cuántos segundos un worker confirma que sigue procesando su trabajo
+LATIDO_SEGUNDOS = 30
+
+
+def _directorio_trabajos():
+    return Path(settings.PDF_CACHE_DIR) / 'trabajos'
+
+
+def _vigente(clave):
+    """Trabajo equivalente pendiente, en proceso o completado con su archivo, o None"""
+    existentes = TrabajoPDF.objects.filter(clave=clave, estado__in=ESTADOS_ACTIVOS + ('completado',))
+    for trabajo in existentes.order_by('-fecha_creacion'):
+        if trabajo.estado != 'completado' or Path(trabajo.archivo).exists():
+            return trabajo
+    return None
+
+
+def _encolar(clave, intentos=3, **campos):
+    """Devuelve el trabajo equivalente vigente o crea uno nuevo"""
+    for _ in range(intentos):
+        trabajo = _vigente(clave)
+        if trabajo is not None:
+            return trabajo, False
+        try:
+            with transaction.atomic():
+                return TrabajoPDF.objects.create(clave=clave, **campos), True
+        except IntegrityError:
+            # Otra petición encoló el mismo trabajo al mismo tiempo; puede que
+            # ya haya terminado (o fallado), así que se vuelve a buscar
+            continue
+    raise RuntimeError(f'No se pudo encolar el trabajo {clave}')
+
+
+def encolar_boleto(reserva, usuario=None, huella=None):
+    """Encola el boleto de una reserva; devuelve (trabajo, creado)"""
+    huella = huella or pdf.boleto_en_cache(reserva)[1]
+    return _encolar(
+        f'boleto:{reserva.id}:{huella}',
+        tipo='boleto', reserva=reserva, solicitado_por=usuario,
+    )
+
+
+def encolar_boletos_vuelo(vuelo, formato='zip', usuario=None):
+    """Encola los boletos de todo un vuelo en un ZIP o un PDF; devuelve (trabajo, creado)"""
+    huellas = ''.join(
+        pdf.huella_boleto(pdf.datos_boleto(reserva))
+        for reserva in lote_boletos.reservas_de_vuelos([vuelo.id])
+    )
+    huella = hashlib.sha256(huellas.encode('utf-8')).hexdigest()[:32]
+    return _encolar(
+        f'boletos_vuelo:{vuelo.id}:{formato}:{huella}',
+        tipo='boletos_vuelo', vuelo=vuelo, formato=formato, solicitado_por=usuario,
+    )
+
+
+def tomar_siguiente():
+    """Marca como en proceso el trabajo pendiente más antiguo y lo devuelve"""
+    pendientes = TrabajoPDF.objects.filter(estado='pendiente').order_by('fecha_creacion')
+    for trabajo_id in pendientes.values_list('id', flat=True)[:10]:
+        ahora = timezone.now()
+        tomado = TrabajoPDF.objects.filter(id=trabajo_id, estado='pendiente').update(
+            estado='en_proceso', fecha_inicio=ahora, latido=ahora, token=uuid.uuid4().hex
+        )
+        if tomado:
+            return TrabajoPDF.objects.select_related('reserva', 'vuelo').get(id=trabajo_id)
+    return None
+
+
+def _propio(trabajo):
+    """El trabajo, si sigue en proceso a cargo del token con el que se tomó"""
+    return TrabajoPDF.objects.filter(id=trabajo.id, estado='en_proceso', token=trabajo.token)
+
+
+@contextmanager
+def _latiendo(trabajo):
+    """Renueva el latido del trabajo en un hilo mientras dura el bloque"""
+    detener = threading.Event()
+
+    def latir():
+        try:
+            while not detener.wait(LATIDO_SEGUNDOS):
+                _propio(trabajo).update(latido=timezone.now())
+        finally:
+            connection.close()
+
+    hilo = threading.Thread(target=latir, daemon=True)
+    hilo.start()
+    try:
+        yield
+    finally:
+        detener.set()
+        hilo.join()
+
+
+def procesar(trabajo, procesos=None):
+    """
+    Genera el PDF del trabajo y guarda el resultado o el error. Devuelve
+    False si mientras tanto el trabajo volvió a la cola y lo tomó otro
+    worker: en ese caso el resultado se descarta.
+    """
+    ruta = None
+    try:
+        with _latiendo(trabajo):
+            if trabajo.tipo == 'boleto':
+                reserva = pdf.reserva_para_boleto().get(id=trabajo.reserva_id)
+                ruta, _ = pdf.obtener_boleto(reserva)
+            else:
+                directorio = _directorio_trabajos()
+                directorio.mkdir(parents=True, exist_ok=True)
+                # El token en el nombre evita que dos workers escriban el mismo archivo
+                ruta = directorio / f'{trabajo.id}_{trabajo.token}.{trabajo.formato}'
+                lote_boletos.generar_boletos(
+                    [trabajo.vuelo_id], destino=trabajo.formato, salida=str(ruta), procesos=procesos
+                )
+    except Exception:
+        trabajo.estado = 'error'
+        trabajo.error = traceback.format_exc()
+    else:
+        trabajo.estado = 'completado'
+        trabajo.archivo = str(ruta)
+    trabajo.fecha_fin = timezone.now()
+    guardado = _propio(trabajo).update(
+        estado=trabajo.estado, archivo=trabajo.archivo, error=trabajo.error, fecha_fin=trabajo.fecha_fin
+    )
+    if not guardado:
+        if trabajo.tipo == 'boletos_vuelo' and ruta is not None:
+            Path(ruta).unlink(missing_ok=True)
+        trabajo.refresh_from_db()
+        return False
+    return True
+
+
+def reencolar_colgados(segundos):
+    """Devuelve a la cola los trabajos en proceso sin latido hace más de `segundos` (worker caído)"""
+    limite = timezone.now() - timedelta(seconds=segundos)
+    # Los tomados antes de que existiera el latido se juzgan por su inicio
+    sin_latido = Q(latido__lt=limite) | Q(latido__isnull=True, fecha_inicio__lt=limite)
+    return TrabajoPDF.objects.filter(sin_latido, estado='en_proceso').update(
+        estado='pendiente', fecha_inicio=None, latido=None, token=''
+    )
+
+
+def purgar(horas):
+    """Borra los trabajos terminados hace más de `horas` y sus archivos de vuelo"""
+    viejos = TrabajoPDF.objects.filter(
+        estado__in=['completado', 'error'], fecha_fin__lt=timezone.now() - timedelta(hours=horas)
+    )
+    # Los boletos individuales viven en la caché de boletos y se conservan
+    for archivo in viejos.filter(tipo='boletos_vuelo').exclude(archivo='').values_list('archivo', flat=True):
+        Path(archivo).unlink(missing_ok=True)
+    return viejos.delete()[0]
@@ -10,6 +10,8 @@ urlpatterns = [
     path('registro/', views.registro_view, name='registro'),
     path('vuelos/', views.lista_vuelos, name='lista_vuelos'),
     path('vuelos/buscar/', views.buscar_vuelos, name='buscar_vuelos'),
+    path('vuelos/buscar/catalogo/', views.catalogo_rutas_json, name='catalogo_rutas'),
+    path('vuelos/manifiesto/', views.manifiesto_salidas, name='manifiesto_salidas'),
     path('vuelos/<int:vuelo_id>/', views.detalle_vuelo, name='detalle_vuelo'),
     path('vuelos/<int:vuelo_id>/reporte/', views.reporte_pasajeros_vuelo, name='reporte_pasajeros_vuelo'),
     path('reservas/', views.lista_reservas, name='lista_reservas'),
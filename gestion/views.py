@@ -5,26 +5,24 @@ from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_protect
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse, JsonResponse, FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.text import slugify
 from django.template.loader import render_to_string
 from datetime import datetime, date
-from .models import Vuelo, Pasajero, Reserva, Asiento, Boleto
+import csv
+from .models import Vuelo, Pasajero, Reserva, Asiento, Boleto, ReservaArchivada
 from .forms import PasajeroForm, ReservaForm, BusquedaVueloForm
+from . import reportes, dashboard, pdf, trabajos
+from .catalogo import catalogo_rutas
+from .paginacion import PaginadorConTotal
+from .busqueda import buscar_pasajeros
+from .asientos import mapa_asientos
 
-try:
-    from reportlab.lib.pagesizes import A4, letter
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.platypus.frames import Frame
-    from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    reportlab_available = True
-except Exception:
-    reportlab_available = False
 
 def login_view(request):
     login_form = AuthenticationForm(request, data=request.POST or None)
@@ -75,43 +73,22 @@ def registro_view(request):
     })
 
 
-try:
-    from reportlab.lib.pagesizes import A4, letter
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch, cm
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.platypus.frames import Frame
-    from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    reportlab_available = True
-except Exception:
-    reportlab_available = False
-
 def home(request):
-    vuelos_proximos = Vuelo.objects.filter(
-        fecha_salida__gte=timezone.now(),
-        estado='programado'
-    ).order_by('fecha_salida')[:5]
-
-    total_vuelos = Vuelo.objects.count()
-    total_pasajeros = Pasajero.objects.count()
-    total_reservas = Reserva.objects.count()
-    vuelos_hoy = Vuelo.objects.filter(fecha_salida__date=date.today()).count()
+    snapshot = dashboard.obtener_snapshot()
 
     context = {
-        'vuelos_proximos': vuelos_proximos,
-        'total_vuelos': total_vuelos,
-        'total_pasajeros': total_pasajeros,
-        'total_reservas': total_reservas,
-        'vuelos_hoy': vuelos_hoy,
+        'vuelos_proximos': snapshot['vuelos_proximos'],
+        'total_vuelos': snapshot['total_vuelos'],
+        'total_pasajeros': snapshot['total_pasajeros'],
+        'total_reservas': snapshot['total_reservas'],
+        'vuelos_hoy': snapshot['vuelos_hoy'],
+        'snapshot_generado': snapshot['generado'],
     }
     return render(request, 'gestion/home.html', context)
 
 def buscar_vuelos(request):
     """Vista para buscar vuelos disponibles"""
     vuelos = []
-    from .models import Vuelo
     if request.method == 'POST':
         # Obtener origen y destino seleccionados para filtrar fechas
         post_data = request.POST.copy()
@@ -119,8 +96,7 @@ def buscar_vuelos(request):
         destino = post_data.get('destino', '')
         fechas_disponibles = []
         if origen and destino:
-            vuelos_filtrados = Vuelo.objects.filter(estado='programado', origen=origen, destino=destino)
-            fechas_disponibles = sorted(set(v.fecha_salida.date() for v in vuelos_filtrados))
+            fechas_disponibles = catalogo_rutas.fechas(origen, destino)
             post_data = post_data.copy()
             # Si la fecha seleccionada no está en las opciones, limpiar
             if post_data.get('fecha_salida') not in [f.strftime('%Y-%m-%d') for f in fechas_disponibles]:
@@ -154,20 +130,23 @@ def buscar_vuelos(request):
     }
     return render(request, 'gestion/buscar_vuelos.html', context)
 
+def catalogo_rutas_json(request):
+    """Destinos y fechas disponibles para los desplegables dependientes de la búsqueda"""
+    origen = request.GET.get('origen', '')
+    destino = request.GET.get('destino', '')
+    fechas = catalogo_rutas.fechas(origen, destino) if origen and destino else []
+    return JsonResponse({
+        'origen': origen,
+        'destino': destino,
+        'destinos': catalogo_rutas.destinos(origen or None),
+        'fechas': [
+            {'valor': f.strftime('%Y-%m-%d'), 'texto': f.strftime('%d/%m/%Y')}
+            for f in fechas
+        ],
+    })
+
 def detalle_vuelo(request, vuelo_id):
-    vuelo = get_object_or_404(Vuelo, id=vuelo_id)
-    asientos = vuelo.avion.asientos.all().order_by('fila', 'columna')
-    reservas_vuelo = Reserva.objects.filter(
-        vuelo=vuelo,
-        estado__in=['confirmada', 'pagada']
-    ).select_related('asiento')
-    asientos_reservados = {reserva.asiento.id for reserva in reservas_vuelo}
-    asientos_por_fila = {}
-    for asiento in asientos:
-        if asiento.fila not in asientos_por_fila:
-            asientos_por_fila[asiento.fila] = []
-        asiento.reservado = asiento.id in asientos_reservados
-        asientos_por_fila[asiento.fila].append(asiento)
+    vuelo = get_object_or_404(Vuelo.objects.select_related('avion'), id=vuelo_id)
 
     if request.method == 'POST' and request.user.is_authenticated:
         asiento_id = request.POST.get('asiento_id')
@@ -185,51 +164,47 @@ def detalle_vuelo(request, vuelo_id):
                     messages.error(request, 'El asiento ya fue reservado.')
                 else:
                     # Crear reserva con método de pago
-                    reserva = Reserva.objects.create(
-                        vuelo=vuelo,
-                        pasajero=request.user.pasajero if hasattr(request.user, 'pasajero') else None,
-                        asiento=asiento,
-                        estado='confirmada',
-                        precio=vuelo.precio_base,
-                        usuario=request.user,
-                        metodo_pago=metodo_pago
-                    )
-                    asiento.estado = 'reservado'
-                    asiento.save()
-                    Boleto.objects.create(reserva=reserva)
-                    messages.success(request, f'¡Reserva exitosa! Asiento {asiento.numero} reservado y pago por {"tarjeta" if metodo_pago=="tarjeta" else "efectivo"}.')
-
+                    try:
+                        with transaction.atomic():
+                            reserva = Reserva.objects.create(
+                                vuelo=vuelo,
+                                pasajero=request.user.pasajero if hasattr(request.user, 'pasajero') else None,
+                                asiento=asiento,
+                                estado='confirmada',
+                                precio=vuelo.precio_base,
+                                usuario=request.user,
+                                metodo_pago=metodo_pago
+                            )
+                            asiento.estado = 'reservado'
+                            asiento.save()
+                            Boleto.objects.create(reserva=reserva)
+                    except IntegrityError:
+                        messages.error(request, 'El asiento ya fue reservado.')
+                    else:
+                        messages.success(request, f'¡Reserva exitosa! Asiento {asiento.numero} reservado y pago por {"tarjeta" if metodo_pago=="tarjeta" else "efectivo"}.')
+
+    # El mapa se lee después de procesar el POST para reflejar la reserva nueva
+    mapa = mapa_asientos(vuelo)
     context = {
         'vuelo': vuelo,
-        'asientos_por_fila': asientos_por_fila,
-        'asientos_disponibles': vuelo.asientos_disponibles(),
-        'porcentaje_ocupacion': vuelo.porcentaje_ocupacion(),
+        'asientos_por_fila': mapa.asientos_por_fila,
+        'asientos_disponibles': mapa.asientos_disponibles(),
+        'porcentaje_ocupacion': mapa.porcentaje_ocupacion(),
     }
     return render(request, 'gestion/detalle_vuelo.html', context)
 
 @login_required
 def crear_reserva(request, vuelo_id):
-    vuelo = get_object_or_404(Vuelo, id=vuelo_id)
+    vuelo = get_object_or_404(Vuelo.objects.select_related('avion'), id=vuelo_id)
     
     # Obtener información de asientos para el mapa visual
-    asientos = vuelo.avion.asientos.all().order_by('fila', 'columna')
-    reservas_vuelo = Reserva.objects.filter(
-        vuelo=vuelo,
-        estado__in=['confirmada', 'pagada']
-    ).select_related('asiento')
-    asientos_reservados = {reserva.asiento.id for reserva in reservas_vuelo}
-    asientos_por_fila = {}
-    for asiento in asientos:
-        if asiento.fila not in asientos_por_fila:
-            asientos_por_fila[asiento.fila] = []
-        asiento.reservado = asiento.id in asientos_reservados
-        asientos_por_fila[asiento.fila].append(asiento)
+    mapa = mapa_asientos(vuelo)
 
     asiento_id_preseleccionado = request.GET.get('asiento')
     reserva_exitosa_codigo = request.session.pop('reserva_exitosa_codigo', None)
     if request.method == 'POST':
         pasajero_form = PasajeroForm(request.POST)
-        reserva_form = ReservaForm(request.POST, vuelo_id=vuelo_id)
+        reserva_form = ReservaForm(request.POST, vuelo=vuelo, mapa=mapa)
         if pasajero_form.is_valid() and reserva_form.is_valid():
             reservas_vuelo = Reserva.objects.filter(vuelo=vuelo).order_by('fecha_reserva')
             if reservas_vuelo.count() >= 5:
@@ -261,10 +236,16 @@ def crear_reserva(request, vuelo_id):
                 reserva.usuario = request.user if request.user.is_authenticated else None
                 reserva.estado = 'confirmada'
                 reserva.asiento = asiento
-                reserva.save()
-                asiento.estado = 'reservado'
-                asiento.save()
-                Boleto.objects.create(reserva=reserva)
+                try:
+                    with transaction.atomic():
+                        reserva.save()
+                        asiento.estado = 'reservado'
+                        asiento.save()
+                        Boleto.objects.create(reserva=reserva)
+                except IntegrityError:
+                    # Otra reserva tomó el asiento entre la validación y el guardado
+                    messages.error(request, 'El asiento seleccionado no está disponible.')
+                    return redirect('crear_reserva', vuelo_id=vuelo.id)
                 request.session['reserva_exitosa_codigo'] = reserva.codigo_reserva
                 return redirect('crear_reserva', vuelo_id=vuelo.id)
             else:
@@ -282,31 +263,22 @@ def crear_reserva(request, vuelo_id):
         pasajero_form = PasajeroForm(initial=initial_data)
         
         if asiento_id_preseleccionado:
-            reserva_form = ReservaForm(vuelo_id=vuelo_id, initial={'asiento': asiento_id_preseleccionado})
+            reserva_form = ReservaForm(vuelo=vuelo, mapa=mapa, initial={'asiento': asiento_id_preseleccionado})
             reserva_form.fields['asiento'].widget.attrs['readonly'] = True
             reserva_form.fields['asiento'].widget.attrs['disabled'] = True
         else:
-            reserva_form = ReservaForm(vuelo_id=vuelo_id)
+            reserva_form = ReservaForm(vuelo=vuelo, mapa=mapa)
 
     context = {
         'vuelo': vuelo,
         'pasajero_form': pasajero_form,
         'reserva_form': reserva_form,
-        'asientos_por_fila': asientos_por_fila,
-        'asientos_reservados': asientos_reservados,
+        'asientos_por_fila': mapa.asientos_por_fila,
+        'asientos_reservados': mapa.reservados,
         'reserva_exitosa_codigo': reserva_exitosa_codigo,
     }
     return render(request, 'gestion/crear_reserva.html', context)
 
-    context = {
-        'vuelo': vuelo,
-        'pasajero_form': pasajero_form,
-        'reserva_form': reserva_form,
-        'asientos_por_fila': asientos_por_fila,
-        'asientos_reservados': asientos_reservados,
-    }
-    return render(request, 'gestion/crear_reserva.html', context)
-
 def detalle_reserva(request, reserva_id):
     """Vista detallada de una reserva"""
     reserva = get_object_or_404(Reserva, id=reserva_id)
@@ -322,245 +294,39 @@ def reserva_pdf(request, reserva_id):
 
     Permisos: si el usuario es staff puede ver cualquier reserva; si no, solo su propia reserva.
     """
-    reserva = get_object_or_404(Reserva, id=reserva_id)
+    reserva = get_object_or_404(pdf.reserva_para_boleto(), id=reserva_id)
 
     # Permisos
     if not request.user.is_authenticated:
         return HttpResponseForbidden('Debe iniciar sesión para descargar el PDF de la reserva.')
-    if not request.user.is_staff and reserva.usuario != request.user:
+    if not request.user.is_staff and reserva.usuario_id != request.user.id:
         return HttpResponseForbidden('No tienes permiso para descargar el PDF de esta reserva.')
 
-    if not reportlab_available:
+    if not pdf.reportlab_disponible:
         return HttpResponse('La librería reportlab no está instalada. Instala `reportlab` y reinicia el servidor.', status=500)
 
-    # Crear la respuesta HTTP para el PDF
-    response = HttpResponse(content_type='application/pdf')
-    filename = f"reserva_{reserva.codigo_reserva}.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-    # Crear el documento PDF
-    doc = SimpleDocTemplate(response, pagesize=A4, 
-                          rightMargin=2*cm, leftMargin=2*cm,
-                          topMargin=2*cm, bottomMargin=2*cm)
-
-    # Obtener estilos
-    styles = getSampleStyleSheet()
-    
-    # Crear estilos personalizados
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#1e40af')
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=12,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#666666')
-    )
-    
-    section_style = ParagraphStyle(
-        'SectionTitle',
-        parent=styles['Heading3'],
-        fontSize=12,
-        spaceAfter=8,
-        spaceBefore=16,
-        textColor=colors.HexColor('#1e40af'),
-        borderWidth=1,
-        borderColor=colors.HexColor('#e5e7eb'),
-        borderPadding=5
-    )
-
-    # Contenido del PDF
-    story = []
-
-    # Encabezado
-    story.append(Paragraph("AEROÉFI", title_style))
-    story.append(Paragraph("Boleto Electrónico / E-Ticket", subtitle_style))
-    story.append(Spacer(1, 12))
-    
-    # Código de reserva destacado
-    codigo_style = ParagraphStyle(
-        'CodigoReserva',
-        parent=styles['Normal'],
-        fontSize=16,
-        alignment=TA_CENTER,
-        textColor=colors.white,
-        backColor=colors.HexColor('#dc2626'),
-        borderWidth=1,
-        borderColor=colors.HexColor('#fecaca'),
-        borderPadding=10
-    )
-    story.append(Paragraph(f"<b>CÓDIGO DE RESERVA: {reserva.codigo_reserva}</b>", codigo_style))
-    story.append(Spacer(1, 20))
-
-    # Información del vuelo destacada
-    ruta_style = ParagraphStyle(
-        'RutaVuelo',
-        parent=styles['Normal'],
-        fontSize=16,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#059669'),
-        spaceAfter=12
-    )
-    story.append(Paragraph(f"<b>{reserva.vuelo.origen} → {reserva.vuelo.destino}</b>", ruta_style))
-    
-    # Formatear fecha en español
-    meses = {
-        1: 'enero', 2: 'febrero', 3: 'marzo', 4: 'abril',
-        5: 'mayo', 6: 'junio', 7: 'julio', 8: 'agosto',
-        9: 'septiembre', 10: 'octubre', 11: 'noviembre', 12: 'diciembre'
-    }
-    
-    dias = {
-        0: 'lunes', 1: 'martes', 2: 'miércoles', 3: 'jueves',
-        4: 'viernes', 5: 'sábado', 6: 'domingo'
-    }
-    
-    fecha_obj = reserva.vuelo.fecha_salida
-    dia_semana = dias[fecha_obj.weekday()]
-    mes_nombre = meses[fecha_obj.month]
-    fecha_vuelo = f"{dia_semana.capitalize()}, {fecha_obj.day} de {mes_nombre} de {fecha_obj.year} - {fecha_obj.strftime('%H:%M')} hs"
-    
-    story.append(Paragraph(f"<b>{fecha_vuelo}</b>", ParagraphStyle('FechaVuelo', parent=styles['Normal'], fontSize=12, alignment=TA_CENTER)))
-    story.append(Spacer(1, 20))
-
-    # Información del pasajero
-    story.append(Paragraph("INFORMACIÓN DEL PASAJERO", section_style))
-    
-    pasajero_data = [
-        ['Nombre completo:', f"{reserva.pasajero.nombre} {reserva.pasajero.apellido}"],
-        ['Documento:', f"{reserva.pasajero.get_tipo_documento_display()}: {reserva.pasajero.documento}"],
-        ['Email:', reserva.pasajero.email],
-        ['Teléfono:', reserva.pasajero.telefono or '-'],
-    ]
-    
-    pasajero_table = Table(pasajero_data, colWidths=[4*cm, 10*cm])
-    pasajero_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    story.append(pasajero_table)
-    story.append(Spacer(1, 20))
-
-    # Información del vuelo
-    story.append(Paragraph("DETALLES DEL VUELO", section_style))
-    
-    vuelo_data = [
-        ['Aeronave:', reserva.vuelo.avion.modelo],
-        ['Asiento asignado:', f"**{reserva.asiento.numero}**"],
-        ['Clase:', getattr(reserva.asiento, 'get_clase_display', lambda: 'Económica')() or 'Económica'],
-    ]
-    
-    vuelo_table = Table(vuelo_data, colWidths=[4*cm, 10*cm])
-    vuelo_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    story.append(vuelo_table)
-    story.append(Spacer(1, 20))
-
-    # Información de la reserva
-    story.append(Paragraph("INFORMACIÓN DE LA RESERVA", section_style))
-    
-    metodo_pago = 'No especificado'
-    if reserva.metodo_pago == 'tarjeta':
-        metodo_pago = 'Tarjeta de crédito/débito'
-    elif reserva.metodo_pago == 'efectivo':
-        metodo_pago = 'Efectivo'
-    
-    reserva_data = [
-        ['Estado:', reserva.get_estado_display()],
-        ['Fecha de emisión:', reserva.fecha_reserva.strftime("%d/%m/%Y %H:%M")],
-        ['Tarifa:', f"${reserva.precio}"],
-        ['Forma de pago:', metodo_pago],
-    ]
-    
-    reserva_table = Table(reserva_data, colWidths=[4*cm, 10*cm])
-    reserva_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-    ]))
-    story.append(reserva_table)
-    story.append(Spacer(1, 20))
-
-    # Código de boleto si existe
-    if hasattr(reserva, 'boleto') and reserva.boleto:
-        story.append(Paragraph("CÓDIGO DE BOLETO", section_style))
-        
-        boleto_style = ParagraphStyle(
-            'CodigoBoleto',
-            parent=styles['Normal'],
-            fontSize=14,
-            alignment=TA_CENTER,
-            fontName='Courier-Bold',
-            textColor=colors.black,
-            backColor=colors.HexColor('#f9fafb'),
-            borderWidth=1,
-            borderColor=colors.HexColor('#9ca3af'),
-            borderPadding=10,
-            spaceAfter=8
+    # El PDF se genera una vez por versión de los datos y luego se sirve desde disco.
+    # Con PDF_ASINCRONO lo genera el worker de trabajos y la página espera.
+    if getattr(settings, 'PDF_ASINCRONO', False):
+        ruta, huella = pdf.boleto_en_cache(reserva)
+        if not ruta.exists():
+            trabajo, _ = trabajos.encolar_boleto(reserva, request.user, huella)
+            return render(request, 'gestion/trabajo_pdf.html', {
+                'reserva': reserva,
+                'trabajo': trabajo,
+                'reintentar_ms': 2000,
+            }, status=202)
+    else:
+        ruta, huella = pdf.obtener_boleto(reserva)
+    etag = f'"{huella}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = FileResponse(
+            open(ruta, 'rb'), as_attachment=True,
+            filename=f"reserva_{reserva.codigo_reserva}.pdf", content_type='application/pdf'
         )
-        story.append(Paragraph(f"{reserva.boleto.codigo_barra}", boleto_style))
-        story.append(Paragraph("Presente este código en el mostrador de check-in", 
-                             ParagraphStyle('BoletoInstr', parent=styles['Normal'], fontSize=9, 
-                                          alignment=TA_CENTER, textColor=colors.HexColor('#666666'))))
-        story.append(Spacer(1, 20))
-
-    story.append(Spacer(1, 30))
-    
-    # Pie de página
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor('#6b7280'),
-        borderWidth=1,
-        borderColor=colors.HexColor('#d1d5db'),
-        borderPadding=8
-    )
-    
-    from datetime import datetime
-    ahora = datetime.now().strftime("%d/%m/%Y %H:%M")
-    
-    story.append(Paragraph(f"<b>AeroÉFI</b> - Sistema de Gestión de Aerolíneas<br/>Documento generado el {ahora}", footer_style))
-
-    # Construir el PDF
-    doc.build(story)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
     return response
 
 def lista_vuelos(request):
@@ -570,12 +336,12 @@ def lista_vuelos(request):
     destino = request.GET.get('destino', '')
     estado = request.GET.get('estado', '')
 
-    # Obtener todos los origenes y destinos únicos de vuelos
-    origenes = Vuelo.objects.values_list('origen', flat=True).distinct().order_by('origen')
-    destinos = Vuelo.objects.values_list('destino', flat=True).distinct().order_by('destino')
+    # Opciones de los filtros y totales desde las facetas cacheadas
+    es_staff = request.user.is_authenticated and request.user.is_staff
+    facetas = reportes.facetas_vuelos(solo_programados=not es_staff)
 
     # Filtrar vuelos según el tipo de usuario
-    if request.user.is_authenticated and request.user.is_staff:
+    if es_staff:
         # Los administradores ven todos los vuelos
         vuelos_list = Vuelo.objects.all().order_by('-fecha_salida')
     else:
@@ -589,24 +355,27 @@ def lista_vuelos(request):
     if estado:
         vuelos_list = vuelos_list.filter(estado=estado)
 
-    # Paginación
-    paginator = Paginator(vuelos_list, 10)
+    # Paginación (el total sale de las facetas, sin COUNT sobre la tabla)
+    paginator = PaginadorConTotal(
+        vuelos_list.select_related('avion'), 10,
+        total=facetas.total(origen, destino, estado)
+    )
     page_number = request.GET.get('page')
     vuelos = paginator.get_page(page_number)
 
     # Configurar contexto según el tipo de usuario
     context = {
         'vuelos': vuelos,
-        'origenes': origenes,
-        'destinos': destinos,
+        'origenes': facetas.origenes(),
+        'destinos': facetas.destinos(),
         'origen_seleccionado': origen,
         'destino_seleccionado': destino,
         'estado_seleccionado': estado,
     }
     
     # Solo los administradores pueden filtrar por estado
-    if request.user.is_authenticated and request.user.is_staff:
-        context['estados_vuelo'] = Vuelo.ESTADOS_VUELO
+    if es_staff:
+        context['estados_vuelo'] = facetas.estados()
         context['mostrar_filtro_estado'] = True
     else:
         context['mostrar_filtro_estado'] = False
@@ -627,7 +396,8 @@ def lista_reservas(request):
     if estado:
         reservas_list = reservas_list.filter(estado=estado)
     if codigo:
-        reservas_list = reservas_list.filter(codigo_reserva__icontains=codigo)
+        # Los códigos se buscan como subcadena, igual que el documento en lista_pasajeros
+        reservas_list = reservas_list.filter(codigo_reserva__icontains=codigo.strip())
     
     # Paginación
     paginator = Paginator(reservas_list, 10)
@@ -649,12 +419,11 @@ def lista_pasajeros(request):
     documento = request.GET.get('documento')
     
     if nombre:
-        from django.db.models import Q
-        pasajeros_list = pasajeros_list.filter(
-            Q(nombre__icontains=nombre) | Q(apellido__icontains=nombre)
-        )
+        pasajeros_list = buscar_pasajeros(pasajeros_list, nombre, ['nombre', 'apellido'])
     if documento:
-        pasajeros_list = pasajeros_list.filter(documento__icontains=documento)
+        # El documento se busca como subcadena (FTS solo compara prefijos de palabra);
+        # en PostgreSQL lo resuelve el índice de trigramas
+        pasajeros_list = pasajeros_list.filter(documento__icontains=documento.strip())
     
     # Paginación
     paginator = Paginator(pasajeros_list, 15)
@@ -670,10 +439,12 @@ def detalle_pasajero(request, pasajero_id):
     """Vista detallada de un pasajero"""
     pasajero = get_object_or_404(Pasajero, id=pasajero_id)
     reservas = pasajero.reservas.all().order_by('-fecha_reserva')
+    reservas_archivadas = pasajero.reservas_archivadas.select_related('vuelo', 'asiento').order_by('-fecha_reserva')
     
     context = {
         'pasajero': pasajero,
         'reservas': reservas,
+        'reservas_archivadas': reservas_archivadas,
     }
     return render(request, 'gestion/detalle_pasajero.html', context)
 
@@ -692,6 +463,43 @@ def reporte_pasajeros_vuelo(request, vuelo_id):
     }
     return render(request, 'gestion/reporte_pasajeros_vuelo.html', context)
 
+class _Echo:
+    """Buffer mínimo para que csv.writer devuelva cada línea en lugar de escribirla"""
+    def write(self, value):
+        return value
+
+@login_required
+def manifiesto_salidas(request):
+    """Manifiestos de todos los vuelos que salen de un aeropuerto en las próximas horas"""
+    if not request.user.is_staff:
+        return HttpResponseForbidden('Solo el personal puede consultar los manifiestos de salida.')
+
+    origen = request.GET.get('aeropuerto', '')
+    try:
+        horas = min(max(int(request.GET.get('horas', 24)), 1), 168)
+    except ValueError:
+        horas = 24
+
+    if origen and request.GET.get('formato') == 'csv':
+        writer = csv.writer(_Echo())
+        filas = reportes.filas_manifiesto(origen, horas)
+        response = StreamingHttpResponse(
+            (writer.writerow(fila) for fila in filas),
+            content_type='text/csv; charset=utf-8'
+        )
+        # El aeropuerto viene tal cual de la URL: espacios, comillas o acentos romperían el encabezado
+        filename = f"manifiesto_{slugify(origen) or 'aeropuerto'}_{horas}h.csv"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    context = {
+        'aeropuertos': Vuelo.objects.values_list('origen', flat=True).distinct().order_by('origen'),
+        'aeropuerto_seleccionado': origen,
+        'horas': horas,
+        'manifiestos': reportes.manifiestos_salida(origen, horas) if origen else [],
+    }
+    return render(request, 'gestion/manifiesto_salidas.html', context)
+
 # Vista para buscar una reserva por código
 def buscar_reserva(request):
     reserva = None
@@ -703,15 +511,17 @@ def buscar_reserva(request):
         codigo = request.GET.get('codigo_reserva')
 
     if codigo:
-        try:
-            reserva = Reserva.objects.get(codigo_reserva__iexact=codigo)
-            # Si el usuario no es staff, solo puede ver su propia reserva
-            if not request.user.is_staff:
-                if reserva.usuario != request.user:
-                    reserva = None
-                    error = "No tienes permiso para ver esta reserva."
-        except Reserva.DoesNotExist:
+        # Las reservas de vuelos pasados pueden estar en el archivo
+        reserva = (
+            Reserva.objects.filter(codigo_reserva__iexact=codigo).first()
+            or ReservaArchivada.objects.filter(codigo_reserva__iexact=codigo).first()
+        )
+        if reserva is None:
             error = "No se encontró ninguna reserva con ese código."
+        # Si el usuario no es staff, solo puede ver su propia reserva
+        elif not request.user.is_staff and reserva.usuario != request.user:
+            reserva = None
+            error = "No tienes permiso para ver esta reserva."
     context = {
         'reserva': reserva,
         'codigo_reserva': codigo,
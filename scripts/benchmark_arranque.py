@@ -0,0 +1,142 @@
+"""
+Benchmark del tiempo de arranque del proceso de Django
+Ejecutar: python scripts/benchmark_arranque.py [--repeticiones 5] [--url /] [--importaciones]
+
+Cada medición corre en un proceso nuevo, sobre una copia temporal y migrada
+de db.sqlite3, y se informa la mediana de las repeticiones:
+
+- `manage.py check`: tiempo total del comando, desde que arranca el
+  intérprete hasta que termina.
+- WSGI: tiempo hasta tener la aplicación importada (aerolineas_efi.wsgi) y
+  hasta responder la primera petición a `--url`, llamando a la aplicación
+  WSGI directamente.
+
+También informa si las dependencias pesadas que solo se usan en algunas
+páginas (ReportLab, drf_yasg) quedaron cargadas después de la primera
+petición. Si aparecen, alguna importación dejó de ser perezosa.
+Con --importaciones muestra los módulos que más tardan en importarse
+(python -X importtime).
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MODULOS_PESADOS = ('reportlab', 'drf_yasg.views')
+
+
+def medir_wsgi(url):
+    """Importa la aplicación WSGI y responde una petición; devuelve los tiempos"""
+    inicio = time.perf_counter()
+    sys.path.insert(0, str(BASE_DIR))
+    from aerolineas_efi.wsgi import application
+    importada = time.perf_counter()
+
+    from wsgiref.util import setup_testing_defaults
+    ruta, _, consulta = url.partition('?')
+    environ = {'PATH_INFO': ruta, 'QUERY_STRING': consulta, 'HTTP_HOST': 'localhost'}
+    setup_testing_defaults(environ)
+    estado = []
+    cuerpo = application(environ, lambda status, headers, exc_info=None: estado.append(status))
+    b''.join(cuerpo)
+    if hasattr(cuerpo, 'close'):
+        cuerpo.close()
+    respondida = time.perf_counter()
+
+    return {
+        'importacion': importada - inicio,
+        'primera_peticion': respondida - inicio,
+        'estado': estado[0] if estado else None,
+        'cargados': [modulo for modulo in MODULOS_PESADOS if modulo in sys.modules],
+    }
+
+
+def _cronometrar(comando, env):
+    inicio = time.perf_counter()
+    subprocess.run(comando, env=env, cwd=BASE_DIR, capture_output=True, check=True)
+    return time.perf_counter() - inicio
+
+
+def importaciones(env, cantidad=15):
+    """Módulos con mayor tiempo de importación acumulado al cargar la aplicación WSGI"""
+    salida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import aerolineas_efi.wsgi'],
+        env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    tiempos = []
+    for linea in salida.stderr.splitlines():
+        # "import time: <propio> | <acumulado> | <módulo>"
+        partes = linea.split('|')
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        tiempos.append((int(partes[1]), partes[2].strip()))
+    return sorted(tiempos, reverse=True)[:cantidad]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--url', default='/', help='URL de la primera petición')
+    parser.add_argument('--entorno', default='desarrollo', help='valor de AEROEFI_ENTORNO')
+    parser.add_argument('--importaciones', action='store_true',
+                        help='mostrar los módulos que más tardan en importarse')
+    parser.add_argument('--medir', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir_wsgi(args.url)))
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        copia = Path(directorio) / 'arranque.sqlite3'
+        shutil.copyfile(BASE_DIR / 'db.sqlite3', copia)
+        env = dict(os.environ)
+        env.pop('DJANGO_SETTINGS_MODULE', None)
+        env.update({
+            'AEROEFI_ENTORNO': args.entorno,
+            'AEROEFI_DB_PATH': str(copia),
+            'AEROEFI_PDF_CACHE_DIR': str(Path(directorio) / 'cache_pdf'),
+        })
+        # Producción exige AEROEFI_CACHE_URL (ver settings_produccion); se usa una tabla de la base
+        env.setdefault('AEROEFI_CACHE_URL', 'db://aeroefi_cache')
+        for comando in (['migrate', '--no-input'], ['createcachetable']):
+            subprocess.run(
+                [sys.executable, 'manage.py', *comando],
+                env=env, cwd=BASE_DIR, capture_output=True, check=True
+            )
+
+        interprete = [_cronometrar([sys.executable, '-c', 'pass'], env) for _ in range(args.repeticiones)]
+        check = [_cronometrar([sys.executable, 'manage.py', 'check'], env) for _ in range(args.repeticiones)]
+        wsgi = []
+        for _ in range(args.repeticiones):
+            salida = subprocess.run(
+                [sys.executable, __file__, '--medir', '--url', args.url],
+                env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True
+            )
+            wsgi.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+        print(f"{args.repeticiones} repeticiones, entorno {args.entorno} (medianas)")
+        print(f"{'Intérprete de Python (referencia)':<36} {statistics.median(interprete) * 1000:8.0f} ms")
+        print(f"{'manage.py check':<36} {statistics.median(check) * 1000:8.0f} ms")
+        print(f"{'WSGI: importar la aplicación':<36} "
+              f"{statistics.median(m['importacion'] for m in wsgi) * 1000:8.0f} ms")
+        print(f"{'WSGI: primera petición a ' + args.url:<36} "
+              f"{statistics.median(m['primera_peticion'] for m in wsgi) * 1000:8.0f} ms ({wsgi[0]['estado']})")
+        cargados = wsgi[0]['cargados']
+        print(f"Dependencias pesadas cargadas: {', '.join(cargados) if cargados else 'ninguna'}")
+
+        if args.importaciones:
+            print('\nMódulos más lentos al importar la aplicación WSGI (acumulado):')
+            for acumulado, modulo in importaciones(env):
+                print(f"{acumulado / 1000:8.1f} ms  {modulo}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark de peticiones por segundo en los entornos de desarrollo y producción
+Ejecutar: python scripts/benchmark_entornos.py [--segundos 5] [--urls / /vuelos/]
+
+Cada entorno corre en un subproceso propio (los settings no se pueden cambiar
+dentro de un mismo proceso) y sobre una copia temporal y migrada de db.sqlite3, para
+que los pragmas de producción (WAL) no modifiquen la base de datos del
+proyecto.
+Las peticiones se hacen con el cliente de pruebas de Django, que dispara las
+mismas señales de inicio y fin de request que un servidor real, por lo que se
+nota la diferencia entre abrir una conexión por petición y reutilizarla.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+ENTORNOS = ('desarrollo', 'produccion')
+URLS_POR_DEFECTO = ['/', '/vuelos/', '/vuelos/buscar/', '/reservas/buscar/']
+
+
+def medir(urls, segundos):
+    """Hace peticiones GET a las URLs en ronda durante `segundos` y devuelve métricas"""
+    sys.path.insert(0, str(BASE_DIR))
+    from aerolineas_efi import configurar_settings
+    configurar_settings()
+
+    import django
+    django.setup()
+    from django.test import Client
+
+    client = Client(HTTP_HOST='localhost')
+    # Una ronda previa para cargar plantillas, cachés y conexiones
+    for url in urls:
+        client.get(url)
+
+    peticiones = 0
+    errores = 0
+    inicio = time.perf_counter()
+    fin = inicio + segundos
+    while time.perf_counter() < fin:
+        for url in urls:
+            respuesta = client.get(url)
+            peticiones += 1
+            if respuesta.status_code >= 400:
+                errores += 1
+    transcurrido = time.perf_counter() - inicio
+    return {
+        'peticiones': peticiones,
+        'errores': errores,
+        'segundos': round(transcurrido, 2),
+        'rps': round(peticiones / transcurrido, 1),
+    }
+
+
+def ejecutar_entorno(entorno, urls, segundos, directorio):
+    copia = Path(directorio) / f'{entorno}.sqlite3'
+    shutil.copyfile(BASE_DIR / 'db.sqlite3', copia)
+    env = dict(os.environ)
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    env.update({
+        'AEROEFI_ENTORNO': entorno,
+        'AEROEFI_DB_PATH': str(copia),
+    })
+    # Producción exige AEROEFI_CACHE_URL (ver settings_produccion); se usa una tabla de la base
+    env.setdefault('AEROEFI_CACHE_URL', 'db://aeroefi_cache')
+    for comando in (['migrate', '--no-input'], ['createcachetable']):
+        subprocess.run(
+            [sys.executable, 'manage.py', *comando],
+            env=env, cwd=BASE_DIR, capture_output=True, check=True
+        )
+    salida = subprocess.run(
+        [sys.executable, __file__, '--medir', '--segundos', str(segundos), '--urls', *urls],
+        env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--segundos', type=float, default=5)
+    parser.add_argument('--urls', nargs='+', default=URLS_POR_DEFECTO)
+    parser.add_argument('--medir', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.urls, args.segundos)))
+        return
+
+    print(f"URLs: {' '.join(args.urls)} ({args.segundos:g} s por entorno)")
+    with tempfile.TemporaryDirectory() as directorio:
+        resultados = {
+            entorno: ejecutar_entorno(entorno, args.urls, args.segundos, directorio)
+            for entorno in ENTORNOS
+        }
+
+    print(f"{'Entorno':<12} {'Peticiones':>10} {'Errores':>8} {'req/s':>8}")
+    for entorno, resultado in resultados.items():
+        print(f"{entorno:<12} {resultado['peticiones']:>10} {resultado['errores']:>8} {resultado['rps']:>8}")
+    base = resultados['desarrollo']['rps']
+    if base:
+        print(f"Mejora: x{resultados['produccion']['rps'] / base:.2f}")
+
+
+if __name__ == '__main__':
+    main()
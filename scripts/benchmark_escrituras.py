@@ -0,0 +1,228 @@
+"""
+Benchmark de escrituras concurrentes en SQLite y PostgreSQL
+Ejecutar: python scripts/benchmark_escrituras.py [--motor ambos] [--hilos 8] [--segundos 10]
+
+Simula una ola de reservas: varios hilos crean en paralelo pasajero, reserva
+y boleto dentro de una transacción, y se informan las transacciones por
+segundo y los errores (por ejemplo "database is locked" en SQLite).
+
+- SQLite corre sobre una copia temporal y migrada de db.sqlite3.
+- PostgreSQL corre sobre una instancia local descartable: se crea un cluster
+  con initdb en un directorio temporal, se levanta con pg_ctl escuchando solo
+  en un socket Unix, se migra, se mide y se elimina al terminar. Requiere los
+  binarios de PostgreSQL en el PATH (o en PG_BIN) y psycopg instalado
+  (requirements-postgres.txt).
+
+El mismo arranque sirve para correr otros comandos contra PostgreSQL, por
+ejemplo las migraciones o un `manage.py check`:
+
+    python scripts/benchmark_escrituras.py --motor postgresql --comando check
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MOTORES = ('sqlite', 'postgresql')
+PUERTO_POSTGRES = 54329
+
+
+def _binario_postgres(nombre):
+    directorio = os.environ.get('PG_BIN')
+    ruta = os.path.join(directorio, nombre) if directorio else shutil.which(nombre)
+    if not ruta or not os.path.exists(ruta):
+        sys.exit(f"No se encontró '{nombre}'. Instalar PostgreSQL o definir PG_BIN.")
+    return ruta
+
+
+@contextlib.contextmanager
+def postgres_temporal(directorio):
+    """Levanta un cluster de PostgreSQL descartable y devuelve sus variables de entorno"""
+    datos = Path(directorio) / 'pgdata'
+    subprocess.run(
+        [_binario_postgres('initdb'), '-D', str(datos), '-U', 'aerolineas_efi',
+         '--auth=trust', '--encoding=UTF8', '--no-sync'],
+        check=True, capture_output=True
+    )
+    opciones = f"-p {PUERTO_POSTGRES} -k {directorio} -c listen_addresses=''"
+    subprocess.run(
+        [_binario_postgres('pg_ctl'), '-D', str(datos), '-o', opciones,
+         '-l', str(Path(directorio) / 'postgres.log'), '-w', 'start'],
+        check=True, capture_output=True
+    )
+    try:
+        subprocess.run(
+            [_binario_postgres('createdb'), '-h', str(directorio), '-p', str(PUERTO_POSTGRES),
+             '-U', 'aerolineas_efi', 'aerolineas_efi'],
+            check=True, capture_output=True
+        )
+        yield {
+            'AEROEFI_DB_MOTOR': 'postgresql',
+            'AEROEFI_DB_HOST': str(directorio),
+            'AEROEFI_DB_PUERTO': str(PUERTO_POSTGRES),
+        }
+    finally:
+        subprocess.run(
+            [_binario_postgres('pg_ctl'), '-D', str(datos), '-m', 'fast', 'stop'],
+            capture_output=True
+        )
+
+
+@contextlib.contextmanager
+def sqlite_temporal(directorio):
+    """Copia db.sqlite3 a un directorio temporal y devuelve sus variables de entorno"""
+    copia = Path(directorio) / 'benchmark.sqlite3'
+    shutil.copyfile(BASE_DIR / 'db.sqlite3', copia)
+    yield {'AEROEFI_DB_PATH': str(copia)}
+
+
+def medir(hilos, segundos):
+    """Crea reservas desde varios hilos durante `segundos` y devuelve métricas"""
+    sys.path.insert(0, str(BASE_DIR))
+    from aerolineas_efi import configurar_settings
+    configurar_settings()
+
+    import django
+    django.setup()
+    from datetime import date, timedelta
+    from decimal import Decimal
+
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from gestion.models import Avion, Vuelo, Pasajero, Reserva, Boleto
+
+    avion = Avion.objects.create(modelo='Benchmark', capacidad=300, filas=50, columnas=6)
+    asientos = list(avion.asientos.values_list('id', flat=True))
+    salida = timezone.now() + timedelta(days=30)
+    vuelos = []
+    secuencia = itertools.count()
+    bloqueo_vuelos = threading.Lock()
+
+    def vuelo_para(numero):
+        # Cada vuelo admite una reserva activa por asiento
+        indice = numero // len(asientos)
+        with bloqueo_vuelos:
+            while len(vuelos) <= indice:
+                vuelos.append(Vuelo.objects.create(
+                    avion=avion, origen='Benchmark', destino=f'Destino {len(vuelos)}',
+                    fecha_salida=salida, fecha_llegada=salida + timedelta(hours=2),
+                    duracion=timedelta(hours=2), precio_base=Decimal('100.00'),
+                ))
+            return vuelos[indice]
+
+    resultados = {'transacciones': 0, 'errores': 0}
+    bloqueo_resultados = threading.Lock()
+    fin = time.perf_counter() + segundos
+
+    def trabajar():
+        transacciones = errores = 0
+        try:
+            while time.perf_counter() < fin:
+                numero = next(secuencia)
+                vuelo = vuelo_para(numero)
+                try:
+                    with transaction.atomic():
+                        pasajero = Pasajero.objects.create(
+                            nombre='Pasajero', apellido=f'Benchmark {numero}',
+                            documento=f'BM{numero:08d}', email=f'bm{numero}@ejemplo.com',
+                            telefono='0000', fecha_nacimiento=date(1990, 1, 1),
+                        )
+                        reserva = Reserva.objects.create(
+                            vuelo=vuelo, pasajero=pasajero,
+                            asiento_id=asientos[numero % len(asientos)],
+                            estado='confirmada', precio=vuelo.precio_base,
+                        )
+                        Boleto.objects.create(reserva=reserva)
+                    transacciones += 1
+                except Exception:
+                    errores += 1
+        finally:
+            connection.close()
+            with bloqueo_resultados:
+                resultados['transacciones'] += transacciones
+                resultados['errores'] += errores
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajar) for _ in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    transcurrido = time.perf_counter() - inicio
+
+    resultados['segundos'] = round(transcurrido, 2)
+    resultados['tps'] = round(resultados['transacciones'] / transcurrido, 1)
+    return resultados
+
+
+def ejecutar_motor(motor, args):
+    with tempfile.TemporaryDirectory() as directorio:
+        arranque = postgres_temporal if motor == 'postgresql' else sqlite_temporal
+        with arranque(directorio) as variables:
+            env = dict(os.environ)
+            env.pop('DJANGO_SETTINGS_MODULE', None)
+            env.update(variables)
+            env['AEROEFI_ENTORNO'] = args.entorno
+
+            # Producción exige AEROEFI_CACHE_URL (ver settings_produccion); se usa una tabla de la base
+            env.setdefault('AEROEFI_CACHE_URL', 'db://aeroefi_cache')
+            for comando in (['migrate', '--no-input'], ['createcachetable']):
+                subprocess.run(
+                    [sys.executable, 'manage.py', *comando],
+                    env=env, cwd=BASE_DIR, capture_output=True, check=True
+                )
+            if args.comando:
+                return subprocess.run(
+                    [sys.executable, 'manage.py', *args.comando.split()],
+                    env=env, cwd=BASE_DIR
+                ).returncode
+
+            salida = subprocess.run(
+                [sys.executable, __file__, '--medir', '--hilos', str(args.hilos),
+                 '--segundos', str(args.segundos)],
+                env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True
+            )
+            return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--motor', choices=MOTORES + ('ambos',), default='ambos')
+    parser.add_argument('--entorno', default='produccion', help='valor de AEROEFI_ENTORNO')
+    parser.add_argument('--hilos', type=int, default=8)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--comando', help='comando de manage.py a ejecutar en lugar del benchmark')
+    parser.add_argument('--medir', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.hilos, args.segundos)))
+        return
+
+    motores = MOTORES if args.motor == 'ambos' else (args.motor,)
+    if args.comando:
+        for motor in motores:
+            codigo = ejecutar_motor(motor, args)
+            if codigo:
+                sys.exit(codigo)
+        return
+
+    print(f"{args.hilos} hilos, {args.segundos:g} s por motor (entorno {args.entorno})")
+    print(f"{'Motor':<12} {'Transacciones':>13} {'Errores':>8} {'tx/s':>8}")
+    for motor in motores:
+        resultado = ejecutar_motor(motor, args)
+        print(f"{motor:<12} {resultado['transacciones']:>13} {resultado['errores']:>8} {resultado['tps']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de generación de boletos en PDF
+Ejecutar: python scripts/benchmark_pdf.py [--cantidad 200]
+
+Genera boletos de las reservas existentes (solo lectura) y compara:
+- estilos creados en cada boleto (como antes de gestion/pdf.py) contra
+  estilos creados una vez por proceso;
+- consultas por boleto al cargar la reserva con y sin reserva_para_boleto.
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from aerolineas_efi import configurar_settings  # noqa: E402
+
+configurar_settings()
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from gestion import pdf  # noqa: E402
+from gestion.models import Reserva  # noqa: E402
+
+
+def medir_render(reservas, cantidad, estilos_por_boleto):
+    datos = [pdf.datos_boleto(reserva) for reserva in reservas]
+    pdf.estilos.cache_clear()
+    inicio = time.perf_counter()
+    for datos_reserva in itertools.islice(itertools.cycle(datos), cantidad):
+        if estilos_por_boleto:
+            pdf.estilos.cache_clear()
+        pdf.renderizar_boleto(datos_reserva)
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def consultas_por_boleto(queryset, ids):
+    with CaptureQueriesContext(connection) as consultas:
+        for reserva_id in ids:
+            pdf.datos_boleto(queryset.get(id=reserva_id))
+    return len(consultas.captured_queries) / len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cantidad', type=int, default=200, help='boletos a generar por variante')
+    args = parser.parse_args()
+
+    if not pdf.reportlab_disponible:
+        sys.exit('reportlab no está instalado')
+    ids = list(Reserva.objects.values_list('id', flat=True)[:50])
+    if not ids:
+        sys.exit('No hay reservas; cargar datos con scripts/create_sample_data.py')
+    reservas = list(pdf.reserva_para_boleto().filter(id__in=ids))
+
+    print(f"{len(ids)} reservas, {args.cantidad} boletos por variante ({os.environ['DJANGO_SETTINGS_MODULE']})")
+    print(f"Consultas por boleto sin select_related: {consultas_por_boleto(Reserva.objects.all(), ids):.1f}")
+    print(f"Consultas por boleto con reserva_para_boleto: {consultas_por_boleto(pdf.reserva_para_boleto(), ids):.1f}")
+    por_boleto = medir_render(reservas, args.cantidad, estilos_por_boleto=True)
+    por_proceso = medir_render(reservas, args.cantidad, estilos_por_boleto=False)
+    print(f"Estilos creados en cada boleto: {por_boleto:8.1f} boletos/s")
+    print(f"Estilos creados una vez:        {por_proceso:8.1f} boletos/s (x{por_proceso / por_boleto:.2f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 """
 Script para crear datos de ejemplo en el sistema de aerolíneas
 Ejecutar: python scripts/create_sample_data.py
+Para volúmenes de prueba de carga: python manage.py generar_datos
 """
 import os
 import sys